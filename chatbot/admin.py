@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatMessage, Place
+from .models import ChatMessage, Place, GeocodeCache, YouTubeSearchCache, YouTubeQuotaLedger
 
 @admin.register(ChatMessage)
 class ChatMessageAdmin(admin.ModelAdmin):
@@ -10,3 +10,19 @@ class ChatMessageAdmin(admin.ModelAdmin):
 @admin.register(Place)
 class PlaceAdmin(admin.ModelAdmin):
     list_display = ('name', 'latitude', 'longitude')
+
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ("provider", "query_key", "found", "expires_at", "updated_at")
+    list_filter = ("provider", "found")
+    search_fields = ("query_key",)
+
+@admin.register(YouTubeSearchCache)
+class YouTubeSearchCacheAdmin(admin.ModelAdmin):
+    list_display = ("cache_key", "category", "expires_at", "updated_at")
+    list_filter = ("category",)
+    search_fields = ("cache_key", "place_name")
+
+@admin.register(YouTubeQuotaLedger)
+class YouTubeQuotaLedgerAdmin(admin.ModelAdmin):
+    list_display = ("day", "units_used", "calls", "updated_at")
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ChatbotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chatbot'
+
+    def ready(self):
+        # 새 DB 연결마다 쿼리 시간을 요청 Trace 의 db 단계로 기록
+        from django.db.backends.signals import connection_created
+        from .utils.tracing import install_db_tracing
+        connection_created.connect(install_db_tracing)
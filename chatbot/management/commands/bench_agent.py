@@ -0,0 +1,64 @@
+"""
+에이전트 생성 비용 벤치마크
+
+요청마다 에이전트를 새로 만들던 방식(build_general_agent)과
+프로세스 공용 에이전트(get_general_agent)의 요청당 준비 시간을 비교합니다.
+
+사용법: python manage.py bench_agent --iterations 50
+"""
+
+# 표준 라이브러리
+import statistics
+import time
+
+# Django 및 외부 모듈
+from django.core.management.base import BaseCommand
+
+# 로컬 모듈
+from chatbot.services.agent_factory import (
+    build_general_agent, build_tool_registry, get_general_agent, reset_agent_factory,
+)
+
+
+def _measure(func, iterations):
+    """func 를 iterations 번 실행하며 1회당 소요 시간(ms) 목록 반환"""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+class Command(BaseCommand):
+    help = "요청마다 에이전트를 생성하는 비용과 공용 에이전트 재사용 비용을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50, help="반복 횟수 (기본 50)")
+
+    def handle(self, *args, **options):
+        iterations = max(1, options["iterations"])
+
+        # 기존 방식: 요청마다 도구 목록 + 에이전트 생성
+        per_request = _measure(lambda: build_general_agent(tools=build_tool_registry()), iterations)
+
+        # 개선 방식: 공용 에이전트 재사용 (최초 1회 생성 비용은 따로 표시)
+        reset_agent_factory()   # 서버 시작 시 미리 생성된 에이전트 제거 후 측정
+        started = time.perf_counter()
+        get_general_agent()
+        first_build = (time.perf_counter() - started) * 1000
+        shared = _measure(get_general_agent, iterations)
+
+        def summary(timings):
+            return (
+                f"평균 {statistics.mean(timings):.3f}ms / "
+                f"중앙값 {statistics.median(timings):.3f}ms / "
+                f"최대 {max(timings):.3f}ms"
+            )
+
+        self.stdout.write(f"반복 횟수: {iterations}")
+        self.stdout.write(f"요청마다 생성  : {summary(per_request)}")
+        self.stdout.write(f"공용 에이전트  : {summary(shared)} (최초 생성 {first_build:.3f}ms)")
+        self.stdout.write(self.style.SUCCESS(
+            f"요청당 절감 시간: {statistics.mean(per_request) - statistics.mean(shared):.3f}ms"
+        ))
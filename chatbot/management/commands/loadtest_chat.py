@@ -0,0 +1,238 @@
+"""
+채팅 파이프라인 부하 테스트
+
+가상 사용자 N명이 동시에 실제 뷰(chatbot_view / chatbot_stream_view)로 메시지를 보내며
+처리량, 지연 시간 분포(p50/p95/p99), SQLite 잠금 대기를 측정합니다.
+OpenAI 비용/속도 제한 없이 돌리려면 가짜 LLM 백엔드를 사용합니다.
+
+사용법: LLM_BACKEND=fake python manage.py loadtest_chat --users 20 --turns 5 [--stream]
+주의: 지도/날씨/유튜브 등 외부 API 는 그대로 호출됩니다 (LLM 만 가짜로 대체).
+"""
+
+# 표준 라이브러리
+import math
+import statistics
+import threading
+import time
+
+# Django 및 외부 모듈
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+# 로컬 모듈
+from chatbot.services.router import get_route_stats
+from chatbot.utils.llm_backend import is_fake_backend
+from chatbot.utils.singleflight import get_singleflight_stats
+from chatbot.utils.http_client import get_http_client_stats
+from chatbot.utils.youtube_cache import get_youtube_quota_stats
+from chatbot.utils.knowledge import get_knowledge_cache_stats
+
+DEFAULT_MESSAGES = [
+    "부산 2박3일 일정 짜줘",
+    "부산 가성비 숙소 어디가 좋아?",
+    "부산 여행 알려줘",
+    "해운대 근처 맛집 추천해줘",
+]
+USER_PREFIX = "loadtest_"
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수 (values 는 정렬된 목록)"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class SQLiteLockMonitor:
+    """
+    DB 쓰기 쿼리 시간을 재서 잠금 대기를 추정하는 execute wrapper
+
+    SQLite 는 쓰기 잠금을 얻을 때까지 busy timeout 동안 기다리므로,
+    임계값보다 오래 걸린 쓰기 쿼리를 "잠금 대기"로, database is locked 오류를 "잠금 실패"로 집계합니다.
+    """
+
+    def __init__(self, threshold_ms):
+        self.threshold = threshold_ms / 1000
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.write_seconds = 0.0
+        self.max_write = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.errors = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        is_write = sql.lstrip()[:7].upper().startswith(WRITE_PREFIXES)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            if "locked" in str(e):
+                with self._lock:
+                    self.errors += 1
+            raise
+        finally:
+            if is_write:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.writes += 1
+                    self.write_seconds += elapsed
+                    self.max_write = max(self.max_write, elapsed)
+                    if elapsed >= self.threshold:
+                        self.waits += 1
+                        self.wait_seconds += elapsed
+
+    def install(self, sender=None, connection=None, **kwargs):
+        """새 DB 연결(요청/작업 스레드 포함)에 wrapper 등록"""
+        if connection.vendor == "sqlite" and self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class Command(BaseCommand):
+    help = "가상 사용자 N명으로 채팅 뷰에 동시 부하를 걸고 처리량/지연 시간/SQLite 잠금 대기를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10, help="동시 가상 사용자 수 (기본 10)")
+        parser.add_argument("--turns", type=int, default=3, help="사용자당 메시지 수 (기본 3)")
+        parser.add_argument("--message", action="append", dest="messages", help="보낼 메시지 (여러 번 지정 가능)")
+        parser.add_argument("--stream", action="store_true", help="스트리밍 뷰(chatbot_stream_view)로 전송")
+        parser.add_argument("--think-time", type=float, default=0.0, help="메시지 사이 대기 시간(초)")
+        parser.add_argument("--lock-threshold-ms", type=float, default=50.0, help="잠금 대기로 볼 쓰기 쿼리 시간 (기본 50ms)")
+        parser.add_argument("--keep-data", action="store_true", help="테스트 사용자/세션을 삭제하지 않음")
+        parser.add_argument("--allow-openai", action="store_true", help="가짜 백엔드가 아니어도 실행 (실제 OpenAI 비용 발생)")
+
+    def handle(self, *args, **options):
+        if not is_fake_backend() and not options["allow_openai"]:
+            raise CommandError("LLM_BACKEND=fake 로 실행하세요 (실제 OpenAI 로 돌리려면 --allow-openai).")
+
+        users = max(1, options["users"])
+        turns = max(1, options["turns"])
+        messages = options["messages"] or DEFAULT_MESSAGES
+        url = reverse("chatbot_stream" if options["stream"] else "chatbot")
+
+        accounts = [self._get_user(i) for i in range(users)]
+        monitor = SQLiteLockMonitor(options["lock_threshold_ms"])
+        connection_created.connect(monitor.install)
+        monitor.install(connection=connection)
+        routes_before = get_route_stats()
+
+        results = []   # (지연 시간, 첫 이벤트까지 시간, 성공 여부)
+        results_lock = threading.Lock()
+        barrier = threading.Barrier(users)
+
+        def run_user(index, user):
+            client = Client()
+            client.force_login(user)
+            barrier.wait()   # 모든 사용자가 동시에 시작
+            try:
+                for turn in range(turns):
+                    message = messages[(index + turn) % len(messages)]
+                    result = self._send(client, url, message, options["stream"])
+                    with results_lock:
+                        results.append(result)
+                    if options["think_time"]:
+                        time.sleep(options["think_time"])
+            finally:
+                connections.close_all()
+
+        self.stdout.write(f"가상 사용자 {users}명 × {turns}턴 → {url} ({'스트리밍' if options['stream'] else '일반'})")
+        started = time.perf_counter()
+        threads = [threading.Thread(target=run_user, args=(i, user)) for i, user in enumerate(accounts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        connection_created.disconnect(monitor.install)
+
+        self._report(results, elapsed, monitor, routes_before, options["stream"])
+        if not options["keep_data"]:
+            User.objects.filter(username__startswith=USER_PREFIX).delete()   # 세션/메시지는 CASCADE 삭제
+
+    def _get_user(self, index):
+        user, created = User.objects.get_or_create(username=f"{USER_PREFIX}{index}")
+        if created:
+            user.set_unusable_password()
+            user.save()
+        return user
+
+    def _send(self, client, url, message, stream):
+        """메시지 1건 전송 → (전체 지연, 첫 토큰/응답까지 시간, 성공 여부)"""
+        started = time.perf_counter()
+        first = None
+        try:
+            response = client.post(url, {"message": message})
+            if stream and response.streaming:
+                ok = response.status_code == 200
+                for chunk in response.streaming_content:
+                    if first is None and (b"event: token" in chunk or b"event: reply" in chunk):
+                        first = time.perf_counter() - started
+                    if b"event: error" in chunk:
+                        ok = False
+            else:
+                ok = response.status_code == 200 and "reply" in response.json()
+        except Exception as e:
+            self.stderr.write(f"요청 실패: {e}")
+            ok = False
+        total = time.perf_counter() - started
+        return total, first if first is not None else total, ok
+
+    def _report(self, results, elapsed, monitor, routes_before, stream):
+        latencies = sorted(r[0] for r in results)
+        firsts = sorted(r[1] for r in results)
+        failures = sum(1 for r in results if not r[2])
+
+        def dist(values):
+            return (
+                f"p50 {percentile(values, 50) * 1000:.0f}ms / "
+                f"p95 {percentile(values, 95) * 1000:.0f}ms / "
+                f"p99 {percentile(values, 99) * 1000:.0f}ms / "
+                f"평균 {statistics.mean(values) * 1000:.0f}ms"
+            )
+
+        self.stdout.write(f"요청 수: {len(results)} (실패 {failures}) / 소요 {elapsed:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"처리량: {len(results) / elapsed:.2f} req/s"))
+        if latencies:
+            self.stdout.write(f"지연 시간     : {dist(latencies)}")
+            if stream:
+                self.stdout.write(f"첫 토큰까지   : {dist(firsts)}")
+
+        self.stdout.write(
+            f"SQLite 쓰기: {monitor.writes}회 (평균 {monitor.write_seconds / max(1, monitor.writes) * 1000:.1f}ms, "
+            f"최대 {monitor.max_write * 1000:.0f}ms)"
+        )
+        self.stdout.write(
+            f"SQLite 잠금 대기: {monitor.waits}회 (합계 {monitor.wait_seconds:.2f}s) / 잠금 실패: {monitor.errors}회"
+        )
+
+        # 이번 실행 동안의 경로별 처리 시간
+        for name, stats in get_route_stats().items():
+            before = routes_before.get(name, {"count": 0, "total_seconds": 0})
+            count = stats["count"] - before["count"]
+            if count:
+                avg = (stats["total_seconds"] - before["total_seconds"]) / count
+                self.stdout.write(f"  경로 {name}: {count}회, 평균 {avg * 1000:.0f}ms")
+
+        flight = get_singleflight_stats()
+        self.stdout.write(f"LLM 호출 합치기: 실행 {flight['executions']}회 / 공유 {flight['shared']}회")
+
+        # 외부 API 연결 재사용 (실행 전체 누적)
+        for provider, stats in get_http_client_stats().items():
+            self.stdout.write(
+                f"  HTTP {provider}: 요청 {stats['requests']}회 (오류 {stats['errors']}), 새 연결 {stats['new_connections']}개, "
+                f"재사용률 {stats['reuse_rate']:.0%}"
+            )
+
+        quota = get_youtube_quota_stats()
+        self.stdout.write(
+            f"유튜브 할당량({quota['day']}): {quota['units_used']} 사용 / {quota['units_remaining']} 남음, "
+            f"캐시 {quota['fresh_queries']}/{quota['cached_queries']}건 유효"
+        )
+        for source, stats in get_knowledge_cache_stats().items():
+            self.stdout.write(f"  외부 지식 {source}: 캐시 적중 {stats['hits']}회 / 미스 {stats['misses']}회")
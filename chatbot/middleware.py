@@ -0,0 +1,75 @@
+"""
+챗봇 미들웨어
+
+ServerTimingMiddleware: 요청마다 Trace 를 시작하고, 단계별 소요 시간을
+Server-Timing 응답 헤더와 구조화 로그(chatbot.tracing) 한 줄로 내보냅니다.
+"""
+
+# Django 및 외부 모듈
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# 로컬 모듈
+from .utils.tracing import start_trace, end_trace, log_trace
+
+
+class ServerTimingMiddleware:
+    """
+    요청 단계별 지연 시간 추적 미들웨어 (MIDDLEWARE 맨 앞에 두어 전체 시간을 측정)
+
+    동기/비동기 모두 지원하므로 ASGI 에서 비동기 뷰를 동기 모드로 떨어뜨리지 않습니다.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        trace, token = start_trace(f"{request.method} {request.path}")
+        try:
+            response = self.get_response(request)
+        finally:
+            end_trace(token)
+        return self._finish(request, response, trace)
+
+    async def __acall__(self, request):
+        trace, token = start_trace(f"{request.method} {request.path}")
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_trace(token)
+        return self._finish(request, response, trace)
+
+    def _finish(self, request, response, trace):
+        # 스트리밍 응답은 헤더가 먼저 나가므로 응답 시작까지의 단계만 헤더에 포함
+        response["Server-Timing"] = trace.server_timing()
+        fields = {"method": request.method, "path": request.path, "status": response.status_code}
+
+        if response.streaming:
+            # 로그는 스트림이 끝난 뒤 (작업 스레드의 LLM/지오코딩 시간까지 포함)
+            wrap = self._alog_after_stream if response.is_async else self._log_after_stream
+            response.streaming_content = wrap(response.streaming_content, trace, fields)
+        else:
+            log_trace(trace, **fields)
+        return response
+
+    @staticmethod
+    def _log_after_stream(content, trace, fields):
+        try:
+            yield from content
+        finally:
+            log_trace(trace, streamed=True, **fields)
+
+    @staticmethod
+    async def _alog_after_stream(content, trace, fields):
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            log_trace(trace, streamed=True, **fields)
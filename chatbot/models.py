@@ -22,6 +22,10 @@ class ChatSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     # 새로 추가
     last_detected_destination = models.CharField(max_length=50, blank=True, null=True)
+    # 누적 대화 요약 (목적지/기간/선호도/언급 장소/이전 대화 다이제스트) → utils/session_summary.py 에서 관리
+    summary = models.JSONField(default=dict, blank=True)
+    # 요약에 반영된 마지막 ChatMessage id (이후 메시지만 추가로 반영)
+    summary_message_id = models.BigIntegerField(null=True, blank=True)
 
     def __str__(self):
         # 객체를 문자열로 표현할 때 보여줄 내용
@@ -39,8 +43,10 @@ class ChatMessage(models.Model):
     )
     # 메시지 역할 (user / assistant / system 등)
     role = models.CharField(max_length=20)
-    # 메시지 본문 (길이 제한 없음)
+    # 메시지 본문 (길이 제한 없음, 화면 표시용 HTML)
     content = models.TextField()
+    # 프롬프트용 원문 (마크다운/평문, HTML 변환 전) → 대화 히스토리 구성에 사용
+    raw_content = models.TextField(blank=True, default="")
     # 메시지 생성 시각 (자동 기록)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -67,6 +73,64 @@ class Place(models.Model):
         return self.name
 
 
+# 🗺️ 지오코딩 캐시 모델
+class GeocodeCache(models.Model):
+    # 어떤 지오코더의 결과인지 (예: "kakao_geocode", "place_search")
+    provider = models.CharField(max_length=30)
+    # clean_query 로 정규화된 검색어 (캐시 키)
+    query_key = models.CharField(max_length=200)
+    # 지오코더 반환값을 JSON 으로 저장 (검색 실패 시 null)
+    result = models.JSONField(null=True, blank=True)
+    # 검색 성공 여부 (False 면 네거티브 캐시)
+    found = models.BooleanField(default=False)
+    # 만료 시각 (이후에는 다시 API 조회)
+    expires_at = models.DateTimeField()
+    # 마지막 갱신 시각 (자동 기록)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # (provider, query_key) 조합은 유일 → 조회 시 단일 인덱스 SELECT
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "query_key"], name="uniq_geocode_cache_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}: {self.query_key}"
+
+
+# 🎥 유튜브 검색 결과 캐시 (장소명 + 카테고리 단위, 만료 후에도 할당량 부족/API 오류 시 대체 결과로 사용)
+class YouTubeSearchCache(models.Model):
+    # "카테고리:장소명" 으로 정규화된 캐시 키 (예: "맛집:해운대")
+    cache_key = models.CharField(max_length=200, unique=True)
+    # 검색 대상 장소명 / 카테고리 (vlog, 카페, 맛집, 여행)
+    place_name = models.CharField(max_length=150)
+    category = models.CharField(max_length=20)
+    # 필터링을 거친 영상 목록 (yt_search 결과의 videos 형식)
+    videos = models.JSONField(default=list, blank=True)
+    # 만료 시각 (이후에는 다시 API 조회, 행은 오래된 결과 대체용으로 남김)
+    expires_at = models.DateTimeField()
+    # 마지막 갱신 시각 (자동 기록)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.cache_key
+
+
+# 📊 유튜브 API 일일 할당량 사용 장부 (할당량 기준일 = 태평양 시간 자정 초기화)
+class YouTubeQuotaLedger(models.Model):
+    # 할당량 기준일
+    day = models.DateField(unique=True)
+    # 사용한 할당량 단위 (search.list 1회 = 100)
+    units_used = models.IntegerField(default=0)
+    # API 호출 수
+    calls = models.IntegerField(default=0)
+    # 마지막 갱신 시각 (자동 기록)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.day}: {self.units_used}"
+
+
 # 📅 일정 모델
 class Schedule(models.Model):
     # 일정은 반드시 로그인된 사용자와 연결됨 (한 사용자가 여러 일정 가질 수 있음)
@@ -0,0 +1,153 @@
+"""
+LangChain 에이전트 팩토리
+
+이 모듈은 일반 여행 질문용 LangChain 에이전트와 도구 목록을 프로세스당 한 번만 생성하여 공유합니다.
+- 에이전트에는 요청별 상태(세션, 대화 히스토리)를 넣지 않고, 호출 시 입력(input)으로 전달합니다.
+- AgentExecutor 는 메모리를 사용하지 않으므로 여러 스레드에서 동시에 invoke 해도 안전합니다.
+- 모델 정책 티어(utils/model_policy.py)마다 에이전트를 하나씩 만들어 재사용합니다.
+- 요청마다 bind_request_deadline() 으로 최대 실행 시간/LLM 타임아웃만 바꾼 얕은 복사본을 만들어 요청 예산을 지킵니다.
+"""
+
+# 표준 라이브러리
+import threading
+import time
+
+# Django 및 외부 모듈
+from django.conf import settings
+
+# LangChain 관련
+from langchain.agents import initialize_agent, Tool
+from rich.console import Console
+
+# 로컬 모듈
+from ..utils.youtube import yt_search
+from ..utils.maps import google_place_details, kakao_geocode
+from ..utils.knowledge import search_external_knowledge
+from ..utils.weather import get_weather_info
+from ..utils.model_policy import select_model_policy, get_policy_chat_model, call_timeout_kwargs
+from ..utils.deadline import current_deadline, remaining_timeout
+from ..utils.tool_memo import memoized_tool
+
+console = Console()
+
+_lock = threading.Lock()
+_tools = None
+_agents = {}   # 모델 정책 티어 → 에이전트
+
+AGENT_MAX_EXECUTION_TIME = 20   # 에이전트 최대 실행 시간(초), 요청 예산이 더 적게 남았으면 그 안에서
+
+
+def build_tool_registry():
+    """에이전트가 사용할 도구 목록 생성 (같은 요청 안의 반복 호출은 요청 단위 메모로 한 번만 실행)"""
+    return [
+        Tool(name="유튜브검색", func=memoized_tool("yt_search", yt_search), description="지역명/장소명으로 여행 브이로그, 맛집 리뷰, 관광지 영상을 찾아줍니다."),
+        Tool(name="카카오지도검색", func=memoized_tool("kakao_geocode", kakao_geocode), description="장소명으로 검색하여 정확한 위도, 경도 좌표와 주소를 찾아줍니다."),
+        Tool(name="구글플레이스상세", func=memoized_tool("google_place_details", google_place_details), description="장소명으로 검색하여 운영시간, 전화번호, 평점 등 상세 정보를 찾아줍니다."),
+        Tool(name="외부지식검색", func=memoized_tool("external_knowledge", search_external_knowledge), description="지역명이나 관광지명으로 역사, 문화, 특징 등 배경 정보를 찾아줍니다."),
+        Tool(name="날씨검색", func=memoized_tool("weather", get_weather_info), description="특정 지역의 현재 날씨와 기온을 확인합니다. 예: '서울 날씨', '부산 오늘 날씨'"),  # ✅ 추가됨
+    ]
+
+
+def build_general_agent(llm=None, tools=None):
+    """
+    일반 질문용 에이전트 생성 (호출할 때마다 새로 생성, 캐시 없음)
+
+    Args:
+        llm: LangChain 채팅 모델 (기본: "general" 기본 티어 모델)
+        tools (list): 도구 목록 (기본: build_tool_registry())
+    """
+    if llm is None:
+        # 순환 import 방지를 위해 함수 내부에서 import
+        from .chat_handlers import CHAT_MODEL_OPTIONS
+        llm = get_policy_chat_model(select_model_policy("general"), **CHAT_MODEL_OPTIONS)
+
+    # Agent 초기화: ChatGPT 수준의 빠른 응답을 위한 최적화
+    return initialize_agent(
+        tools if tools is not None else build_tool_registry(),
+        llm,
+        agent="zero-shot-react-description",  # Zero-shot 방식
+        verbose=False,                       # 로그 출력 비활성화 (성능 향상)
+        handle_parsing_errors="Check your output and make sure it conforms!",  # 파싱 에러 시 재시도
+        max_iterations=3,                    # 최대 3번 도구 호출 (파싱 에러 대응)
+        early_stopping_method="generate",    # 조기 종료 방법
+        return_intermediate_steps=True,      # 중간 단계 반환 활성화 (에러 디버깅용)
+        max_execution_time=AGENT_MAX_EXECUTION_TIME  # 최대 실행 시간 20초 (여유있게)
+    )
+
+
+def get_tool_registry():
+    """프로세스 공용 도구 목록 반환 (최초 1회 생성)"""
+    global _tools
+    if _tools is None:
+        with _lock:
+            if _tools is None:
+                _tools = build_tool_registry()
+    return _tools
+
+
+def get_general_agent(policy=None):
+    """
+    프로세스 공용 에이전트 반환 (티어별 최초 1회 생성, 스레드 안전)
+
+    Args:
+        policy (ModelPolicy, optional): 모델 정책 (기본: "general" 기본 티어)
+    """
+    policy = policy or select_model_policy("general")
+    agent = _agents.get(policy.tier)
+    if agent is None:
+        tools = get_tool_registry()
+        from .chat_handlers import CHAT_MODEL_OPTIONS   # 순환 import 방지
+        llm = get_policy_chat_model(policy, **CHAT_MODEL_OPTIONS)
+        with _lock:
+            agent = _agents.get(policy.tier)
+            if agent is None:
+                started = time.perf_counter()
+                agent = _agents[policy.tier] = build_general_agent(llm=llm, tools=tools)
+                console.log(f"🤖 일반 질문 에이전트 생성 완료 ({policy.tier}, {(time.perf_counter() - started) * 1000:.1f}ms)")
+    return agent
+
+
+def bind_request_deadline(agent, policy):
+    """
+    공용 에이전트의 요청별 얕은 복사본 (최대 실행 시간과 LLM 호출 타임아웃을 남은 요청 예산 안으로)
+
+    max_execution_time 은 단계 사이에서만 확인되므로, 진행 중인 LLM 호출도 끊기도록
+    모델에 call_timeout_kwargs(policy) 를 bind 합니다 (tool_engine._models 와 같은 방식).
+    도구 목록/프롬프트는 공용 에이전트와 공유하며, Deadline 이 없으면 공용 에이전트를 그대로 반환합니다.
+    """
+    if current_deadline() is None:
+        return agent
+    llm_chain = agent.agent.llm_chain
+    llm = llm_chain.llm.bind(**call_timeout_kwargs(policy))
+    return agent.model_copy(update={
+        "max_execution_time": remaining_timeout(AGENT_MAX_EXECUTION_TIME),
+        "agent": agent.agent.model_copy(update={"llm_chain": llm_chain.model_copy(update={"llm": llm})}),
+    })
+
+
+def reset_agent_factory():
+    """공용 에이전트/도구 목록 초기화 (설정 변경 후 재생성용)"""
+    global _tools
+    with _lock:
+        _tools = None
+        _agents.clear()
+
+
+def warm_up():
+    """서버 시작 시 에이전트를 미리 생성 (실패해도 첫 요청에서 다시 시도)"""
+    try:
+        get_general_agent()
+    except Exception as e:
+        console.log(f"⚠️ 에이전트 사전 생성 실패 (첫 요청 시 재시도): {e}")
+
+
+def warm_up_server():
+    """
+    서버 프로세스 시작 시 호출 (config/wsgi.py, config/asgi.py — runserver 도 WSGI_APPLICATION 을 통해 호출)
+
+    settings.CHATBOT_WARM_AGENT 가 켜져 있을 때만 에이전트를 미리 생성합니다.
+    AppConfig.ready() 에서 하지 않는 이유: migrate 같은 manage.py 명령과
+    django.setup() 스크립트마다 에이전트를 만들게 되기 때문입니다.
+    """
+    if getattr(settings, "CHATBOT_WARM_AGENT", False):
+        warm_up()
@@ -0,0 +1,137 @@
+"""
+비동기 채팅 처리 핸들러 (ASGI 용)
+
+chat_handlers.py 의 각 핸들러와 같은 결과를 내되, LLM 호출과 외부 API 를 await 로 기다려
+LLM 응답을 기다리는 동안 워커 스레드를 점유하지 않습니다.
+프롬프트 구성/결과 변환은 chat_handlers.py 의 동기 단계 함수를 그대로 공유하고,
+ORM 을 쓰는 단계(대화 히스토리, 기존 일정 조회)는 run_sync 로 작업 스레드에서 실행합니다.
+"""
+
+# Django 및 외부 모듈
+from rich.console import Console
+
+# 로컬 모듈
+from ..utils.youtube import ayt_search
+from ..utils.json_stream import ScheduleStreamParser
+from ..utils.prompt_cache import record_usage
+from ..utils.singleflight import llm_flight
+from ..utils.llm_backend import get_async_openai_client
+from ..utils.model_policy import select_model_policy, completion_kwargs
+from ..utils.tracing import span, annotate
+from ..utils.aio import run_sync
+from ..utils.tool_memo import memoized_tool
+from .agent_factory import get_general_agent, bind_request_deadline
+from .tool_engine import select_tool_engine, arun_parallel_tools, ENGINE_PARALLEL, ENGINE_REACT
+from .chat_handlers import (
+    prepare_schedule_input,
+    select_schedule_policy,
+    get_schedule_llm,
+    schedule_flight_key,
+    finish_schedule_result,
+    vlog_search_term,
+    build_vlog_reply,
+    simple_qna_messages,
+    simple_qna_flight_key,
+    build_general_prompt,
+    agent_output_text,
+    agent_error_reply,
+)
+
+console = Console()
+
+
+async def ahandle_schedule_request(user_input, session, request, is_schedule_modification=False):
+    """
+    handle_schedule_request 의 비동기 버전
+
+    Returns:
+        tuple: (결과 텍스트, 일정 데이터 딕셔너리 또는 None)
+    """
+    llm_input = await run_sync(prepare_schedule_input, user_input, session, request, is_schedule_modification)
+    policy = select_schedule_policy(user_input, is_schedule_modification)
+    schedule_llm = get_schedule_llm(policy)
+    parser = ScheduleStreamParser()
+
+    async def stream_schedule():
+        usage = None
+        async for chunk in schedule_llm.astream(llm_input):
+            if chunk.content:
+                parser.feed(chunk.content)
+            usage = chunk.usage_metadata or usage   # 마지막 청크에 사용량 포함
+        return parser.text, usage
+
+    # 같은 프롬프트의 일정 생성이 진행 중이면 그 응답을 공유
+    with span("llm.schedule"):
+        (result, usage), shared = await llm_flight.ado(schedule_flight_key(llm_input, policy), stream_schedule)
+    if shared:
+        parser.feed(result)
+    else:
+        record_usage("schedule", usage)   # 실제 호출한 요청만 사용량 집계
+
+    result, schedule_data = finish_schedule_result(parser)
+    if schedule_data:
+        # JSON 데이터를 세션에 저장 (지도에서 사용)
+        await request.session.aset('schedule_json', schedule_data)
+    return result, schedule_data
+
+
+async def ahandle_simple_qna(user_input):
+    """
+    handle_simple_qna 의 비동기 버전 (AsyncOpenAI)
+
+    Returns:
+        str: AI 응답 텍스트
+    """
+    client = get_async_openai_client()
+    policy = select_model_policy("simple_qna", user_input)
+    messages = simple_qna_messages(user_input)
+
+    async def call_llm():
+        completion = await client.chat.completions.create(**completion_kwargs(policy), messages=messages)
+        return completion.choices[0].message.content   # 첫 번째 응답만 사용
+
+    # 같은 질문이 동시에 들어오면 OpenAI 호출은 한 번만 (나머지는 결과 공유)
+    with span("llm.qna"):
+        answer, _ = await llm_flight.ado(simple_qna_flight_key(policy, messages), call_llm)
+    return answer
+
+
+async def ahandle_general_request(user_input, conversation_history, session=None, request_type=None):
+    """
+    handle_general_request 의 비동기 버전 (에이전트 ainvoke 또는 병렬 도구 엔진)
+
+    좌표는 호출 측(aprocess_chat_message)에서 응답 기준으로 한 번만 추출합니다.
+
+    Returns:
+        str: AI 응답 텍스트
+    """
+    prompt, request_type = await run_sync(build_general_prompt, user_input, conversation_history, session, request_type)
+    policy = select_model_policy("general", user_input, intent=request_type)
+
+    try:
+        if select_tool_engine(request_type) == ENGINE_PARALLEL:
+            console.log(f"🧰 병렬 도구 엔진 실행 시작(async): {user_input}")
+            result = agent_output_text(await arun_parallel_tools(prompt, policy, request_type), user_input)
+        else:
+            agent = bind_request_deadline(get_general_agent(policy), policy)
+            annotate("engine", ENGINE_REACT)
+            console.log(f"🤖 AI 에이전트 실행 시작(async): {user_input}")
+            with span("agent"):   # 동기 도구는 LangChain 이 실행기 스레드에서 호출
+                result = await agent.ainvoke({'input': prompt})
+            result = agent_output_text(result, user_input)
+    except Exception as agent_error:
+        console.log(f"❌ Agent 실행 오류: {agent_error}")
+        result = agent_error_reply(user_input)
+
+    console.log(f"✅ 최종 응답: {result[:100]}...")
+    return result
+
+
+_memo_ayt_search = memoized_tool("yt_search", ayt_search)
+
+
+async def asearch_vlog(user_input, session, request=None):
+    """search_vlog 의 비동기 버전 (유튜브 검색어 2개 동시 조회)"""
+    search_term = await run_sync(vlog_search_term, user_input, session, request)
+    return build_vlog_reply(search_term, await _memo_ayt_search(search_term))
+
@@ -8,31 +8,109 @@
 import json
 
 # Django 및 외부 모듈
+from django.conf import settings
 from django.contrib.auth.models import User
 from rich.console import Console
 
 # LangChain 관련
-from langchain.agents import initialize_agent, Tool
-from langchain_openai import ChatOpenAI
+from langchain_core.callbacks import BaseCallbackHandler
 
 # 로컬 모듈
 from ..models import ChatMessage, Schedule
 from ..utils.youtube import yt_search, _render_yt_cards
-from ..utils.maps import google_place_details, kakao_geocode
-from ..utils.knowledge import search_external_knowledge
-from ..utils.weather import get_weather_info, get_weather_info_by_coords
+from ..utils.weather import get_weather_info_by_coords
 from ..utils.coordinates import extract_places_from_response, search_place_coordinates
 from ..utils.coordinate_extractor import extract_coordinates_from_schedule_data, extract_coordinates_from_response, format_places_info
-from ..utils.prompt_templates import get_schedule_prompt, get_general_prompt
-from ..utils.conversation_manager import get_conversation_history, extract_conversation_context
+from ..utils.prompt_templates import get_schedule_prompt_parts, get_general_prompt, get_general_system_prefix
+from ..utils.prompt_cache import record_prompt_prefix, record_usage, get_prompt_prefix_stats
+from ..utils.json_stream import ScheduleStreamParser
+from ..utils.session_summary import build_prompt_history
+from ..utils.singleflight import llm_flight, flight_key
+from ..utils.llm_backend import get_openai_client
+from ..utils.model_policy import select_model_policy, completion_kwargs, call_timeout_kwargs, get_policy_chat_model
+from ..utils.tracing import span, annotate
+from ..utils.tokens import count_tokens
+from ..utils.tool_memo import memoized_tool
+from .agent_factory import get_general_agent, bind_request_deadline
+from .tool_engine import select_tool_engine, run_parallel_tools, ENGINE_PARALLEL, ENGINE_REACT
+from .router import router
 
 import re
 from django.http import HttpRequest
 
 console = Console()
 
-# LLM 초기화
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+# 일정 생성 시 공급자 JSON 모드 사용 여부 (settings.py 에서 재정의 가능)
+SCHEDULE_JSON_MODE = getattr(settings, "SCHEDULE_JSON_MODE", True)
+
+# LangChain 모델 옵션 (streaming=True: 토큰 콜백 지원, stream_usage: 캐시 적중 토큰 집계용)
+# 모델/최대 출력 토큰/temperature/타임아웃은 핸들러별 모델 정책(utils/model_policy.py)에서 결정
+CHAT_MODEL_OPTIONS = {"streaming": True, "stream_usage": True}
+
+# 간단 질문 시스템 프롬프트
+SIMPLE_QNA_SYSTEM_PROMPT = """# 🎯 여행 질문 답변 전문가
+
+**역할**: 국내 여행 전문가
+**목표**: 질문에 필요한 만큼만 짧고 정확하게 답변
+- 요금, 시간, 위치 같은 사실 확인 질문은 1~3문장으로 답합니다.
+- 추천 질문은 핵심 항목 3~5개만 한 줄씩 나열합니다.
+- Day1, Day2 형식의 일정표는 사용자가 일정을 직접 요청한 경우에만 작성합니다.
+- 영어로 절대 답하지 마세요.
+
+## 🎯 답변 원칙
+1. **핵심 먼저**: 질문에 대한 직접적 답변
+2. **간결함**: 불필요한 정보 제거
+3. **실용성**: 실제 여행에 도움이 되는 정보
+4. **친근함**: 도움이 되는 톤 유지
+
+**형식**: 핵심 답변 → (필요할 때만) 짧은 팁"""
+
+
+class FinalAnswerTokenHandler(BaseCallbackHandler):
+    """
+    LangChain 에이전트의 최종 답변 토큰만 전달하는 콜백
+
+    ReAct 에이전트는 "Thought/Action" 추론 과정도 토큰으로 생성하므로,
+    "Final Answer:" 이후의 토큰만 on_token 으로 넘깁니다.
+    """
+
+    ANSWER_PREFIX = "Final Answer:"
+
+    def __init__(self, on_token):
+        self.on_token = on_token
+        self._buffer = ""
+        self._streaming = False
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        # 에이전트의 매 추론 단계(LLM 호출)마다 상태 초기화
+        self._buffer = ""
+        self._streaming = False
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.on_llm_start(serialized, [], **kwargs)
+
+    def on_llm_new_token(self, token, **kwargs):
+        if self._streaming:
+            self.on_token(token)
+            return
+        self._buffer += token
+        if self.ANSWER_PREFIX in self._buffer:
+            self._streaming = True
+            rest = self._buffer.split(self.ANSWER_PREFIX, 1)[1].lstrip()
+            if rest:
+                self.on_token(rest)
+
+
+def format_activity_markdown(activity, details):
+    """일정 활동 1개를 마크다운으로 변환"""
+    return (
+        f"### {activity}\n"
+        f"- 장소: {details.get('장소', 'N/A')}\n"
+        f"- 시간: {details.get('시간', 'N/A')}\n"
+        f"- 비용: {details.get('비용', 'N/A')}\n"
+        f"- 주의사항: {details.get('주의사항', 'N/A')}\n"
+        "\n"
+    )
 
 
 def generate_complete_summary(schedule_data):
@@ -66,7 +144,7 @@ def generate_complete_summary(schedule_data):
     return ", ".join(summary_parts)
 
 
-def handle_schedule_request(user_input, session, request, is_schedule_modification=False):
+def handle_schedule_request(user_input, session, request, is_schedule_modification=False, on_token=None, on_activity=None):
     """
     일정 관련 요청을 처리하는 함수 (개선된 버전)
     
@@ -75,20 +153,62 @@ def handle_schedule_request(user_input, session, request, is_schedule_modificati
         session (ChatSession): 현재 채팅 세션
         request (HttpRequest): Django 요청 객체
         is_schedule_modification (bool): 일정 변경 요청 여부
+        on_token (callable, optional): 스트리밍 모드에서 완성된 활동을 마크다운으로 받을 콜백
+        on_activity (callable, optional): DayN 활동이 완성될 때마다 호출 on_activity(day, activity, details)
+            (좌표 검색/지도 표시를 전체 응답 전에 시작하기 위함)
         
     Returns:
         tuple: (결과 텍스트, 일정 데이터 딕셔너리 또는 None)
     """
-    # 대화 히스토리 가져오기
-    conversation_history = get_conversation_history(session, limit=15)
+    llm_input = prepare_schedule_input(user_input, session, request, is_schedule_modification)
+    policy = select_schedule_policy(user_input, is_schedule_modification)
+
+    # JSON 모드 + 증분 파서: DayN 활동이 닫히는 즉시 처리 (응답이 깨져도 완성된 활동은 유지)
+    schedule_llm = get_schedule_llm(policy)
+    parser = ScheduleStreamParser()
+    handle_activity = make_activity_handler(on_token, on_activity)
+
+    def stream_schedule():
+        usage = None
+        for chunk in schedule_llm.stream(llm_input):
+            if chunk.content:
+                for day, activity, details in parser.feed(chunk.content):
+                    handle_activity(day, activity, details)
+            usage = chunk.usage_metadata or usage   # 마지막 청크에 사용량 포함
+        return parser.text, usage
+
+    # 같은 프롬프트의 일정 생성이 진행 중이면 그 응답을 공유 (더블클릭, 같은 인기 질문 동시 요청)
+    with span("llm.schedule"):
+        (result, usage), shared = llm_flight.do(schedule_flight_key(llm_input, policy), stream_schedule)
+    if shared:
+        # 공유받은 전체 텍스트를 이 요청의 파서에 흘려서 활동 콜백을 동일하게 호출
+        for day, activity, details in parser.feed(result):
+            handle_activity(day, activity, details)
+    else:
+        record_usage("schedule", usage)   # 실제 호출한 요청만 사용량 집계
+
+    result, schedule_data = finish_schedule_result(parser)
+    if schedule_data:
+        # JSON 데이터를 세션에 저장 (지도에서 사용)
+        request.session['schedule_json'] = schedule_data
+    return result, schedule_data
+
+
+# -------------------- 일정 처리 단계 (동기/비동기 파이프라인 공용) --------------------
+def prepare_schedule_input(user_input, session, request, is_schedule_modification=False):
+    """
+    일정 생성 LLM 입력 구성 (대화 히스토리, 기존 일정, 목적지 감지 포함)
+
+    Returns:
+        list: [("system", 고정 프리픽스), ("human", 요청별 프롬프트)]
+    """
+    # 대화 히스토리 가져오기 (세션 요약 + 최근 메시지 원문) 및 요약 기반 대화 컨텍스트
+    conversation_history, context_info = build_prompt_history(session)
     conversation_str = "\n".join(conversation_history) if conversation_history else "대화 히스토리가 없습니다."
     
     # 세션 ID 가져오기 (세션 기반 목적지 감지를 위해)
     session_id = str(session.id) if session else None
     
-    # 대화 컨텍스트 추출
-    context_info = extract_conversation_context(conversation_history)
-    
     # 기존 일정 데이터 가져오기 (일정 변경 요청인 경우)
     existing_schedule_data = None
     existing_data_str = ""
@@ -107,8 +227,8 @@ def handle_schedule_request(user_input, session, request, is_schedule_modificati
         if existing_schedule_data:
             existing_data_str = json.dumps(existing_schedule_data, ensure_ascii=False, indent=2)
     
-    # 프롬프트 생성 (세션 기반 목적지 감지)
-    system_prompt = get_schedule_prompt(
+    # 프롬프트 생성 (세션 기반 목적지 감지) → 고정 프리픽스는 system 메시지로 맨 앞에
+    system_prefix, variable_prompt = get_schedule_prompt_parts(
         conversation_str=conversation_str,
         user_input=user_input,
         session_id=session_id,  # 세션 ID 전달
@@ -117,21 +237,70 @@ def handle_schedule_request(user_input, session, request, is_schedule_modificati
         context_info=context_info
     )
     
-    result = llm.invoke(f"{system_prompt}\n사용자 질문: {user_input}")
-    # LangChain 결과에서 실제 텍스트 추출
-    if hasattr(result, 'content'):
-        result = result.content
-    
-    # JSON 응답을 파싱하여 구조화된 데이터로 변환
+    llm_input = [
+        ("system", system_prefix),
+        ("human", f"{variable_prompt}\n사용자 질문: {user_input}"),
+    ]
+    fingerprint = record_prompt_prefix("schedule", system_prefix)
+    console.log(
+        f"📏 일정 프롬프트 크기: {count_tokens(system_prefix) + count_tokens(llm_input[1][1])} 토큰 "
+        f"(고정 프리픽스 {fingerprint}, 재사용률 {get_prompt_prefix_stats()['schedule']['prefix_reuse_rate']:.0%})"
+    )
+    return llm_input
+
+
+def select_schedule_policy(user_input, is_schedule_modification=False):
+    """일정 생성 모델 정책 (일정 변경 요청은 "modify" 의도로 선택)"""
+    return select_model_policy("schedule", user_input, intent="modify" if is_schedule_modification else None)
+
+
+def get_schedule_llm(policy):
+    """일정 생성용 모델 (SCHEDULE_JSON_MODE 면 공급자 JSON 모드, 타임아웃은 남은 요청 예산 안에서)"""
+    llm = get_policy_chat_model(policy, **CHAT_MODEL_OPTIONS)
+    bind_kwargs = call_timeout_kwargs(policy)
+    if SCHEDULE_JSON_MODE:
+        bind_kwargs["response_format"] = {"type": "json_object"}
+    return llm.bind(**bind_kwargs)
+
+
+def schedule_flight_key(llm_input, policy):
+    """일정 생성 호출 합치기 키"""
+    return flight_key("schedule", SCHEDULE_JSON_MODE, policy.tier, llm_input[0][1], llm_input[1][1])
+
+
+def make_activity_handler(on_token=None, on_activity=None):
+    """파서가 완성한 활동을 스트리밍 마크다운/좌표 검색 콜백으로 전달하는 함수 생성"""
+    streamed_days = set()
+
+    def handle_activity(day, activity, details):
+        if on_token:
+            # 원시 JSON 대신 완성된 활동을 마크다운으로 바로 표시
+            header = "" if day in streamed_days else f"## {day}\n\n"
+            streamed_days.add(day)
+            on_token(header + format_activity_markdown(activity, details))
+        if on_activity:
+            on_activity(day, activity, details)
+    return handle_activity
+
+
+def finish_schedule_result(parser):
+    """
+    증분 파서 결과를 사용자에게 보여줄 마크다운과 일정 데이터로 변환
+
+    Returns:
+        tuple: (결과 텍스트, 일정 데이터 딕셔너리 또는 None)
+    """
+    # JSON 응답을 구조화된 데이터로 변환
     try:
-        # JSON 부분만 추출 (```json ... ``` 형태일 수 있음)
-        json_text = result
-        if '```json' in result:
-            json_text = result.split('```json')[1].split('```')[0].strip()
-        elif '```' in result:
-            json_text = result.split('```')[1].split('```')[0].strip()
-        
-        schedule_data = json.loads(json_text)
+        schedule_data = parser.result()
+        if schedule_data is None:
+            # 응답이 중간에 끊기거나 깨진 경우 → 완성된 활동만이라도 사용
+            schedule_data = parser.partial_result()
+            if schedule_data is None:
+                raise ValueError("완성된 일정 활동이 없습니다")
+            schedule_data['summary'] = generate_complete_summary(schedule_data['schedule'])
+            activity_count = sum(len(acts) for acts in schedule_data['schedule'].values())
+            console.log(f"⚠️ 일정 JSON 이 불완전하여 완성된 활동 {activity_count}개만 사용")
         
         # ✅ Summary 후처리: 불완전한 요약 코스 자동 보완
         if 'schedule' in schedule_data and 'summary' in schedule_data:
@@ -153,27 +322,17 @@ def handle_schedule_request(user_input, session, request, is_schedule_modificati
             for day, activities in schedule_data['schedule'].items():
                 markdown_result += f"## {day}\n\n"
                 for activity, details in activities.items():
-                    markdown_result += f"### {activity}\n"
-                    markdown_result += f"- 장소: {details.get('장소', 'N/A')}\n"
-                    markdown_result += f"- 시간: {details.get('시간', 'N/A')}\n"
-                    markdown_result += f"- 비용: {details.get('비용', 'N/A')}\n"
-                    markdown_result += f"- 주의사항: {details.get('주의사항', 'N/A')}\n"
-                    markdown_result += "\n"
+                    markdown_result += format_activity_markdown(activity, details)
         
         if 'summary' in schedule_data:
             markdown_result += f"## 요약 코스\n{schedule_data['summary']}\n"
         
-        result = markdown_result
-        
-        # JSON 데이터를 세션에 저장 (지도에서 사용)
-        request.session['schedule_json'] = schedule_data
-        
-        return result, schedule_data
+        return markdown_result, schedule_data
         
-    except (ValueError, KeyError) as e:
+    except (ValueError, KeyError, AttributeError) as e:
         # JSON 파싱 실패 시 원본 텍스트 사용
         console.log(f"JSON 파싱 실패: {e}")
-        return result, None
+        return parser.text, None
 
 # 추가----
 def extract_location(user_input, session=None, request=None):
@@ -219,12 +378,25 @@ def extract_location(user_input, session=None, request=None):
 
     return None
 
-def handle_vlog_request(user_input, session, request=None):
+# 유튜브 검색 (에이전트 도구와 같은 메모 이름 → 같은 턴에 같은 검색어는 한 번만 호출)
+_memo_yt_search = memoized_tool("yt_search", yt_search)
+
+
+def search_vlog(user_input, session, request=None):
     """
-    브이로그 관련 요청을 처리하는 함수 (세션 ID별 schedule_json 활용 + 직전 맥락 반영)
+    브이로그 검색 (저장 없음, 채팅 턴의 부가 정보 단계용)
+
+    Returns:
+        tuple: (응답 딕셔너리, 프롬프트용 원문)
     """
-    # 최근 대화 히스토리 가져오기
-    conversation_history = get_conversation_history(session, limit=15)
+    search_term = vlog_search_term(user_input, session, request)
+    return build_vlog_reply(search_term, _memo_yt_search(search_term))
+
+
+def vlog_search_term(user_input, session, request=None):
+    """브이로그 검색어 결정 (현재 입력 → 직전 대화 → 세션 제목 → 기본값)"""
+    # 최근 대화 히스토리 가져오기 (세션 요약 + 최근 메시지 원문)
+    conversation_history, _ = build_prompt_history(session)
     conversation_str = "\n".join(conversation_history) if conversation_history else ""
 
     # 핵심 검색어 추출 (현재 입력에서 먼저 시도)
@@ -242,10 +414,16 @@ def handle_vlog_request(user_input, session, request=None):
         search_term = "여행 브이로그"  # 최종 fallback
 
     console.log(f"브이로그 검색어: {search_term} (세션 ID: {session.id})")
+    return search_term
+
+
 
-    # 유튜브 브이로그 검색
-    youtube_results = yt_search(search_term)
-    yt_html = _render_yt_cards(youtube_results)
+def build_vlog_reply(search_term, youtube_results):
+    """
+    브이로그 검색 결과(yt_search 결과 딕셔너리) → (응답 딕셔너리, 프롬프트용 원문)
+    """
+    videos = youtube_results.get("videos", []) if isinstance(youtube_results, dict) else (youtube_results or [])
+    yt_html = _render_yt_cards(videos)
 
     reply_html = f"""
     <div style="margin-bottom:8px;">
@@ -254,68 +432,81 @@ def handle_vlog_request(user_input, session, request=None):
     {yt_html}
     """
 
-    if session.title:
-        ChatMessage.objects.create(session=session, role="assistant", content=reply_html)
+    # 프롬프트용 원문은 카드 HTML 대신 영상 제목/링크 목록으로 저장
+    raw_content = f"{search_term} 관련 브이로그를 추천해드릴게요!\n" + "\n".join(
+        f"- {v.get('title', '')} ({v.get('url', '')})" for v in videos
+    )
 
-    return {
+    response = {
         "reply": "",
         "yt_html": reply_html,
-        "youtube": youtube_results,
+        "youtube": videos,
         "map": [],
         "save_button_enabled": False,
         "search_term": search_term
     }
+    return response, raw_content
 
 # 끝----
 
 
-def handle_simple_qna(user_input):
+def handle_simple_qna(user_input, on_token=None):
     """
     간단한 질문 답변을 처리하는 함수
     
     Args:
         user_input (str): 사용자 입력 메시지
+        on_token (callable, optional): 스트리밍 모드에서 생성된 토큰을 받을 콜백
         
     Returns:
         str: AI 응답 텍스트
     """
-    from openai import OpenAI
-    
-    # OpenAI SDK 초기화
-    client = OpenAI()
+    # OpenAI SDK 초기화 (settings.LLM_BACKEND 가 fake 면 로컬 가짜 클라이언트)
+    client = get_openai_client()
     
+    policy = select_model_policy("simple_qna", user_input)
+    messages = simple_qna_messages(user_input)
+
+    def call_llm():
+        completion = client.chat.completions.create(
+            **completion_kwargs(policy),   # 모델/최대 출력 토큰/temperature/타임아웃
+            messages=messages,
+            stream=bool(on_token)   # 스트리밍 모드면 토큰 단위로 수신
+        )
+        if on_token:
+            answer = ""
+            for chunk in completion:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    answer += delta
+                    on_token(delta)
+            return answer
+        return completion.choices[0].message.content   # 첫 번째 응답만 사용
+
+    # 같은 질문이 동시에 들어오면 OpenAI 호출은 한 번만 (나머지는 결과 공유)
+    with span("llm.qna"):
+        answer, shared = llm_flight.do(simple_qna_flight_key(policy, messages), call_llm)
+    if shared and on_token:
+        on_token(answer)   # 공유받은 답변은 한 번에 표시
+    return answer
+
+
+def simple_qna_messages(user_input):
+    """간단 질문용 메시지 목록"""
     # 간단 질문 → OpenAI SDK 사용
     # OpenAI SDK는 LangChain보다 응답 속도가 빠르고 단순한 작업에 적합
-    completion = client.chat.completions.create(
-        model="gpt-4o-mini",   # 모델 지정
-        messages=[
-            {"role": "system", "content": """# 🎯 여행 질문 답변 전문가
+    return [
+        {"role": "system", "content": SIMPLE_QNA_SYSTEM_PROMPT},
+        {"role": "user", "content": user_input}
+    ]
 
-**역할**: 국내 여행 전문가
-**목표**: 명확하고 실용적인 답변 제공
-- 사용자가 원하는 여행 기간(N박 M일)은 절대로 변경하지 않습니다.  
-- 추가 조건(특정 관광지, 혼자 여행, 아이 동반 등)이 들어와도 반드시 N박 M일 형식으로 일정을 구성합니다.  
-- 출력은 항상 Day1, Day2, … 형식으로 나누어 작성합니다.  
-- 각 일정에는 장소, 시간, 비용, 주의사항을 반드시 포함합니다.  
-- 사용자의 요청이 모호하거나 불완전해도 절대로 당일치기로 축소하지 않습니다.  
-- 브이로그, 유튜브 관련에 대해 물어보면 해당 지역과 관련된 유튜브 여행 브이로그 영상도 추천할 수 있습니다.  
-- 영어로 절대 답하지 마세요.
-- 사용자가 필요한 여행지와 여행일정을 추천하세요.
 
-## 🎯 답변 원칙
-1. **핵심 먼저**: 질문에 대한 직접적 답변
-2. **간결함**: 불필요한 정보 제거
-3. **실용성**: 실제 여행에 도움이 되는 정보
-4. **친근함**: 도움이 되는 톤 유지
+def simple_qna_flight_key(policy, messages):
+    """간단 질문 호출 합치기 키"""
+    return flight_key("simple_qna", policy.tier, policy.model, messages[0]["content"], messages[1]["content"])
 
-**형식**: 핵심 답변 → 부가 정보 → 실용적 팁"""},
-            {"role": "user", "content": user_input}
-        ]
-    )
-    return completion.choices[0].message.content   # 첫 번째 응답만 사용
 
-
-def handle_general_request(user_input, conversation_history, session=None):
+def handle_general_request(user_input, conversation_history, session=None, on_token=None, request_type=None):
     """
     일반적인 여행 관련 질문을 처리하는 함수 (개선된 버전)
     
@@ -323,65 +514,83 @@ def handle_general_request(user_input, conversation_history, session=None):
         user_input (str): 사용자 입력 메시지
         conversation_history (list): 대화 히스토리
         session (ChatSession): 현재 채팅 세션 (세션 기반 목적지 감지를 위해)
+        on_token (callable, optional): 스트리밍 모드에서 최종 답변 토큰을 받을 콜백
+        request_type (str, optional): 라우팅 테이블("general")로 이미 판단한 요청 유형
         
     Returns:
         str: AI 응답 텍스트
     """
-    # 일반 질문 → LangChain Agent 실행
-    tools = [
-        Tool(name="유튜브검색", func=yt_search, description="지역명/장소명으로 여행 브이로그, 맛집 리뷰, 관광지 영상을 찾아줍니다."),
-        Tool(name="카카오지도검색", func=kakao_geocode, description="장소명으로 검색하여 정확한 위도, 경도 좌표와 주소를 찾아줍니다."),
-        Tool(name="구글플레이스상세", func=google_place_details, description="장소명으로 검색하여 운영시간, 전화번호, 평점 등 상세 정보를 찾아줍니다."),
-        Tool(name="외부지식검색", func=search_external_knowledge, description="지역명이나 관광지명으로 역사, 문화, 특징 등 배경 정보를 찾아줍니다."),
-        Tool(name="날씨검색", func=get_weather_info, description="특정 지역의 현재 날씨와 기온을 확인합니다. 예: '서울 날씨', '부산 오늘 날씨'"),  # ✅ 추가됨
-    ]
+    prompt, request_type = build_general_prompt(user_input, conversation_history, session, request_type)
 
+    policy = select_model_policy("general", user_input, intent=request_type)
+    engine = select_tool_engine(request_type)
+
+    try:
+        if engine == ENGINE_PARALLEL:
+            # 병렬 함수 호출 엔진 (계획 1회 → 도구 동시 실행 → 종합 1회)
+            console.log(f"🧰 병렬 도구 엔진 실행 시작: {user_input}")
+            result = agent_output_text(run_parallel_tools(prompt, policy, request_type, on_token=on_token), user_input)
+        else:
+            # 일반 질문 → LangChain Agent 실행 (티어별 공용 에이전트 재사용, 요청별 상태는 input 으로 전달)
+            # 실행 시간/LLM 타임아웃은 남은 요청 예산 안으로 제한한 복사본 사용
+            agent = bind_request_deadline(get_general_agent(policy), policy)
+            annotate("engine", ENGINE_REACT)
+            console.log(f"🤖 AI 에이전트 실행 시작: {user_input}")
+            callbacks = [FinalAnswerTokenHandler(on_token)] if on_token else []
+            with span("agent"):   # LLM + 에이전트 도구 호출 전체 (도구별 시간은 각 단계 span 에 따로 기록)
+                result = agent.invoke({ 'input': prompt }, config={"callbacks": callbacks})
+            result = agent_output_text(result, user_input)
+        
+        # ✅ 좌표 정보 추출 및 포맷팅 (자연스러운 답변에서도 추출)
+        try:
+            # AI 응답에서 장소명들을 추출하여 좌표 검색
+            places_with_coords = extract_coordinates_from_response(result)
+            if places_with_coords:
+                console.log(f"📍 좌표 정보 추출 성공: {len(places_with_coords)}개 장소")
+                # 좌표 정보를 자연스럽게 응답에 통합
+                for place_info in places_with_coords:
+                    place_name = place_info.get('name', '')
+                    coords = place_info.get('coordinates', {})
+                    if coords and 'lat' in coords and 'lng' in coords:
+                        # 자연스럽게 좌표 정보 추가
+                        result = result.replace(
+                            place_name, 
+                            f"{place_name} (좌표: {coords['lat']}, {coords['lng']})"
+                        )
+            else:
+                console.log("📍 좌표 정보 없음")
+        except Exception as coord_error:
+            console.log(f"⚠️ 좌표 추출 중 오류: {coord_error}")
+            # 좌표 추출 실패해도 메인 응답은 유지
+            
+    except Exception as agent_error:
+        console.log(f"❌ Agent 실행 오류: {agent_error}")
+        import traceback
+        console.log(f"상세 오류: {traceback.format_exc()}")
+        
+        # Agent 오류 시 간단한 응답 생성
+        result = agent_error_reply(user_input)
+
+    console.log(f"✅ 최종 응답: {result[:100]}...")
+    return result
 
-    # Agent 초기화: ChatGPT 수준의 빠른 응답을 위한 최적화
-    agent = initialize_agent(
-        tools,
-        llm,
-        agent="zero-shot-react-description",  # Zero-shot 방식
-        verbose=False,                       # 로그 출력 비활성화 (성능 향상)
-        handle_parsing_errors="Check your output and make sure it conforms!",  # 파싱 에러 시 재시도
-        max_iterations=3,                    # 최대 3번 도구 호출 (파싱 에러 대응)
-        early_stopping_method="generate",    # 조기 종료 방법
-        return_intermediate_steps=True,      # 중간 단계 반환 활성화 (에러 디버깅용)
-        max_execution_time=20                # 최대 실행 시간 20초 (여유있게)
-    )
 
+def build_general_prompt(user_input, conversation_history, session=None, request_type=None):
+    """
+    일반 질문 에이전트 입력 프롬프트 생성
+
+    Returns:
+        tuple: (프롬프트, 요청 유형)
+    """
     # 입력 프롬프트 생성
     conversation_str = "\n".join(conversation_history) if conversation_history else "대화 히스토리가 없습니다."
     
-    # 사용자 요청 유형에 따른 맞춤형 prompt 생성 (더 정확한 판단)
-    request_type = ""
-    
     # 입력 텍스트 정리 (불필요한 접속사, 조사 제거)
     clean_input = user_input.lower().strip()
-    
-    # 맛집 관련 키워드 검사
-    if any(keyword in clean_input for keyword in ["맛집", "음식", "식당", "레스토랑", "카페"]):
-        request_type = "맛집 추천"
-
-    # 날씨 관련 키워드 검사
-    elif any(keyword in clean_input for keyword in ["날씨", "기온", "날씨 정보"]):
-        request_type = "날씨 정보"
-
-    # 브이로그/영상 관련 키워드 검사 (더 포괄적으로)
-    elif any(keyword in clean_input for keyword in ["브이로그", "vlog", "유튜브", "영상", "동영상", "비디오", "보여줘", "여행브이로그"]):
-        request_type = "브이로그 추천"
-
-    # 일정/여행 관련 키워드 검사 (추천/생성 요청일 때만 '여행 일정'으로 분류)
-    elif any(keyword in clean_input for keyword in ["일정", "여행", "코스", "플랜"]):
-        if any(intent in clean_input for intent in ["추천", "짜줘", "만들어", "생성", "계획해줘"]):
-            request_type = "여행 일정"
-        else:
-            request_type = "일반 여행 정보"
 
-    else:
-        request_type = "일반 여행 정보"
+    # 사용자 요청 유형 (호출 측에서 이미 라우팅했으면 그대로 사용, 아니면 라우팅 테이블로 판단)
+    request_type = request_type or router.route(clean_input, "general").name
 
-    
     # 디버깅을 위한 로그 출력
     console.log(f"원본 입력: '{user_input}'")
     console.log(f"정리된 입력: '{clean_input}'")
@@ -433,92 +642,69 @@ def handle_general_request(user_input, conversation_history, session=None):
     else:
         prompt = get_general_prompt(request_type, user_input, session_id=session_id, conversation_str=conversation_str)  # 세션 ID 전달
     
-    # 랭체인 에이전트 실행
-    try:
-        console.log(f"🤖 AI 에이전트 실행 시작: {user_input}")
-        console.log(f"📝 프롬프트: {prompt[:200]}...")
-        
-        result = agent.invoke({ 'input': prompt })
-        console.log("🤖 AI 에이전트 원본 결과:", result)
-        
-        # LangChain Agent 결과에서 실제 텍스트 추출 (개선된 버전)
-        if isinstance(result, dict):
+    console.log(f"📝 프롬프트: {prompt[:200]}...")
+    fingerprint = record_prompt_prefix("general", get_general_system_prefix(request_type))
+    reuse_rate = get_prompt_prefix_stats()["general"]["prefix_reuse_rate"]
+    console.log(f"📏 일반 질문 프롬프트 크기: {count_tokens(prompt)} 토큰 (고정 프리픽스 {fingerprint}, 재사용률 {reuse_rate:.0%})")
+    return prompt, request_type
+
+
+def agent_output_text(result, user_input):
+    """에이전트 실행 결과에서 응답 텍스트 추출"""
+    console.log("🤖 AI 에이전트 원본 결과:", result)
+    
+    # LangChain Agent 결과에서 실제 텍스트 추출 (개선된 버전)
+    if isinstance(result, dict):
+        if 'output' in result:
+            result = result['output']
+            console.log("✅ output에서 결과 추출 성공")
+        elif 'intermediate_steps' in result:
+            # 중간 단계가 있는 경우 마지막 응답 추출
+            console.log("🔄 중간 단계 결과:", result.get('intermediate_steps', []))
             if 'output' in result:
                 result = result['output']
-                console.log("✅ output에서 결과 추출 성공")
-            elif 'intermediate_steps' in result:
-                # 중간 단계가 있는 경우 마지막 응답 추출
-                console.log("🔄 중간 단계 결과:", result.get('intermediate_steps', []))
-                if 'output' in result:
-                    result = result['output']
-                else:
-                    # 중간 단계에서 최종 응답 생성
-                    steps = result.get('intermediate_steps', [])
-                    if steps:
-                        # 마지막 도구 실행 결과를 기반으로 응답 생성
-                        last_step = steps[-1]
-                        if isinstance(last_step, tuple) and len(last_step) >= 2:
-                            tool_result = last_step[1]
-                            console.log("🔧 마지막 도구 결과:", tool_result)
-                            result = f"검색 결과를 바탕으로 {user_input}에 대한 정보를 제공해드립니다.\n\n{tool_result}"
-                        else:
-                            result = f"안녕하세요! {user_input}에 대한 정보를 찾아보겠습니다."
-                    else:
-                        result = "죄송합니다. 응답을 생성하는 중에 문제가 발생했습니다."
             else:
-                console.log("❌ 예상치 못한 결과 구조:", result)
-                result = str(result)
-        elif hasattr(result, 'content'):
-            result = result.content
-            console.log("✅ content에서 결과 추출 성공")
-        elif isinstance(result, str):
-            result = result
-            console.log("✅ 문자열 결과 사용")
+                # 중간 단계에서 최종 응답 생성
+                steps = result.get('intermediate_steps', [])
+                if steps:
+                    # 마지막 도구 실행 결과를 기반으로 응답 생성
+                    last_step = steps[-1]
+                    if isinstance(last_step, tuple) and len(last_step) >= 2:
+                        tool_result = last_step[1]
+                        console.log("🔧 마지막 도구 결과:", tool_result)
+                        result = f"검색 결과를 바탕으로 {user_input}에 대한 정보를 제공해드립니다.\n\n{tool_result}"
+                    else:
+                        result = f"안녕하세요! {user_input}에 대한 정보를 찾아보겠습니다."
+                else:
+                    result = "죄송합니다. 응답을 생성하는 중에 문제가 발생했습니다."
         else:
-            console.log("❌ 알 수 없는 결과 타입:", type(result), result)
+            console.log("❌ 예상치 못한 결과 구조:", result)
             result = str(result)
-        
-        # 결과가 비어있거나 너무 짧은 경우 처리
-        if not result or len(result.strip()) < 10:
-            console.log("⚠️ 결과가 너무 짧거나 비어있음, 대체 응답 생성")
-            result = f"안녕하세요! {user_input}에 대한 정보를 찾아보겠습니다. 잠시만 기다려주세요."
-        
-        # ✅ 좌표 정보 추출 및 포맷팅 (자연스러운 답변에서도 추출)
-        try:
-            # AI 응답에서 장소명들을 추출하여 좌표 검색
-            places_with_coords = extract_coordinates_from_response(result)
-            if places_with_coords:
-                console.log(f"📍 좌표 정보 추출 성공: {len(places_with_coords)}개 장소")
-                # 좌표 정보를 자연스럽게 응답에 통합
-                for place_info in places_with_coords:
-                    place_name = place_info.get('name', '')
-                    coords = place_info.get('coordinates', {})
-                    if coords and 'lat' in coords and 'lng' in coords:
-                        # 자연스럽게 좌표 정보 추가
-                        result = result.replace(
-                            place_name, 
-                            f"{place_name} (좌표: {coords['lat']}, {coords['lng']})"
-                        )
-            else:
-                console.log("📍 좌표 정보 없음")
-        except Exception as coord_error:
-            console.log(f"⚠️ 좌표 추출 중 오류: {coord_error}")
-            # 좌표 추출 실패해도 메인 응답은 유지
-            
-    except Exception as agent_error:
-        console.log(f"❌ Agent 실행 오류: {agent_error}")
-        import traceback
-        console.log(f"상세 오류: {traceback.format_exc()}")
-        
-        # Agent 오류 시 간단한 응답 생성
-        if "맛집" in user_input or "음식" in user_input:
-            result = f"죄송합니다. 현재 {user_input}에 대한 정보를 가져오는 중에 오류가 발생했습니다."
-        elif "브이로그" in user_input or "유튜브" in user_input:
-            result = f"죄송합니다. 현재 {user_input}에 대한 영상을 찾는 중에 오류가 발생했습니다."
-        elif "날씨" in user_input:  # ✅ 날씨 오류 처리도 따로 분기
-            result = f"죄송합니다. 현재 {user_input}에 대한 날씨 정보를 가져오는 중에 오류가 발생했습니다."
-        else:
-            result = f"죄송합니다. 현재 {user_input}에 대한 정보를 처리하는 중에 오류가 발생했습니다."
+    elif hasattr(result, 'content'):
+        result = result.content
+        console.log("✅ content에서 결과 추출 성공")
+    elif isinstance(result, str):
+        result = result
+        console.log("✅ 문자열 결과 사용")
+    else:
+        console.log("❌ 알 수 없는 결과 타입:", type(result), result)
+        result = str(result)
+    
+    # 결과가 비어있거나 너무 짧은 경우 처리
+    if not result or len(result.strip()) < 10:
+        console.log("⚠️ 결과가 너무 짧거나 비어있음, 대체 응답 생성")
+        result = f"안녕하세요! {user_input}에 대한 정보를 찾아보겠습니다. 잠시만 기다려주세요."
+    return result
 
-    console.log(f"✅ 최종 응답: {result[:100]}...")
+
+def agent_error_reply(user_input):
+    """에이전트 실행 실패 시 요청 종류별 대체 응답"""
+    if "맛집" in user_input or "음식" in user_input:
+        result = f"죄송합니다. 현재 {user_input}에 대한 정보를 가져오는 중에 오류가 발생했습니다."
+    elif "브이로그" in user_input or "유튜브" in user_input:
+        result = f"죄송합니다. 현재 {user_input}에 대한 영상을 찾는 중에 오류가 발생했습니다."
+    elif "날씨" in user_input:  # ✅ 날씨 오류 처리도 따로 분기
+        result = f"죄송합니다. 현재 {user_input}에 대한 날씨 정보를 가져오는 중에 오류가 발생했습니다."
+    else:
+        result = f"죄송합니다. 현재 {user_input}에 대한 정보를 처리하는 중에 오류가 발생했습니다."
     return result
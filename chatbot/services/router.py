@@ -0,0 +1,207 @@
+"""
+의도 라우팅 엔진
+
+이 모듈은 사용자 메시지를 어떤 처리 경로(route)로 보낼지 결정합니다.
+- 라우팅 규칙은 아래 ROUTING_TABLES 에 선언적으로 정의 (위에 있는 규칙이 우선)
+- 모든 테이블의 키워드를 KeywordMatcher 하나로 컴파일하여 메시지를 한 번만 훑음
+- 경로별 호출 수 / 오류 수 / 처리 시간 히스토그램을 집계하여
+  어떤 경로가 LLM 시간을 가장 많이 쓰는지 확인할 수 있음
+"""
+
+# 표준 라이브러리
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# 외부 모듈
+from rich.console import Console
+
+# 로컬 모듈
+from ..utils.matcher import KeywordMatcher
+from ..utils.youtube import VLOG_KEYWORDS
+
+console = Console()
+
+# 라우팅 결과: 경로 이름 + 매칭된 키워드
+Route = namedtuple("Route", ["name", "keywords"])
+
+# -------------------- 라우팅 테이블 --------------------
+# rules: 위에서부터 순서대로 검사, 처음 조건을 만족한 규칙이 선택됨
+#   - keywords: 하나라도 포함되면 조건 만족
+#   - requires: (선택) 이 목록의 키워드도 하나 이상 포함되어야 함
+# default: 어떤 규칙도 맞지 않을 때의 경로 (None 이면 "매칭 없음")
+ROUTING_TABLES = {
+    # chatbot_view 처리 경로 (순서 = 기존 if/elif 우선순위)
+    "chat": {
+        "rules": [
+            {"name": "schedule", "keywords": ["일정"]},
+            {"name": "simple_qna", "keywords": [
+                "간단", "단답",
+                "주차장", "가성비", "팁", "추천", "어디", "뭐가", "어떤", "어느",
+                "좋은", "나쁜", "비용", "요금", "가격", "얼마", "시간", "언제",
+                "방법", "어떻게", "왜", "이유", "장점", "단점", "차이", "비교",
+                "주의", "조심", "준비", "필요", "챙겨", "가져", "입장료",
+            ]},
+            {"name": "vlog", "keywords": VLOG_KEYWORDS},
+            {"name": "place_details", "keywords": ["상세", "정보"]},
+        ],
+        "default": "general",
+    },
+    # 기존 일정 변경 요청 여부
+    "schedule_modification": {
+        "rules": [
+            {"name": "modify", "keywords": [
+                "일정 변경", "일정 수정", "일정 바꿔", "일정 다시", "일정 재", "일정 수정해",
+                "일정 바꿔줘", "일정 다시 짜", "일정 다시 만들어", "일정 다시 추천",
+                "일정 중에", "일정에서", "일정의", "일정을", "일정을 다른거로", "일정을 바꿔",
+            ]},
+        ],
+        "default": None,
+    },
+    # 브이로그 카드 추가 여부 (응답 후처리)
+    "vlog": {
+        "rules": [{"name": "vlog", "keywords": VLOG_KEYWORDS}],
+        "default": None,
+    },
+    # 첫 메시지의 세션 제목
+    "session_title": {
+        "rules": [
+            {"name": "🗓 여행 일정 추천", "keywords": ["일정"]},
+            {"name": "🍴 맛집 추천", "keywords": ["맛집"]},
+            {"name": "🎥 여행 브이로그 추천", "keywords": ["브이로그", "유튜브"]},
+        ],
+        "default": None,
+    },
+    # handle_general_request 의 요청 유형
+    "general": {
+        "rules": [
+            {"name": "맛집 추천", "keywords": ["맛집", "음식", "식당", "레스토랑", "카페"]},
+            {"name": "날씨 정보", "keywords": ["날씨", "기온", "날씨 정보"]},
+            {"name": "브이로그 추천", "keywords": [
+                "브이로그", "vlog", "유튜브", "영상", "동영상", "비디오", "보여줘", "여행브이로그",
+            ]},
+            # 추천/생성 요청일 때만 '여행 일정'으로 분류 (아니면 기본값)
+            {"name": "여행 일정", "keywords": ["일정", "여행", "코스", "플랜"],
+             "requires": ["추천", "짜줘", "만들어", "생성", "계획해줘"]},
+        ],
+        "default": "일반 여행 정보",
+    },
+}
+
+# 처리 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+
+
+class RouteMatch:
+    """메시지 1건의 키워드 매칭 결과 (테이블별로 경로를 꺼내 쓸 수 있음)"""
+
+    def __init__(self, router, hits):
+        self._router = router
+        self._hits = hits   # (테이블, 규칙 번호, 그룹) → [키워드]
+
+    def route(self, table):
+        """테이블 규칙을 우선순위대로 적용하여 Route 반환"""
+        spec = self._router.tables[table]
+        for index, rule in enumerate(spec["rules"]):
+            matched = self._hits.get((table, index, "keywords"))
+            if not matched:
+                continue
+            if rule.get("requires"):
+                required = self._hits.get((table, index, "requires"))
+                if not required:
+                    continue
+                matched = matched + required
+            return Route(rule["name"], matched)
+        return Route(spec["default"], [])
+
+    def matched(self, table):
+        """테이블에서 규칙이 선택되었는지 여부 (기본값 제외)"""
+        return bool(self.route(table).keywords)
+
+
+class IntentRouter:
+    """
+    선언적 라우팅 테이블을 하나의 KeywordMatcher 로 컴파일한 라우터
+
+    사용 예:
+        match = router.match(user_input)
+        match.route("chat")           # Route(name="schedule", keywords=["일정"])
+        match.matched("vlog")         # True / False
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        keywords = {}
+        for table, spec in tables.items():
+            for index, rule in enumerate(spec["rules"]):
+                for group in ("keywords", "requires"):
+                    for keyword in rule.get(group, []):
+                        keywords.setdefault(keyword.lower(), []).append((table, index, group))
+        self.matcher = KeywordMatcher(keywords, ignore_case=True)
+
+    def match(self, text):
+        """메시지를 한 번만 훑어서 모든 테이블의 매칭 결과를 만듦"""
+        hits = {}
+        for _, _, keyword, targets in self.matcher.iter_matches((text or "").strip()):
+            for target in targets:
+                found = hits.setdefault(target, [])
+                if keyword not in found:
+                    found.append(keyword)
+        return RouteMatch(self, hits)
+
+    def route(self, text, table):
+        """단일 테이블 라우팅 편의 함수"""
+        return self.match(text).route(table)
+
+
+router = IntentRouter(ROUTING_TABLES)
+
+
+# -------------------- 경로별 지표 --------------------
+_metrics_lock = threading.Lock()
+_metrics = {}   # 경로 → {"count", "errors", "total_seconds", "buckets"}
+
+
+def record_route(name, seconds, error=False):
+    """경로 1회 처리 결과 기록"""
+    with _metrics_lock:
+        stats = _metrics.setdefault(name, {
+            "count": 0,
+            "errors": 0,
+            "total_seconds": 0.0,
+            "buckets": {str(b): 0 for b in LATENCY_BUCKETS} | {"inf": 0},
+        })
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        if error:
+            stats["errors"] += 1
+        bucket = next((str(b) for b in LATENCY_BUCKETS if seconds <= b), "inf")
+        stats["buckets"][bucket] += 1
+        return stats["count"], stats["total_seconds"]
+
+
+@contextmanager
+def track_route(name):
+    """with 블록의 처리 시간을 경로 지표에 기록"""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        count, total = record_route(name, elapsed, error)
+        console.log(f"⏱️ 경로 '{name}' 처리 {elapsed:.2f}s (누적 {count}회, 평균 {total / count:.2f}s)")
+
+
+def get_route_stats():
+    """경로별 호출 수 / 오류 수 / 평균·누적 처리 시간 / 히스토그램 반환 (누적 시간 큰 순)"""
+    with _metrics_lock:
+        stats = {name: dict(s, buckets=dict(s["buckets"])) for name, s in _metrics.items()}
+    for s in stats.values():
+        s["avg_seconds"] = round(s["total_seconds"] / s["count"], 3) if s["count"] else 0
+        s["total_seconds"] = round(s["total_seconds"], 3)
+    return dict(sorted(stats.items(), key=lambda item: item[1]["total_seconds"], reverse=True))
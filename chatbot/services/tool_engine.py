@@ -0,0 +1,238 @@
+"""
+병렬 함수 호출(function calling) 도구 엔진
+
+일반 질문을 ReAct 에이전트 대신 모델의 네이티브 함수 호출로 처리합니다.
+- 1차 호출(계획): 필요한 도구 호출을 한 번에 모두 요청받음 (도구 없이 답할 수 있으면 바로 답변)
+- 도구 실행: 요청된 도구들을 동시에 실행 (각 도구는 요청 Deadline 안에서 타임아웃)
+- 2차 호출(종합): 도구 결과를 모아 최종 답변 생성 (스트리밍)
+ReAct 에이전트는 도구 1개당 LLM 왕복 1회 + 도구 직렬 실행이지만, 이 엔진은 LLM 호출이 최대 2회입니다.
+라우팅 의도(general 테이블)별로 엔진을 고를 수 있어 settings.GENERAL_TOOL_ENGINES 로 A/B 비교가 가능합니다.
+"""
+
+# 표준 라이브러리
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Django 및 외부 모듈
+from django.conf import settings
+from django.db import connections
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from rich.console import Console
+
+# 로컬 모듈
+from ..utils.youtube import yt_search, ayt_search
+from ..utils.maps import google_place_details, kakao_geocode, agoogle_place_details, akakao_geocode
+from ..utils.knowledge import search_external_knowledge, asearch_external_knowledge
+from ..utils.weather import get_weather_info, aget_weather_info
+from ..utils.model_policy import call_timeout_kwargs, get_policy_chat_model
+from ..utils.prompt_cache import record_usage
+from ..utils.prompt_templates import get_general_system_prefix
+from ..utils.tracing import span, annotate, bind_context
+from ..utils.tokens import truncate_tokens
+from ..utils.tool_memo import memoized_tool
+
+console = Console()
+
+# 엔진 이름
+ENGINE_REACT = "react"        # 기존 zero-shot-react 에이전트
+ENGINE_PARALLEL = "parallel"  # 병렬 함수 호출
+
+# 라우팅 의도(general 테이블) → 엔진 ("default" 는 나머지 의도, settings.py 에서 재정의 가능)
+GENERAL_TOOL_ENGINES = {"default": ENGINE_REACT, **getattr(settings, "GENERAL_TOOL_ENGINES", {})}
+TOOL_ENGINE_MAX_CALLS = getattr(settings, "TOOL_ENGINE_MAX_CALLS", 5)                 # 한 턴에 실행할 최대 도구 호출 수
+TOOL_RESULT_MAX_TOKENS = getattr(settings, "TOOL_RESULT_MAX_TOKENS", 400)             # 종합 호출에 넣는 도구 결과 1건 최대 토큰
+
+# 함수 호출용 도구 (함수 이름은 영문만 허용되므로 label 에 기존 한글 도구명 유지)
+# 메모 이름은 에이전트 도구와 같게 두어 같은 요청의 답변 후처리(좌표 추출)와 결과 공유
+ToolSpec = namedtuple("ToolSpec", ["name", "label", "func", "afunc", "description"])
+
+
+def _tool_spec(name, label, memo, func, afunc, description):
+    return ToolSpec(name, label, memoized_tool(memo, func), memoized_tool(memo, afunc), description)
+
+
+TOOL_SPECS = [
+    _tool_spec("youtube_search", "유튜브검색", "yt_search", yt_search, ayt_search,
+               "지역명/장소명으로 여행 브이로그, 맛집 리뷰, 관광지 영상을 찾아줍니다."),
+    _tool_spec("kakao_place_search", "카카오지도검색", "kakao_geocode", kakao_geocode, akakao_geocode,
+               "장소명으로 검색하여 정확한 위도, 경도 좌표와 주소를 찾아줍니다."),
+    _tool_spec("google_place_details", "구글플레이스상세", "google_place_details", google_place_details, agoogle_place_details,
+               "장소명으로 검색하여 운영시간, 전화번호, 평점 등 상세 정보를 찾아줍니다."),
+    _tool_spec("external_knowledge_search", "외부지식검색", "external_knowledge", search_external_knowledge, asearch_external_knowledge,
+               "지역명이나 관광지명으로 역사, 문화, 특징 등 배경 정보를 찾아줍니다."),
+    _tool_spec("weather_search", "날씨검색", "weather", get_weather_info, aget_weather_info,
+               "특정 지역의 현재 날씨와 기온을 확인합니다. 예: '서울 날씨', '부산 오늘 날씨'"),
+]
+TOOLS_BY_NAME = {spec.name: spec for spec in TOOL_SPECS}
+
+# OpenAI tools 형식 스키마 (모든 도구가 검색어 1개를 받음)
+TOOL_SCHEMAS = [
+    {
+        "type": "function",
+        "function": {
+            "name": spec.name,
+            "description": f"[{spec.label}] {spec.description}",
+            "parameters": {
+                "type": "object",
+                "properties": {"query": {"type": "string", "description": "검색어 (지역명/장소명)"}},
+                "required": ["query"],
+            },
+        },
+    }
+    for spec in TOOL_SPECS
+]
+
+PARALLEL_TOOL_INSTRUCTION = f"""
+## 도구 호출 방식
+- 위 도구들은 함수로 제공됩니다: {", ".join(f"{spec.label}={spec.name}" for spec in TOOL_SPECS)}
+- 답변에 필요한 도구 호출을 **이번 한 번에 모두** 요청하세요. 도구 결과를 본 뒤 추가 호출은 할 수 없습니다.
+- 도구 없이 답할 수 있는 질문이면 도구를 호출하지 말고 바로 답변하세요.
+"""
+
+SYNTHESIS_INSTRUCTION = "위 도구 결과만 근거로 요청에 대한 최종 답변을 작성하세요. 도구 결과가 없거나 오류인 항목은 추측하지 말고 생략하세요."
+
+
+def select_tool_engine(request_type):
+    """라우팅 의도에 맞는 도구 엔진 이름 ("react" | "parallel")"""
+    return GENERAL_TOOL_ENGINES.get(request_type, GENERAL_TOOL_ENGINES["default"])
+
+
+def _planning_messages(prompt, request_type):
+    """계획 호출 메시지 (고정 프리픽스는 system 으로 분리하여 프롬프트 캐시 유지)"""
+    prefix = get_general_system_prefix(request_type)
+    if prompt.startswith(prefix):
+        system, user = prefix, prompt[len(prefix):].lstrip()
+    else:
+        system, user = "", prompt
+    return [SystemMessage(content=system + PARALLEL_TOOL_INSTRUCTION), HumanMessage(content=user)]
+
+
+def _models(policy):
+    """(계획용 모델, 종합용 모델) — 둘 다 남은 요청 예산 안의 타임아웃 적용"""
+    from .chat_handlers import CHAT_MODEL_OPTIONS   # 순환 import 방지
+    llm = get_policy_chat_model(policy, **CHAT_MODEL_OPTIONS)
+    timeout = call_timeout_kwargs(policy)
+    planner = llm.bind_tools(TOOL_SCHEMAS, parallel_tool_calls=True).bind(**timeout)
+    return planner, llm.bind(**timeout)
+
+
+def _planned_calls(ai_message):
+    """계획 응답의 도구 호출 목록 (최대 TOOL_ENGINE_MAX_CALLS 개, 나머지는 생략)"""
+    calls = list(getattr(ai_message, "tool_calls", None) or [])
+    planned = calls[:TOOL_ENGINE_MAX_CALLS]
+    console.log(f"🧰 병렬 도구 계획: {[(call['name'], call['args'].get('query')) for call in planned]}")
+    if len(calls) > len(planned):
+        console.log(f"⚠️ 도구 호출 {len(calls) - len(planned)}개 생략 (최대 {TOOL_ENGINE_MAX_CALLS}개)")
+    return calls, planned
+
+
+def _tool_text(call, result):
+    """도구 결과 → 종합 호출에 넣을 텍스트 (리스트/딕셔너리는 문자열로, 토큰 상한 적용)"""
+    if isinstance(result, Exception):
+        return f"{call['name']} 오류: {result}"
+    return truncate_tokens(str(result), TOOL_RESULT_MAX_TOKENS)
+
+
+def _run_tool(call):
+    """도구 1개 실행 (작업 스레드 전용, 알 수 없는 도구/예외는 결과 텍스트로 전달)"""
+    spec = TOOLS_BY_NAME.get(call["name"])
+    if spec is None:
+        return ValueError(f"알 수 없는 도구: {call['name']}")
+    try:
+        return spec.func(call["args"].get("query", ""))
+    except Exception as e:
+        console.log(f"❌ 도구 실행 오류 ({spec.label}): {e}")
+        return e
+    finally:
+        # 작업 스레드에서 열린 DB 연결(지오코딩 캐시 조회용)을 닫아 누수 방지
+        connections.close_all()
+
+
+async def _arun_tool(call):
+    """_run_tool 의 비동기 버전"""
+    spec = TOOLS_BY_NAME.get(call["name"])
+    if spec is None:
+        return ValueError(f"알 수 없는 도구: {call['name']}")
+    try:
+        return await spec.afunc(call["args"].get("query", ""))
+    except Exception as e:
+        console.log(f"❌ 도구 실행 오류 ({spec.label}): {e}")
+        return e
+
+
+def _synthesis_messages(messages, ai_message, calls, planned, results):
+    """종합 호출 메시지 (요청된 모든 tool_call_id 에 결과를 하나씩 붙임)"""
+    texts = {call["id"]: _tool_text(call, result) for call, result in zip(planned, results)}
+    tool_messages = [
+        ToolMessage(content=texts.get(call["id"], "호출 수 제한으로 실행하지 않음"), tool_call_id=call["id"])
+        for call in calls
+    ]
+    return messages + [ai_message] + tool_messages + [HumanMessage(content=SYNTHESIS_INSTRUCTION)]
+
+
+def run_parallel_tools(prompt, policy, request_type, on_token=None):
+    """
+    병렬 함수 호출 엔진으로 일반 질문 처리
+
+    Args:
+        prompt (str): build_general_prompt() 결과
+        policy (ModelPolicy): "general" 모델 정책
+        request_type (str): 라우팅 의도 (고정 프리픽스 분리용)
+        on_token (callable, optional): 최종 답변 토큰 콜백 (스트리밍 모드)
+
+    Returns:
+        str: 최종 답변 텍스트
+    """
+    annotate("engine", ENGINE_PARALLEL)
+    planner, synthesizer = _models(policy)
+    messages = _planning_messages(prompt, request_type)
+
+    with span("llm.plan"):
+        ai_message = planner.invoke(messages)
+    record_usage("general", ai_message.usage_metadata)
+
+    calls, planned = _planned_calls(ai_message)
+    if not calls:
+        # 도구 없이 바로 답변 → LLM 호출 1회로 종료
+        if on_token and ai_message.content:
+            on_token(ai_message.content)
+        return ai_message.content
+
+    with span("tools"), ThreadPoolExecutor(max_workers=len(planned), thread_name_prefix="tool-engine") as executor:
+        futures = [executor.submit(bind_context(_run_tool), call) for call in planned]
+        results = [future.result() for future in futures]
+
+    answer, usage = "", None
+    with span("llm.synthesis"):
+        for chunk in synthesizer.stream(_synthesis_messages(messages, ai_message, calls, planned, results)):
+            if chunk.content:
+                answer += chunk.content
+                if on_token:
+                    on_token(chunk.content)
+            usage = chunk.usage_metadata or usage
+    record_usage("general", usage)
+    return answer
+
+
+async def arun_parallel_tools(prompt, policy, request_type):
+    """run_parallel_tools 의 비동기 버전 (도구는 비동기 구현으로 동시에 await)"""
+    annotate("engine", ENGINE_PARALLEL)
+    planner, synthesizer = _models(policy)
+    messages = _planning_messages(prompt, request_type)
+
+    with span("llm.plan"):
+        ai_message = await planner.ainvoke(messages)
+    record_usage("general", ai_message.usage_metadata)
+
+    calls, planned = _planned_calls(ai_message)
+    if not calls:
+        return ai_message.content
+
+    with span("tools"):
+        results = await asyncio.gather(*(_arun_tool(call) for call in planned))
+
+    with span("llm.synthesis"):
+        answer = await synthesizer.ainvoke(_synthesis_messages(messages, ai_message, calls, planned, list(results)))
+    record_usage("general", answer.usage_metadata)
+    return answer.content
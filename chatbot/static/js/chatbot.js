@@ -114,7 +114,7 @@ function scrollToBottom() {
   }
 }
 
-// ✅ 메시지 전송 (사용자 입력 → Django chatbot_view POST 요청)
+// ✅ 메시지 전송 (사용자 입력 → Django chatbot_stream_view POST 요청, SSE 스트리밍)
 async function sendMessage(event) {
   event.preventDefault(); // form 기본 동작 방지
   const input  = document.getElementById("chat-input-box");
@@ -136,8 +136,8 @@ async function sendMessage(event) {
   scrollToBottom();
 
   try {
-    // Django 서버로 메시지 전송
-    const response = await fetch("/chatbot/", {
+    // Django 서버로 메시지 전송 (스트리밍 엔드포인트)
+    const response = await fetch("/chatbot/stream/", {
       method: "POST",
       headers: { 
         "X-CSRFToken": CSRF_TOKEN,  // Django CSRF 보호
@@ -147,133 +147,259 @@ async function sendMessage(event) {
     });
 
     if (!response.ok) throw new Error("네트워크 오류");
-    const data = await response.json();
 
-    // 로그인 필요 시 처리
-    if (data.login_required) {
-      if (confirm("로그인이 필요합니다. 로그인 하시겠습니까?")) {
-        window.location.href = "/login/";
+    // 스트림이 아닌 응답 (로그인 필요 등) → 기존 JSON 처리
+    const contentType = response.headers.get("Content-Type") || "";
+    if (!contentType.includes("text/event-stream")) {
+      const data = await response.json();
+
+      // 로그인 필요 시 처리
+      if (data.login_required) {
+        if (confirm("로그인이 필요합니다. 로그인 하시겠습니까?")) {
+          window.location.href = "/login/";
+        }
+        return;
       }
+      renderBotResponse(data, userText);
       return;
     }
 
-    // 일반 텍스트 응답 (Markdown 파싱 후 출력)
-    if (!data.yt_html && data.reply) {
-      const mdHtml = marked.parse(data.reply);
-      const botWrapper = document.createElement("div");
-      botWrapper.className = "bot-message-wrapper";
-      const now2 = new Date();
-      const timeString2 = now2.toLocaleTimeString("ko-KR", { hour: "2-digit", minute: "2-digit" });
+    // ✅ 스트리밍 응답 처리
+    const rendered = { botWrapper: null, ytRendered: false };
+    let streamedText = "";
+    let finalData = null;
+    let renderScheduled = false;
+
+    // 토큰이 올 때마다 말풍선 갱신 (프레임당 1회로 제한)
+    const renderStreamedText = () => {
+      if (!rendered.botWrapper) rendered.botWrapper = createBotBubble(chatBox);
+      if (renderScheduled) return;
+      renderScheduled = true;
+      requestAnimationFrame(() => {
+        renderScheduled = false;
+        if (finalData) return;  // 최종 응답으로 이미 교체된 경우
+        rendered.botWrapper.querySelector(".bot-text").innerHTML = marked.parse(streamedText);
+        scrollToBottom();
+      });
+    };
 
-      botWrapper.innerHTML = `
-        <i class="fab fa-github-alt bot-floating-icon"></i>
-        <div class="message bot-message">
-          ${mdHtml}
-          <div class="timestamp">${timeString2}</div>
-        </div>
-      `;
-      chatBox.appendChild(botWrapper);
-      convertYoutubeLinks(botWrapper); // botWrapper로 변경
-      scrollToBottom();
-    }
+    await readEventStream(response, (eventName, payload) => {
+      switch (eventName) {
+        case "token":     // LLM 토큰
+          streamedText += payload.text;
+          renderStreamedText();
+          break;
+        case "reset":     // 폴백으로 답변을 다시 생성하는 경우
+          streamedText = "";
+          renderStreamedText();
+          break;
+        case "reply":     // 최종 본문 확정
+          streamedText = payload.reply || "";
+          if (streamedText) renderStreamedText();
+          break;
+        case "places":    // 좌표 검색 완료 → 지도 표시
+          if (payload.places && payload.places.length > 0 && typeof kakao !== 'undefined' && kakao.maps) {
+            showPlacesOnChatbotMap(payload.places);
+          }
+          break;
+        case "vlog":      // 브이로그 카드
+          if (payload.yt_html) {
+            renderYoutubeCards(chatBox, payload.yt_html, userText);
+            rendered.ytRendered = true;
+          }
+          break;
+        case "done":      // 전체 응답 데이터 (JSON 응답과 동일한 형식)
+          finalData = payload;
+          break;
+        case "error":
+          console.error('스트리밍 처리 중 오류:', payload.message);
+          break;
+      }
+    });
 
-    // 유튜브 카드 응답
-    if (data.yt_html) {
-      const ytWrapper = document.createElement("div");
-      ytWrapper.className = "bot-message-wrapper";
-      const ytTime = new Date().toLocaleTimeString("ko-KR", { hour: "2-digit", minute: "2-digit" });
+    if (finalData) renderBotResponse(finalData, userText, rendered);
 
-      ytWrapper.innerHTML = `
-        <i class="fab fa-github-alt bot-floating-icon"></i>
-        <div class="message bot-message">
-          <div class="intro-text"><b>${userText}</b> 관련 브이로그 추천 영상입니다 😊</div>
-          ${data.yt_html}
-          <div class="timestamp">${ytTime}</div>
-        </div>
-      `;
-
-      chatBox.appendChild(ytWrapper);
-      scrollToBottom();
+  } catch (err) {
+    console.error('메시지 전송 중 오류:', err);
+    // 오류 메시지 제거 - 사용자에게 불필요한 오류 표시 방지
+  }
+}
+
+// ✅ SSE(Server-Sent Events) 스트림 파서: fetch 응답 본문을 읽어 이벤트마다 콜백 호출
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder("utf-8");
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // 이벤트는 빈 줄("\n\n")로 구분됨
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+
+      let eventName = "message";
+      const dataLines = [];
+      frame.split("\n").forEach(line => {
+        if (line.startsWith("event:")) eventName = line.slice(6).trim();
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+        // ":" 로 시작하는 줄은 연결 유지용 주석 → 무시
+      });
+      if (dataLines.length > 0) {
+        onEvent(eventName, JSON.parse(dataLines.join("\n")));
+      }
     }
+  }
+}
 
+// ✅ 봇 말풍선 생성 (스트리밍 텍스트를 채워 넣을 빈 말풍선)
+function createBotBubble(chatBox) {
+  const botWrapper = document.createElement("div");
+  botWrapper.className = "bot-message-wrapper";
+  const timeString = new Date().toLocaleTimeString("ko-KR", { hour: "2-digit", minute: "2-digit" });
 
-    // ✅ 일정 추천 요청 감지 (더 정확한 키워드 체크)
-    const isScheduleRequest = /일정|짜줘|추천|계획|여행.*일정|여행.*계획|여행.*짜줘|여행.*추천|코스|여행코스|여행.*코스/i.test(userText);
-    
-    if (isScheduleRequest || data.save_button_enabled) {
-      // JSON 데이터가 있는지 확인
-      let jsonData = null;
-      try {
-        // 응답에서 JSON 부분 추출 시도
-        if (data.reply && data.reply.includes('{') && data.reply.includes('}')) {
-          const jsonMatch = data.reply.match(/\{[\s\S]*\}/);
-          if (jsonMatch) {
-            jsonData = JSON.parse(jsonMatch[0]);
-          }
-        }
-      } catch (e) {
-        console.log('JSON 파싱 실패, 텍스트 형태로 저장');
-      }
-      
-      // 현재 세션 ID 가져오기
-      const currentSessionId = document.querySelector('.history-item[data-id]')?.getAttribute('data-id');
-      
-      lastScheduleData = {
-        title: userText,
-        data: jsonData || {
-          query: userText,
-          schedule: data.reply,
-          places: data.places || data.map || [],
-          created_at: new Date().toISOString()
-        },
-        sessionId: currentSessionId  // 현재 세션 ID 저장
-      };
-      
-      console.log('일정 추천 요청 감지 - lastScheduleData 설정:', lastScheduleData);
-      
-      // ✅ 버튼 컨테이너 표시
-      const buttonContainer = document.getElementById("scheduleButtons");
-      if (buttonContainer) {
-        buttonContainer.style.display = "block";
-      }
-      
-      // ✅ 개별 버튼들 활성화
-      const saveBtn = document.getElementById("saveScheduleBtn");
-      const mapBtn = document.getElementById("viewOnMapBtn");
-      const showMapBtn = document.getElementById("showMapBtn");
-      if (saveBtn) {
-        saveBtn.disabled = false;
-      }
-      if (mapBtn) {
-        mapBtn.disabled = false;
-      }
-      if (showMapBtn) {
-        showMapBtn.disabled = false;
-      }
-      
-      // ✅ 추천 장소가 있으면 지도에 표시 (카카오 API 로드 후)
-      if (data.places && data.places.length > 0) {
-        // 카카오 API가 로드되었는지 확인
-        if (typeof kakao !== 'undefined' && kakao.maps) {
-          showPlacesOnChatbotMap(data.places);
-        } else {
-          console.log('카카오 지도 API가 아직 로드되지 않음, 지도 보기 버튼을 눌러주세요');
+  botWrapper.innerHTML = `
+    <i class="fab fa-github-alt bot-floating-icon"></i>
+    <div class="message bot-message">
+      <div class="bot-text"></div>
+      <div class="timestamp">${timeString}</div>
+    </div>
+  `;
+  chatBox.appendChild(botWrapper);
+  return botWrapper;
+}
+
+// ✅ 유튜브 카드 말풍선 출력
+function renderYoutubeCards(chatBox, ytHtml, userText) {
+  const ytWrapper = document.createElement("div");
+  ytWrapper.className = "bot-message-wrapper";
+  const ytTime = new Date().toLocaleTimeString("ko-KR", { hour: "2-digit", minute: "2-digit" });
+
+  ytWrapper.innerHTML = `
+    <i class="fab fa-github-alt bot-floating-icon"></i>
+    <div class="message bot-message">
+      <div class="intro-text"><b>${userText}</b> 관련 브이로그 추천 영상입니다 😊</div>
+      ${ytHtml}
+      <div class="timestamp">${ytTime}</div>
+    </div>
+  `;
+
+  chatBox.appendChild(ytWrapper);
+  scrollToBottom();
+}
+
+// ✅ 최종 응답 데이터 처리 (본문/유튜브 카드 출력 + 일정 버튼/지도 처리)
+//    rendered: 스트리밍 중 이미 화면에 그린 요소 ({ botWrapper, ytRendered })
+function renderBotResponse(data, userText, rendered = {}) {
+  const chatBox = document.getElementById("chat-messages");
+
+  // 일반 텍스트 응답 (Markdown 파싱 후 출력)
+  if (rendered.botWrapper && data.reply) {
+    // 스트리밍으로 이미 만든 말풍선은 최종 본문으로 교체
+    rendered.botWrapper.querySelector(".bot-text").innerHTML = marked.parse(data.reply);
+    convertYoutubeLinks(rendered.botWrapper);
+    scrollToBottom();
+  } else if (!data.yt_html && data.reply) {
+    const mdHtml = marked.parse(data.reply);
+    const botWrapper = document.createElement("div");
+    botWrapper.className = "bot-message-wrapper";
+    const now2 = new Date();
+    const timeString2 = now2.toLocaleTimeString("ko-KR", { hour: "2-digit", minute: "2-digit" });
+
+    botWrapper.innerHTML = `
+      <i class="fab fa-github-alt bot-floating-icon"></i>
+      <div class="message bot-message">
+        ${mdHtml}
+        <div class="timestamp">${timeString2}</div>
+      </div>
+    `;
+    chatBox.appendChild(botWrapper);
+    convertYoutubeLinks(botWrapper); // botWrapper로 변경
+    scrollToBottom();
+  }
+
+  // 유튜브 카드 응답
+  if (data.yt_html && !rendered.ytRendered) {
+    renderYoutubeCards(chatBox, data.yt_html, userText);
+  }
+
+
+  // ✅ 일정 추천 요청 감지 (더 정확한 키워드 체크)
+  const isScheduleRequest = /일정|짜줘|추천|계획|여행.*일정|여행.*계획|여행.*짜줘|여행.*추천|코스|여행코스|여행.*코스/i.test(userText);
+  
+  if (isScheduleRequest || data.save_button_enabled) {
+    // JSON 데이터가 있는지 확인
+    let jsonData = null;
+    try {
+      // 응답에서 JSON 부분 추출 시도
+      if (data.reply && data.reply.includes('{') && data.reply.includes('}')) {
+        const jsonMatch = data.reply.match(/\{[\s\S]*\}/);
+        if (jsonMatch) {
+          jsonData = JSON.parse(jsonMatch[0]);
         }
       }
-    } else {
-      // ✅ 일정 추천 요청이 아닌 경우 버튼 숨김
-      const buttonContainer = document.getElementById("scheduleButtons");
-      if (buttonContainer) {
-        buttonContainer.style.display = "none";
+    } catch (e) {
+      console.log('JSON 파싱 실패, 텍스트 형태로 저장');
+    }
+    
+    // 현재 세션 ID 가져오기
+    const currentSessionId = document.querySelector('.history-item[data-id]')?.getAttribute('data-id');
+    
+    lastScheduleData = {
+      title: userText,
+      data: jsonData || {
+        query: userText,
+        schedule: data.reply,
+        places: data.places || data.map || [],
+        created_at: new Date().toISOString()
+      },
+      sessionId: currentSessionId  // 현재 세션 ID 저장
+    };
+    
+    console.log('일정 추천 요청 감지 - lastScheduleData 설정:', lastScheduleData);
+    
+    // ✅ 버튼 컨테이너 표시
+    const buttonContainer = document.getElementById("scheduleButtons");
+    if (buttonContainer) {
+      buttonContainer.style.display = "block";
+    }
+    
+    // ✅ 개별 버튼들 활성화
+    const saveBtn = document.getElementById("saveScheduleBtn");
+    const mapBtn = document.getElementById("viewOnMapBtn");
+    const showMapBtn = document.getElementById("showMapBtn");
+    if (saveBtn) {
+      saveBtn.disabled = false;
+    }
+    if (mapBtn) {
+      mapBtn.disabled = false;
+    }
+    if (showMapBtn) {
+      showMapBtn.disabled = false;
+    }
+    
+    // ✅ 추천 장소가 있으면 지도에 표시 (카카오 API 로드 후)
+    if (data.places && data.places.length > 0) {
+      // 카카오 API가 로드되었는지 확인
+      if (typeof kakao !== 'undefined' && kakao.maps) {
+        showPlacesOnChatbotMap(data.places);
+      } else {
+        console.log('카카오 지도 API가 아직 로드되지 않음, 지도 보기 버튼을 눌러주세요');
       }
-      
-      // lastScheduleData 초기화
-      lastScheduleData = null;
     }
-
-  } catch (err) {
-    console.error('메시지 전송 중 오류:', err);
-    // 오류 메시지 제거 - 사용자에게 불필요한 오류 표시 방지
+  } else {
+    // ✅ 일정 추천 요청이 아닌 경우 버튼 숨김
+    const buttonContainer = document.getElementById("scheduleButtons");
+    if (buttonContainer) {
+      buttonContainer.style.display = "none";
+    }
+    
+    // lastScheduleData 초기화
+    lastScheduleData = null;
   }
 }
 
@@ -1,3 +1,357 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .services.router import router
+from .utils.cache import MISSING
+from .utils.gazetteer import find_destination
+from .utils.json_stream import ScheduleStreamParser
+from .utils.singleflight import SingleFlight
+from .utils.tool_memo import memoized_tool, peek_tool_result, tool_memo_scope
+from .utils.weather import geohash_encode, geohash_center
+
+
+SCHEDULE_JSON = (
+    '{"schedule": {'
+    '"Day1": {'
+    '"오전활동": {"장소": "해운대 해수욕장", "설명": "바다 \\"산책\\" {필수}", "위도": 35.1587, "경도": 129.1604}, '
+    '"점심": {"장소": "국제시장", "설명": "밀면\\\\돼지국밥"}'
+    '}, '
+    '"Day2": {"오전활동": {"장소": "감천문화마을", "설명": "골목 투어"}}'
+    '}}'
+)
+
+
+def feed_in_chunks(parser, text, size):
+    """text 를 size 글자씩 잘라 파서에 넣고 완성된 활동을 모두 반환"""
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+class ScheduleStreamParserTests(SimpleTestCase):
+    """일정 JSON 스트리밍 파서 (조각 경계, 이스케이프, 앞부분 텍스트, 중간 절단)"""
+
+    def test_activities_complete_in_order_for_any_chunk_size(self):
+        # 키/문자열/이스케이프가 조각 경계에서 잘려도 결과가 같아야 함
+        for size in (1, 2, 3, 7, 16, len(SCHEDULE_JSON)):
+            with self.subTest(size=size):
+                parser = ScheduleStreamParser()
+                completed = feed_in_chunks(parser, SCHEDULE_JSON, size)
+                self.assertEqual(
+                    [(day, activity) for day, activity, _ in completed],
+                    [("Day1", "오전활동"), ("Day1", "점심"), ("Day2", "오전활동")],
+                )
+                self.assertTrue(parser.done)
+                self.assertEqual(parser.result(), json.loads(SCHEDULE_JSON))
+
+    def test_escaped_quotes_and_braces_inside_strings(self):
+        parser = ScheduleStreamParser()
+        completed = feed_in_chunks(parser, SCHEDULE_JSON, 5)
+        details = completed[0][2]
+        self.assertEqual(details["설명"], '바다 "산책" {필수}')
+        self.assertEqual(completed[1][2]["설명"], "밀면\\돼지국밥")
+
+    def test_activity_is_reported_when_its_object_closes(self):
+        parser = ScheduleStreamParser()
+        head, tail = SCHEDULE_JSON.split('"점심"', 1)
+        completed = parser.feed(head)
+        self.assertEqual([(day, activity) for day, activity, _ in completed], [("Day1", "오전활동")])
+        self.assertFalse(parser.done)
+        self.assertEqual(len(parser.feed('"점심"' + tail)), 2)
+
+    def test_leading_code_fence_and_trailing_text_are_ignored(self):
+        text = "```json\n" + SCHEDULE_JSON + "\n```\n추가 설명"
+        parser = ScheduleStreamParser()
+        completed = feed_in_chunks(parser, text, 4)
+        self.assertEqual(len(completed), 3)
+        self.assertEqual(parser.result(), json.loads(SCHEDULE_JSON))
+        # 최상위 객체가 닫힌 뒤의 텍스트는 더 이상 검사하지 않음
+        self.assertEqual(parser.feed('{"schedule": {"Day3": {"저녁": {}}}}'), [])
+
+    def test_partial_result_keeps_completed_activities_on_truncation(self):
+        cut = SCHEDULE_JSON.index('"Day2"') + len('"Day2": {"오전활동": {"장소": "감천')
+        parser = ScheduleStreamParser()
+        feed_in_chunks(parser, SCHEDULE_JSON[:cut], 6)
+        self.assertFalse(parser.done)
+        self.assertIsNone(parser.result())
+        partial = parser.partial_result()
+        self.assertEqual(list(partial["schedule"]), ["Day1"])
+        self.assertEqual(list(partial["schedule"]["Day1"]), ["오전활동", "점심"])
+
+    def test_partial_result_is_none_without_completed_activities(self):
+        parser = ScheduleStreamParser()
+        parser.feed('```json\n{"schedule": {"Day1": {"오전활동": {"장소": "해')
+        self.assertIsNone(parser.partial_result())
+        self.assertIsNone(parser.result())
+
+    def test_objects_outside_schedule_root_are_not_activities(self):
+        parser = ScheduleStreamParser()
+        completed = parser.feed('{"meta": {"Day1": {"오전활동": {"장소": "x"}}}}')
+        self.assertEqual(completed, [])
+        self.assertTrue(parser.done)
+
+
+def wait_until(predicate, timeout=2):
+    """조건이 참이 될 때까지 짧게 대기 (스레드 간 순서 맞추기용)"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("조건 대기 시간 초과")
+        time.sleep(0.005)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """동일 키 호출 합치기 (leader/waiter 전달, 예외 전파, 취소)"""
+
+    def test_waiter_shares_leader_result(self):
+        flight = SingleFlight("test")
+        release = threading.Event()
+        executions = []
+
+        def slow():
+            executions.append(1)
+            release.wait(2)
+            return "답변"
+
+        results = {}
+        leader = threading.Thread(target=lambda: results.setdefault("leader", flight.do("k", slow)))
+        leader.start()
+        wait_until(lambda: flight.stats()["in_flight"] == 1)
+        waiter = threading.Thread(target=lambda: results.setdefault("waiter", flight.do("k", slow)))
+        waiter.start()
+        wait_until(lambda: flight.stats()["waiting"] == 1)
+        release.set()
+        leader.join(2)
+        waiter.join(2)
+
+        self.assertEqual(results["leader"], ("답변", False))
+        self.assertEqual(results["waiter"], ("답변", True))
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_leader_error_is_raised_to_waiter_and_not_kept(self):
+        flight = SingleFlight("test")
+        release = threading.Event()
+
+        def failing():
+            release.wait(2)
+            raise ValueError("실패")
+
+        errors = []
+
+        def run():
+            try:
+                flight.do("k", failing)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        threads[0].start()
+        wait_until(lambda: flight.stats()["in_flight"] == 1)
+        threads[1].start()
+        wait_until(lambda: flight.stats()["waiting"] == 1)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(len(errors), 2)
+        self.assertIs(errors[0], errors[1])
+        # 실패한 호출은 남지 않으므로 다음 호출은 새로 실행
+        self.assertEqual(flight.do("k", lambda: "재시도"), ("재시도", False))
+
+    def test_disabled_group_runs_every_call(self):
+        flight = SingleFlight("test", enabled=False)
+        self.assertEqual(flight.do("k", lambda: 1), (1, False))
+        self.assertEqual(flight.stats()["executions"], 1)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_ado_waiter_shares_leader_result(self):
+        async def scenario():
+            flight = SingleFlight("test")
+            release = asyncio.Event()
+            executions = []
+
+            async def slow():
+                executions.append(1)
+                await release.wait()
+                return "답변"
+
+            leader = asyncio.create_task(flight.ado("k", slow))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.ado("k", slow))
+            await asyncio.sleep(0)
+            release.set()
+            return await leader, await waiter, len(executions)
+
+        leader, waiter, executions = asyncio.run(scenario())
+        self.assertEqual(leader, ("답변", False))
+        self.assertEqual(waiter, ("답변", True))
+        self.assertEqual(executions, 1)
+
+    def test_ado_leader_error_is_raised_to_waiter(self):
+        async def scenario():
+            flight = SingleFlight("test")
+            release = asyncio.Event()
+
+            async def failing():
+                await release.wait()
+                raise ValueError("실패")
+
+            leader = asyncio.create_task(flight.ado("k", failing))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.ado("k", failing))
+            await asyncio.sleep(0)
+            release.set()
+            return await asyncio.gather(leader, waiter, return_exceptions=True), flight.stats()
+
+        (leader, waiter), stats = asyncio.run(scenario())
+        self.assertIsInstance(leader, ValueError)
+        self.assertIs(leader, waiter)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_ado_leader_cancel_releases_waiter(self):
+        async def scenario():
+            flight = SingleFlight("test")
+
+            async def forever():
+                await asyncio.Event().wait()
+
+            leader = asyncio.create_task(flight.ado("k", forever))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.ado("k", forever))
+            await asyncio.sleep(0)
+            leader.cancel()
+            results = await asyncio.gather(leader, waiter, return_exceptions=True)
+            return results, flight.stats()
+
+        (leader, waiter), stats = asyncio.run(scenario())
+        self.assertIsInstance(leader, asyncio.CancelledError)
+        self.assertIsInstance(waiter, asyncio.CancelledError)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(stats["in_flight"], 0)
+
+
+class IntentRouterTests(SimpleTestCase):
+    """chat 테이블 우선순위: schedule > simple_qna > vlog > place_details > general"""
+
+    def test_chat_route_precedence(self):
+        cases = [
+            ("부산 일정 추천해줘 브이로그 상세 정보", "schedule"),
+            ("부산 추천 브이로그 상세 정보", "simple_qna"),
+            ("부산 브이로그 상세 정보", "vlog"),
+            ("해운대 상세 정보", "place_details"),
+            ("부산 놀러가자", "general"),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(router.route(text, "chat").name, expected)
+
+    def test_requires_group_must_also_match(self):
+        self.assertEqual(router.route("부산 여행 코스", "general").name, "일반 여행 정보")
+        self.assertEqual(router.route("부산 여행 코스 짜줘", "general").name, "여행 일정")
+
+    def test_matched_ignores_default_route(self):
+        match = router.match("유튜브 영상")
+        self.assertTrue(match.matched("vlog"))
+        self.assertFalse(router.match("부산 맛집").matched("vlog"))
+
+
+class ToolMemoTests(SimpleTestCase):
+    """요청 단위 도구 메모 (중복 제거, 실패한 호출은 잊고 재시도)"""
+
+    def test_same_normalized_query_runs_once(self):
+        calls = []
+        tool = memoized_tool("test_tool", lambda query: calls.append(query) or f"결과:{query}")
+        with tool_memo_scope() as memo:
+            self.assertEqual(tool("해운대"), "결과:해운대")
+            self.assertEqual(tool("해운대"), "결과:해운대")
+        self.assertEqual(calls, ["해운대"])
+        self.assertEqual(memo.summary(), {"test_tool": {"calls": 2, "hits": 1}})
+
+    def test_failed_call_is_forgotten_and_retried(self):
+        attempts = []
+
+        def flaky(query):
+            attempts.append(query)
+            if len(attempts) == 1:
+                raise ConnectionError("일시 오류")
+            return "성공"
+
+        tool = memoized_tool("test_tool", flaky)
+        with tool_memo_scope():
+            with self.assertRaises(ConnectionError):
+                tool("광안리")
+            self.assertIs(peek_tool_result("test_tool", "광안리"), MISSING)
+            self.assertEqual(tool("광안리"), "성공")
+            self.assertEqual(peek_tool_result("test_tool", "광안리"), "성공")
+        self.assertEqual(len(attempts), 2)
+
+    def test_failed_async_call_is_forgotten_and_retried(self):
+        attempts = []
+
+        async def flaky(query):
+            attempts.append(query)
+            if len(attempts) == 1:
+                raise ConnectionError("일시 오류")
+            return "성공"
+
+        tool = memoized_tool("test_tool", flaky)
+
+        async def scenario():
+            with tool_memo_scope():
+                with self.assertRaises(ConnectionError):
+                    await tool("광안리")
+                return await tool("광안리"), await tool("광안리")
+
+        self.assertEqual(asyncio.run(scenario()), ("성공", "성공"))
+        self.assertEqual(len(attempts), 2)
+
+    def test_calls_outside_request_are_not_memoized(self):
+        calls = []
+        tool = memoized_tool("test_tool", lambda query: calls.append(query) or len(calls))
+        self.assertEqual((tool("해운대"), tool("해운대")), (1, 2))
+
+
+class GeohashTests(SimpleTestCase):
+    """날씨 캐시 격자용 지오해시 인코딩/중심 좌표"""
+
+    def test_known_value(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, precision=11), "u4pruydqqvj")
+
+    def test_center_round_trip(self):
+        for lat, lng in [(35.1587, 129.1604), (37.5665, 126.9780), (33.4996, 126.5312), (-33.8688, 151.2093)]:
+            with self.subTest(lat=lat, lng=lng):
+                cell = geohash_encode(lat, lng)
+                center_lat, center_lng = geohash_center(cell)
+                # 중심 좌표는 같은 격자로 인코딩되고, 원래 좌표와 격자 크기 이내로 가까움
+                self.assertEqual(geohash_encode(center_lat, center_lng), cell)
+                self.assertAlmostEqual(center_lat, lat, delta=0.03)
+                self.assertAlmostEqual(center_lng, lng, delta=0.03)
+
+    def test_nearby_points_share_cell(self):
+        self.assertEqual(geohash_encode(35.1587, 129.1604), geohash_encode(35.1590, 129.1610))
+
+
+class FindDestinationTests(SimpleTestCase):
+    """지명 사전 목적지 선택 (시/군/관광지 > 도, 같은 우선순위면 먼저 등장)"""
+
+    def test_city_beats_province_in_either_order(self):
+        self.assertEqual(find_destination("강원도 강릉 여행"), "강릉")
+        self.assertEqual(find_destination("강릉 갈까 강원도"), "강릉")
+
+    def test_province_alone_is_used(self):
+        self.assertEqual(find_destination("경상북도 여행"), "경상북도")
+
+    def test_first_city_wins_and_aliases_resolve(self):
+        self.assertEqual(find_destination("부산이랑 경주"), "부산")
+        self.assertEqual(find_destination("해운대 가고 싶어"), "부산")
+
+    def test_no_destination(self):
+        self.assertIsNone(find_destination("맛있는 거 먹고 싶어"))
+        self.assertIsNone(find_destination(""))
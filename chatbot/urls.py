@@ -33,6 +33,16 @@ urlpatterns = [
     # 👉 /chatbot/ 경로도 동일하게 chatbot_view 실행
     #    - 즉, "/"와 "/chatbot/" 두 주소 모두 챗봇 메인으로 진입 가능하게 설정
 
+    path("chatbot/stream/", views.chatbot_stream_view, name="chatbot_stream"),
+    # 👉 /chatbot/stream/ (POST 전용) → views.chatbot_stream_view 실행
+    #    - chatbot_view 와 같은 처리를 Server-Sent Events 로 스트리밍
+    #    - LLM 토큰을 생성 즉시 전송하고, 좌표/날씨/브이로그는 마지막에 별도 이벤트로 전송
+
+    path("chatbot/async/", views.chatbot_async_view, name="chatbot_async"),
+    # 👉 /chatbot/async/ (POST 전용) → views.chatbot_async_view 실행
+    #    - chatbot_view 의 POST 와 같은 JSON 응답, ASGI(uvicorn 등)에서 비동기로 처리
+    #    - 좌표/날씨/브이로그 조회를 동시에 실행
+
 
     # -------------------- 세션 관리 --------------------
     path("delete_session/<int:session_id>/", views.delete_session, name="delete_session"), 
@@ -0,0 +1,54 @@
+"""
+비동기(ASGI) 실행 유틸리티
+
+이 모듈은 비동기 채팅 파이프라인에서 공용으로 쓰는 도구를 제공합니다.
+- get_async_client(): 이벤트 루프별로 하나씩 재사용하는 httpx.AsyncClient (연결 풀 공유)
+- run_sync(): ORM/블로킹 라이브러리를 쓰는 기존 동기 함수를 스레드에서 실행
+  (thread_sensitive=False 로 실행하여 느린 외부 호출끼리 서로 막지 않도록 하고, 끝나면 DB 연결 정리)
+"""
+
+# 표준 라이브러리
+import asyncio
+import functools
+import weakref
+
+# Django 및 외부 모듈
+import httpx
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+ASYNC_HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+ASYNC_HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+
+_clients = weakref.WeakKeyDictionary()   # 이벤트 루프 → AsyncClient
+
+
+def get_async_client():
+    """현재 이벤트 루프 전용 httpx.AsyncClient (최초 호출 시 생성)"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=ASYNC_HTTP_TIMEOUT, limits=ASYNC_HTTP_LIMITS)
+        _clients[loop] = client
+    return client
+
+
+def _closing_connections(func):
+    """작업 스레드에서 연 DB 연결을 함수 종료 후 닫도록 감싸기"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return wrapper
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    동기 함수를 스레드 풀에서 실행하고 결과를 기다림 (contextvar 는 asgiref 가 복사하므로 요청 Trace 유지)
+
+    사용 예:
+        coords = await run_sync(search_place_coordinates, "해운대해수욕장")
+    """
+    return await sync_to_async(_closing_connections(func), thread_sensitive=False)(*args, **kwargs)
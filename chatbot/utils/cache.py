@@ -0,0 +1,77 @@
+"""
+메모리 캐시 유틸리티
+
+이 모듈은 프로세스 내부에서 공유하는 스레드 안전 LRU + TTL 캐시를 제공합니다.
+"""
+
+# 표준 라이브러리
+import threading
+import time
+from collections import OrderedDict
+
+# 캐시 미스 표시용 센티널 (None 도 정상적인 캐시 값이 될 수 있으므로 별도 객체 사용)
+MISSING = object()
+
+
+class TTLCache:
+    """
+    스레드 안전 LRU + TTL 캐시
+
+    Args:
+        maxsize (int): 최대 저장 항목 수 (초과 시 가장 오래 사용하지 않은 항목 제거)
+        ttl (float): 기본 만료 시간(초)
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key → (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        """키에 해당하는 값을 반환 (없거나 만료되면 default)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                # 만료된 항목은 즉시 제거
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """값 저장 (ttl 미지정 시 기본 ttl 사용)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """특정 키 삭제"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """전체 비우기"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """적중/미스 통계 반환"""
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
@@ -5,42 +5,93 @@
 """
 
 import re
+from django.conf import settings
 from ..models import ChatMessage
 from rich.console import Console    
+from .tokens import count_tokens, truncate_tokens, html_to_text
 # prompt_templates.py의 detect_travel_destination 함수 사용 (DB+sessionstorage 구조)
 from .prompt_templates import detect_travel_destination as detect_destination
 
 console = Console()
 
+# 대화 히스토리 토큰 예산 (settings.py 에서 재정의 가능)
+CHAT_HISTORY_TOKEN_BUDGET = getattr(settings, "CHAT_HISTORY_TOKEN_BUDGET", 2000)
+CHAT_HISTORY_MESSAGE_TOKEN_LIMIT = getattr(settings, "CHAT_HISTORY_MESSAGE_TOKEN_LIMIT", 600)
+CHAT_HISTORY_MAX_MESSAGES = getattr(settings, "CHAT_HISTORY_MAX_MESSAGES", 30)
 
-def get_conversation_history(session, limit=15):
+
+def message_prompt_text(msg):
+    """메시지를 프롬프트용 텍스트로 변환 (raw_content 우선, 과거 HTML 행은 태그 제거)"""
+    return msg.raw_content or html_to_text(msg.content)
+
+
+def build_conversation_history(session, limit=None, token_budget=None, include_session_info=False):
+    """
+    토큰 예산 안에서 최근 대화 히스토리를 구성하는 함수
+
+    최신 메시지부터 거꾸로 채우고, 예산을 넘기기 직전에 멈춥니다.
+    메시지 하나가 너무 길면 CHAT_HISTORY_MESSAGE_TOKEN_LIMIT 까지만 사용합니다.
+
+    Args:
+        session: ChatSession 객체
+        limit (int): 가져올 메시지 수 상한 (기본: CHAT_HISTORY_MAX_MESSAGES)
+        token_budget (int): 히스토리 전체 토큰 예산 (기본: CHAT_HISTORY_TOKEN_BUDGET)
+        include_session_info (bool): 세션 제목/시작 시간 줄을 앞에 붙일지 여부
+
+    Returns:
+        tuple: (대화 히스토리 목록, 사용한 토큰 수, 실제로 포함된 메시지 목록(최신순))
+    """
+    if not session:
+        console.log("❌ 세션이 없습니다.")
+        return [], 0, []
+
+    limit = limit or CHAT_HISTORY_MAX_MESSAGES
+    budget = token_budget or CHAT_HISTORY_TOKEN_BUDGET
+
+    header = []
+    if include_session_info and session.title:
+        header.append(f"세션 제목: {session.title}")
+        header.append(f"대화 시작 시간: {session.created_at.strftime('%Y-%m-%d %H:%M')}")
+    used = sum(count_tokens(line) for line in header)
+
+    # 최근 메시지부터 (화면용 HTML 은 raw_content 가 없을 때만 사용)
+    recent_messages = (
+        ChatMessage.objects.filter(session=session)
+        .only("role", "content", "raw_content")
+        .order_by('-created_at')[:limit]
+    )
+
+    lines = []
+    included = []
+    for msg in recent_messages:
+        text = truncate_tokens(message_prompt_text(msg), CHAT_HISTORY_MESSAGE_TOKEN_LIMIT)
+        line = f"{msg.role}: {text}"
+        tokens = count_tokens(line)
+        if used + tokens > budget:
+            break
+        lines.append(line)
+        included.append(msg)
+        used += tokens
+
+    history = header + list(reversed(lines))  # 시간순으로 정렬
+    console.log(f"🧮 대화 히스토리: 메시지 {len(lines)}개, {used} 토큰 (예산 {budget})")
+    return history, used, included
+
+
+def get_conversation_history(session, limit=15, token_budget=None):
     """
-    세션의 대화 히스토리를 가져오는 함수
+    세션의 대화 히스토리를 가져오는 함수 (토큰 예산 적용)
     
     Args:
         session: ChatSession 객체
         limit (int): 가져올 메시지 수 제한
+        token_budget (int): 히스토리 토큰 예산 (기본: CHAT_HISTORY_TOKEN_BUDGET)
         
     Returns:
         list: 대화 히스토리 목록
     """
-    conversation_history = []
-    
-    if not session:
-        console.log("❌ 세션이 없습니다.")
-        return conversation_history
-    
-    # 최근 메시지들을 시간순으로 가져오기
-    recent_messages = ChatMessage.objects.filter(session=session).order_by('-created_at')[:limit]
-    
-    console.log(f"🔍 DB에서 가져온 메시지 개수: {len(recent_messages)}")
-    
-    for msg in reversed(recent_messages):  # 시간순으로 정렬
-        conversation_history.append(f"{msg.role}: {msg.content}")
-        console.log(f"🔍 메시지 추가: {msg.role}: {msg.content[:50]}...")
-    
-    console.log(f"🔍 최종 대화 히스토리 개수: {len(conversation_history)}")
-    return conversation_history
+    history, _, _ = build_conversation_history(session, limit=limit, token_budget=token_budget)
+    return history
 
 
 def get_session_context(session, conversation_history):
@@ -4,12 +4,41 @@
 이 모듈은 일정 데이터에서 좌표 정보를 추출하는 공통 함수들을 제공합니다.
 """
 
-from ..utils.coordinates import extract_places_from_response, search_place_coordinates
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ..utils.coordinates import extract_places_from_response, geocode_many, ageocode_many, _geocode_worker, GEOCODE_MAX_WORKERS
+from ..utils.tracing import bind_context
 from rich.console import Console
 
 console = Console()
 
 
+def place_from_activity(activity, details):
+    """
+    일정 활동 1개에서 지도용 장소 정보를 만드는 함수 (JSON 에 유효한 좌표가 있을 때만)
+
+    Returns:
+        dict | None: {"name", "lat", "lng", "address", "activity"}
+    """
+    if not isinstance(details, dict) or '장소' not in details:
+        return None
+    coords = details.get('좌표')
+    if not isinstance(coords, dict) or 'lat' not in coords or 'lng' not in coords:
+        return None
+    try:
+        float(coords['lat']), float(coords['lng'])
+    except (TypeError, ValueError):
+        return None
+    return {
+        "name": details['장소'],
+        "lat": coords['lat'],
+        "lng": coords['lng'],
+        "address": details.get('주소', ''),
+        "activity": activity
+    }
+
+
 def extract_coordinates_from_schedule_data(schedule_data):
     """
     일정 데이터에서 좌표 정보를 추출하는 함수
@@ -29,18 +58,10 @@ def extract_coordinates_from_schedule_data(schedule_data):
     for day_key, day_data in schedule_data['schedule'].items():
         if isinstance(day_data, dict):
             for activity, details in day_data.items():
-                if isinstance(details, dict) and '장소' in details and '좌표' in details:
-                    place_name = details['장소']
-                    coords = details['좌표']
-                    if isinstance(coords, dict) and 'lat' in coords and 'lng' in coords:
-                        places_with_coords.append({
-                            "name": place_name,
-                            "lat": coords['lat'],
-                            "lng": coords['lng'],
-                            "address": details.get('주소', ''),
-                            "activity": activity
-                        })
-                        console.log(f"JSON에서 좌표 추출: {place_name} ({coords['lat']}, {coords['lng']})")
+                place = place_from_activity(activity, details)
+                if place:
+                    places_with_coords.append(place)
+                    console.log(f"JSON에서 좌표 추출: {place['name']} ({place['lat']}, {place['lng']})")
     
     return places_with_coords
 
@@ -63,19 +84,76 @@ def extract_coordinates_from_response(response_text, existing_places=None):
         places = extract_places_from_response(response_text)
         console.log(f"추출된 장소명들: {places}")
         
-        for place_name in places:
-            coords = search_place_coordinates(place_name)
-            if coords:
-                places_with_coords.append({
-                    "name": coords.get("place_name", place_name),
-                    "lat": coords["lat"],
-                    "lng": coords["lng"],
-                    "address": coords.get("address", "")
-                })
+        # 모든 장소를 한 번에 동시 검색 (입력 순서 유지)
+        places_with_coords.extend(_places_from_geocodes(places, geocode_many(places)))
     
     return places_with_coords
 
 
+async def aextract_coordinates_from_response(response_text, existing_places=None):
+    """extract_coordinates_from_response 의 비동기 버전"""
+    places_with_coords = existing_places or []
+
+    if not places_with_coords:
+        places = extract_places_from_response(response_text)
+        console.log(f"추출된 장소명들: {places}")
+        places_with_coords.extend(_places_from_geocodes(places, await ageocode_many(places)))
+
+    return places_with_coords
+
+
+async def aextract_schedule_places(schedule_data):
+    """
+    일정 데이터의 장소 목록 (비동기 파이프라인용, SchedulePlaceCollector.results() 와 같은 결과)
+
+    JSON 에 유효한 좌표가 있는 활동은 그대로 쓰고, 나머지 장소명은 한 번에 동시 지오코딩합니다.
+    """
+    slots = []     # 일정 순서대로 장소 dict 또는 (장소명, 활동, 주소)
+    pending = []   # 지오코딩할 장소명
+    for day_data in (schedule_data or {}).get('schedule', {}).values():
+        if not isinstance(day_data, dict):
+            continue
+        for activity, details in day_data.items():
+            place = place_from_activity(activity, details)
+            if place:
+                slots.append(place)
+            elif isinstance(details, dict) and details.get('장소'):
+                slots.append((details['장소'], activity, details.get('주소', '')))
+                pending.append(details['장소'])
+
+    found = iter(await ageocode_many(pending)) if pending else iter(())
+    places = []
+    for slot in slots:
+        if isinstance(slot, dict):
+            places.append(slot)
+            continue
+        coords = next(found)
+        if coords:
+            name, activity, address = slot
+            places.append({
+                "name": coords.get("place_name", name),
+                "lat": coords["lat"],
+                "lng": coords["lng"],
+                "address": coords.get("address", "") or address,
+                "activity": activity
+            })
+    return places
+
+
+def _places_from_geocodes(places, results):
+    """장소명 목록 + 좌표 검색 결과 → 좌표가 있는 장소 목록"""
+    return [
+        {
+            "name": coords.get("place_name", place_name),
+            "lat": coords["lat"],
+            "lng": coords["lng"],
+            "address": coords.get("address", "")
+        }
+        for place_name, coords in zip(places, results)
+        if coords
+    ]
+
+
 def format_places_info(places_with_coords):
     """
     장소 정보를 포맷팅하는 함수
@@ -94,3 +172,93 @@ def format_places_info(places_with_coords):
         result += f"- {place['name']}: {place['address']}\n"
     
     return result
+
+
+class SchedulePlaceCollector:
+    """
+    일정 스트리밍 중 완성되는 활동마다 좌표를 바로 확보하는 수집기
+
+    - JSON 에 유효한 좌표가 있으면 즉시 사용
+    - 없으면 장소명으로 백그라운드 지오코딩 시작 (Day1 검색이 Day3 생성과 겹쳐 진행)
+    - on_update(places): 장소가 확보될 때마다 지금까지의 장소 목록(일정 순서)으로 호출
+
+    사용 예:
+        with SchedulePlaceCollector(on_update=lambda places: emit("places", {"places": places})) as collector:
+            collector.add("Day1", "오전활동", details)
+            places = collector.results()   # 남은 검색을 기다린 뒤 최종 목록
+        (with 블록을 벗어나면 일정 생성이 예외로 끝났어도 백그라운드 실행기를 정리)
+    """
+
+    def __init__(self, on_update=None, max_workers=None):
+        self.on_update = on_update
+        self.max_workers = max_workers or GEOCODE_MAX_WORKERS
+        self._executor = None
+        self._slots = []          # 일정 순서대로 장소 dict 또는 Future
+        self._lock = threading.Lock()
+
+    def add(self, day, activity, details):
+        """완성된 활동 1개 추가"""
+        place = place_from_activity(activity, details)
+        if place:
+            with self._lock:
+                self._slots.append(place)
+            self._notify()
+            return
+
+        name = details.get('장소') if isinstance(details, dict) else None
+        if not name:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="schedule-geocode")
+        future = self._executor.submit(bind_context(_geocode_worker), name)
+        future.place_request = (name, activity, details.get('주소', ''))
+        with self._lock:
+            self._slots.append(future)
+        future.add_done_callback(lambda _: self._notify())
+
+    def places(self):
+        """지금까지 확보된 장소 목록 (일정 순서 유지, 검색 중/실패 항목 제외)"""
+        with self._lock:
+            slots = list(self._slots)
+        result = []
+        for slot in slots:
+            if isinstance(slot, dict):
+                result.append(slot)
+            elif slot.done() and not slot.exception() and slot.result():
+                coords = slot.result()
+                name, activity, address = slot.place_request
+                result.append({
+                    "name": coords.get("place_name", name),
+                    "lat": coords["lat"],
+                    "lng": coords["lng"],
+                    "address": coords.get("address", "") or address,
+                    "activity": activity
+                })
+        return result
+
+    def _notify(self):
+        if self.on_update:
+            places = self.places()
+            if places:
+                self.on_update(places)
+
+    def results(self):
+        """남은 지오코딩을 모두 기다린 뒤 최종 장소 목록 반환"""
+        if self._executor is not None:
+            with self._lock:
+                futures = [slot for slot in self._slots if not isinstance(slot, dict)]
+            wait(futures)
+            self._executor.shutdown(wait=False)
+        return self.places()
+
+    def close(self):
+        """백그라운드 지오코딩 실행기 정리 (시작 전인 검색은 취소, 여러 번 호출해도 안전)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
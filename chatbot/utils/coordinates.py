@@ -5,19 +5,47 @@
 """
 
 # 표준 라이브러리
+import asyncio
 import os
 import json
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
 
 # 외부 모듈
+from django.conf import settings
+from django.db import connections
 from rich.console import Console
 
+# 로컬 모듈
+from .geocode_cache import cached_geocoder, make_geocode_key, limit_geocode_ttl, GEOCODE_CACHE_TTL, GEOCODE_CACHE_NEGATIVE_TTL
+from .aio import run_sync
+from .deadline import remaining_timeout, should_skip
+from .tracing import traced, bind_context
+from .http_client import http_get
+from .tool_memo import memoized_tool, peek_tool_result
+from .cache import MISSING
+
 console = Console()
 
 # API 키
 KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY", "")
 
+# 동시 지오코딩 스레드 수 (geocode_many)
+GEOCODE_MAX_WORKERS = getattr(settings, "GEOCODE_MAX_WORKERS", 8)
+
+# 카카오 키워드 검색 요청 1회 최대 대기(초) → 요청 예산이 더 적게 남았으면 그 안에서
+KAKAO_SEARCH_TIMEOUT = 5
+
+# 백업 좌표(지역/장소 유형 중심 등 근사치) 카테고리 → 캐시에 오래 두지 않음
+BACKUP_CATEGORIES = ("AI감지", "AI백업", "기본백업")
+
+
+def _place_coordinates_ttl(result):
+    """search_place_coordinates 결과별 캐시 TTL (실패/근사 좌표는 짧게)"""
+    if not result or result.get("category") in BACKUP_CATEGORIES:
+        return GEOCODE_CACHE_NEGATIVE_TTL
+    return GEOCODE_CACHE_TTL
+
 
 def extract_places_from_response(response_text):
     """AI 응답에서 장소명들을 추출하는 함수 (JSON 기반)"""
@@ -286,6 +314,9 @@ def get_smart_backup_coordinates(place_name):
 
 def try_backup_coordinate_search(place_name):
     """AI 기반 백업 좌표 검색 시스템 (하드코딩 완전 제거)"""
+    # 근사 좌표용 부가 단계 → 요청 예산이 거의 남지 않았으면 생략 (지도에서 해당 장소만 빠짐)
+    if should_skip("backup_geocode"):
+        return None
     try:
         console.log(f"🔄 AI 기반 백업 좌표 검색 시작: {place_name}")
         
@@ -327,8 +358,10 @@ def try_backup_coordinate_search(place_name):
         return None
 
 
+@cached_geocoder("place_search", ttl_for=_place_coordinates_ttl)
+@traced("kakao_place")
 def search_place_coordinates(place_name):
-    """장소명으로 좌표를 검색하는 함수 (개선된 버전 - 좌표 정확성 강화)"""
+    """장소명으로 좌표를 검색하는 함수 (개선된 버전 - 좌표 정확성 강화, 지오코딩 캐시 적용)"""
     try:
         # 장소명 정리 (불필요한 공백 제거)
         clean_place_name = place_name.strip()
@@ -355,9 +388,9 @@ def search_place_coordinates(place_name):
             
         url = f"https://dapi.kakao.com/v2/local/search/keyword.json"
         headers = {"Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"}
-        params = {"query": clean_place_name, "size": 30}
+        params = {"query": clean_place_name, "size": 15}  # 카카오 API 최대 15
         
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = http_get("kakao", url, headers=headers, params=params, timeout=remaining_timeout(KAKAO_SEARCH_TIMEOUT))
         
         if response.status_code == 200:
             data = response.json()
@@ -383,13 +416,122 @@ def search_place_coordinates(place_name):
                 }
         else:
             console.log(f"API 요청 실패: {response.status_code}")
-            # API 실패 시 AI 기반 백업 좌표 사용
+            # API 실패 시 AI 기반 백업 좌표 사용 (일시적 오류일 수 있으므로 캐시하지 않음)
+            limit_geocode_ttl(0)
             return try_backup_coordinate_search(clean_place_name)
             
     except Exception as e:
         console.log(f"장소 좌표 검색 오류 ({place_name}): {e}")
-        # 오류 발생 시 AI 기반 백업 좌표 사용
+        # 오류 발생 시 AI 기반 백업 좌표 사용 (캐시하지 않음)
+        limit_geocode_ttl(0)
         return try_backup_coordinate_search(clean_place_name)
     
     # 최종 백업: AI 기반 좌표 검색
     return try_backup_coordinate_search(clean_place_name)
+
+
+# 요청 단위 메모를 거치는 장소 좌표 검색 (같은 턴에서 같은 장소는 한 번만 검색)
+_memo_place_search = memoized_tool("place_search", search_place_coordinates)
+
+
+def lookup_place_coordinates(place_name):
+    """
+    답변 후처리용 좌표 검색 (요청 메모 우선)
+
+    같은 요청에서 에이전트 도구(kakao_geocode)가 이미 찾은 장소면 그 결과를 재사용하고,
+    아니면 search_place_coordinates 를 요청 단위 메모로 한 번만 호출합니다.
+    """
+    found = peek_tool_result("kakao_geocode", place_name)
+    if found is not MISSING and found:
+        lat, lng, found_name = found[:3]
+        console.log(f"🧠 에이전트 검색 결과 재사용: {place_name} → {found_name} ({lat}, {lng})")
+        return {
+            "lat": lat,
+            "lng": lng,
+            "address": "",
+            "place_name": found_name,
+            "category": "에이전트검색",
+            "search_query": place_name,
+            "score": 80
+        }
+    return _memo_place_search(place_name)
+
+
+def _lookup_or_none(place_name):
+    """일괄 좌표 검색 1건 (오류는 로그만 남기고 None, 단일/다중 경로 공통)"""
+    try:
+        return lookup_place_coordinates(place_name)
+    except Exception as e:
+        console.log(f"장소 좌표 검색 오류 ({place_name}): {e}")
+        return None
+
+
+def _geocode_worker(place_name):
+    """geocode_many 작업 스레드: 좌표 검색 후 이 스레드의 DB 연결 정리"""
+    try:
+        return _lookup_or_none(place_name)
+    finally:
+        # 작업 스레드에서 열린 DB 연결(지오코딩 캐시 조회용)을 닫아 누수 방지
+        connections.close_all()
+
+
+def geocode_many(names, max_workers=None):
+    """
+    여러 장소명을 한 번에 좌표 검색하는 함수 (중복 제거 + 동시 실행)
+
+    Args:
+        names (list): 장소명 목록
+        max_workers (int, optional): 동시 실행 스레드 수 (기본: GEOCODE_MAX_WORKERS)
+
+    Returns:
+        list: 입력 순서와 같은 순서의 검색 결과 목록 (실패한 항목은 None)
+    """
+    names = [name.strip() if isinstance(name, str) else "" for name in names or []]
+
+    # 캐시 키 기준으로 중복 제거 (처음 등장한 장소명으로 한 번만 검색)
+    unique = {}
+    for name in names:
+        key = make_geocode_key(name)
+        if key and key not in unique:
+            unique[key] = name
+
+    results = {}
+    if unique:
+        workers = max(1, min(max_workers or GEOCODE_MAX_WORKERS, len(unique)))
+        if workers == 1:
+            for key, name in unique.items():
+                results[key] = _lookup_or_none(name)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geocode") as executor:
+                futures = {key: executor.submit(bind_context(_geocode_worker), name) for key, name in unique.items()}
+                results = {key: future.result() for key, future in futures.items()}
+
+    console.log(f"📍 일괄 좌표 검색: {len(names)}개 요청 → {len(unique)}개 검색")
+    return [results.get(make_geocode_key(name)) for name in names]
+
+
+async def ageocode_many(names, max_workers=None):
+    """
+    geocode_many 의 비동기 버전 (중복 제거 + 동시 실행, 입력 순서 유지)
+
+    지오코딩 캐시(DB)와 카카오 검색은 작업 스레드에서 실행하고, 동시 실행 수는 세마포어로 제한합니다.
+    """
+    names = [name.strip() if isinstance(name, str) else "" for name in names or []]
+
+    unique = {}
+    for name in names:
+        key = make_geocode_key(name)
+        if key and key not in unique:
+            unique[key] = name
+
+    semaphore = asyncio.Semaphore(max(1, max_workers or GEOCODE_MAX_WORKERS))
+
+    async def search(name):
+        async with semaphore:
+            return await run_sync(_lookup_or_none, name)
+
+    found = await asyncio.gather(*(search(name) for name in unique.values()))
+    results = dict(zip(unique.keys(), found))
+
+    console.log(f"📍 일괄 좌표 검색(async): {len(names)}개 요청 → {len(unique)}개 검색")
+    return [results.get(make_geocode_key(name)) for name in names]
@@ -0,0 +1,154 @@
+"""
+요청 단위 마감 시간(deadline) 유틸리티
+
+이 모듈은 요청 1건 전체에 주어진 시간 예산을 모든 외부 호출이 나눠 쓰도록 합니다.
+- 뷰에서 @with_deadline(초) 로 Deadline 을 시작하면 contextvar 로 하위 호출까지 전달
+  (작업 스레드는 bind_context / run_sync 가 컨텍스트를 복사하므로 같은 Deadline 공유)
+- 외부 호출은 remaining_timeout(기본값) 으로 "기본 타임아웃과 남은 예산 중 작은 값"을 사용
+  (예산을 이미 다 썼으면 DeadlineExceeded → 각 호출의 기존 예외 처리로 빠르게 실패)
+- 날씨/브이로그/백업 지오코딩 같은 부가 작업은 should_skip(이름) 으로 예산이 거의 남지 않았으면 생략
+- Deadline 이 없으면(관리 명령/셸) 기존 타임아웃을 그대로 사용
+"""
+
+# 표준 라이브러리
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+# Django 및 외부 모듈
+from django.conf import settings
+from rich.console import Console
+
+# 로컬 모듈
+from .tracing import annotate
+
+console = Console()
+
+# 예산 설정 (settings.py 에서 재정의 가능)
+CHAT_DEADLINE_SECONDS = getattr(settings, "CHAT_DEADLINE_SECONDS", 45)          # 채팅 1턴 전체 예산
+ROUTE_DEADLINE_SECONDS = getattr(settings, "ROUTE_DEADLINE_SECONDS", 15)        # 길찾기 API 예산
+DEADLINE_OPTIONAL_RESERVE = getattr(settings, "DEADLINE_OPTIONAL_RESERVE", 8)   # 남은 시간이 이보다 적으면 부가 작업 생략
+DEADLINE_MIN_TIMEOUT = 0.5                                                      # 외부 호출 최소 타임아웃(초)
+
+_current_deadline = contextvars.ContextVar("chatbot_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """요청 예산을 모두 써서 외부 호출을 시작하지 않음"""
+
+
+class Deadline:
+    """요청 1건의 마감 시각과 생략한 부가 작업 목록"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.skipped = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """남은 시간(초, 0 이상)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, default=None):
+        """기본 타임아웃과 남은 예산 중 작은 값 (이미 만료됐으면 DeadlineExceeded)"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"요청 예산 {self.budget}초 초과")
+        timeout = min(default, remaining) if default else remaining
+        return max(DEADLINE_MIN_TIMEOUT, timeout)
+
+    def nearly_spent(self, reserve=None):
+        """남은 시간이 reserve(기본 DEADLINE_OPTIONAL_RESERVE)보다 적은지"""
+        return self.remaining() < (DEADLINE_OPTIONAL_RESERVE if reserve is None else reserve)
+
+    def skip(self, name):
+        """생략한 부가 작업 기록 (구조화 로그의 skipped 태그에 표시)"""
+        with self._lock:
+            if name not in self.skipped:
+                self.skipped.append(name)
+            annotate("skipped", ",".join(self.skipped))
+        console.log(f"⏱ 예산 부족으로 생략: {name} (남은 시간 {self.remaining():.1f}s)")
+
+
+def start_deadline(budget):
+    """현재 컨텍스트에서 Deadline 시작 → (Deadline, 복원용 토큰)"""
+    deadline = Deadline(budget)
+    return deadline, _current_deadline.set(deadline)
+
+
+def end_deadline(token):
+    """start_deadline 이전 상태로 복원"""
+    _current_deadline.reset(token)
+
+
+def current_deadline():
+    """현재 컨텍스트의 Deadline (없으면 None)"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget):
+    """with 블록 동안 Deadline 적용"""
+    deadline, token = start_deadline(budget)
+    try:
+        yield deadline
+    finally:
+        end_deadline(token)
+
+
+def with_deadline(budget):
+    """
+    뷰 전체에 Deadline 을 적용하는 데코레이터 (async 뷰도 지원)
+
+    사용 예:
+        @with_deadline(CHAT_DEADLINE_SECONDS)
+        def chatbot_view(request): ...
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                with deadline_scope(budget):
+                    return await view(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with deadline_scope(budget):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def remaining_timeout(default):
+    """외부 호출에 쓸 타임아웃 (Deadline 이 없으면 default 그대로)"""
+    deadline = _current_deadline.get()
+    return deadline.timeout(default) if deadline else default
+
+
+def deadline_expired():
+    """예산을 모두 썼는지 (Deadline 이 없으면 False)"""
+    deadline = _current_deadline.get()
+    return deadline.expired() if deadline else False
+
+
+def should_skip(name, reserve=None):
+    """
+    부가 작업을 생략해야 하는지 (남은 예산이 reserve 미만이면 True + 생략 기록)
+
+    사용 예:
+        if not should_skip("weather"):
+            place["weather"] = get_weather_info_by_coords(lat, lng)
+    """
+    deadline = _current_deadline.get()
+    if deadline is None or not deadline.nearly_spent(reserve):
+        return False
+    deadline.skip(name)
+    return True
@@ -0,0 +1,76 @@
+"""
+여행 목적지 지명 사전(gazetteer) 유틸리티
+
+이 모듈은 chatbot/data/gazetteer.json 에 번들된 한국 행정구역(시/군/구)과
+주요 관광지 별칭(예: 해운대 → 부산)을 KeywordMatcher 로 한 번에 검색합니다.
+LLM 호출 없이 사용자 입력에서 여행 목적지를 바로 찾기 위해 사용됩니다.
+"""
+
+# 표준 라이브러리
+import json
+import threading
+from pathlib import Path
+
+# 로컬 모듈
+from .matcher import KeywordMatcher
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.json"
+
+# 도(province) 단위는 시/군/관광지보다 우선순위가 낮음 ("강원도 강릉" → 강릉)
+LEVEL_PRIORITY = {"metro": 0, "city": 0, "province": 1}
+
+_matcher = None
+_lock = threading.Lock()
+
+
+def _build_matcher():
+    """gazetteer.json 을 읽어 별칭 → (대표 지명, 레벨) 매처 생성"""
+    with open(GAZETTEER_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+
+    keywords = {}
+    for region in data.get("regions", []):
+        for alias in region.get("aliases", []):
+            keywords[alias] = (region["name"], region.get("level", "city"))
+    return KeywordMatcher(keywords)
+
+
+def get_gazetteer_matcher():
+    """프로세스 전체에서 공유하는 지명 매처 반환 (최초 1회만 생성)"""
+    global _matcher
+    if _matcher is None:
+        with _lock:
+            if _matcher is None:
+                _matcher = _build_matcher()
+    return _matcher
+
+
+def find_destinations(text):
+    """
+    입력에서 찾은 모든 목적지를 등장 순서대로 반환 (중복 제거)
+
+    Returns:
+        list[str]: 대표 지명 목록 (예: ["부산", "경주"])
+    """
+    result = []
+    for _, _, _, (name, _) in get_gazetteer_matcher().find_longest(text or ""):
+        if name not in result:
+            result.append(name)
+    return result
+
+
+def find_destination(text):
+    """
+    입력에서 가장 적합한 목적지 하나를 반환 (없으면 None)
+
+    - 시/군/관광지 매칭을 도 단위 매칭보다 우선
+    - 같은 우선순위라면 먼저 등장한 지명 사용
+    """
+    matches = get_gazetteer_matcher().find_longest(text or "")
+    if not matches:
+        return None
+    best = min(
+        enumerate(matches),
+        key=lambda item: (LEVEL_PRIORITY.get(item[1][3][1], 0), item[0]),
+    )
+    return best[1][3][0]
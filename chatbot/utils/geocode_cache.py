@@ -0,0 +1,174 @@
+"""
+지오코딩 캐시 유틸리티
+
+이 모듈은 kakao_geocode / search_place_coordinates 앞단에 놓이는 2단 캐시를 제공합니다.
+- 1단: 프로세스 내부 LRU (TTLCache)
+- 2단: DB 캐시 (GeocodeCache 모델, (provider, query_key) 유니크 인덱스)
+검색 실패(None)도 짧은 TTL 로 저장하여(네거티브 캐시) 같은 실패 검색을 반복하지 않습니다.
+지오코더는 limit_geocode_ttl() 로 이번 결과의 TTL 을 줄이거나(근사 좌표) 저장을 막을 수 있습니다(API 오류 후 결과).
+"""
+
+# 표준 라이브러리
+import contextvars
+import functools
+from datetime import timedelta
+
+# Django 및 외부 모듈
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from rich.console import Console
+
+# 로컬 모듈
+from ..models import GeocodeCache
+from .cache import TTLCache, MISSING
+from .deadline import current_deadline
+
+console = Console()
+
+# 캐시 설정 (settings.py 에서 재정의 가능)
+GEOCODE_CACHE_TTL = getattr(settings, "GEOCODE_CACHE_TTL", 60 * 60 * 24 * 30)          # 성공 결과: 30일
+GEOCODE_CACHE_NEGATIVE_TTL = getattr(settings, "GEOCODE_CACHE_NEGATIVE_TTL", 60 * 60)   # 실패 결과: 1시간
+GEOCODE_CACHE_LRU_SIZE = getattr(settings, "GEOCODE_CACHE_LRU_SIZE", 2048)
+
+# 프로세스 내부 LRU (DB 조회 전 1차 캐시)
+_lru = TTLCache(maxsize=GEOCODE_CACHE_LRU_SIZE, ttl=GEOCODE_CACHE_TTL)
+
+# 지오코더 실행 중에 정해지는 이번 결과의 TTL 상한 (None: 제한 없음, 0: 저장하지 않음)
+_ttl_limit = contextvars.ContextVar("chatbot_geocode_ttl_limit", default=None)
+
+
+def limit_geocode_ttl(ttl):
+    """
+    실행 중인 지오코더 결과의 캐시 TTL 을 ttl 초 이하로 제한 (0 이면 저장하지 않음)
+
+    사용 예:
+        limit_geocode_ttl(GEOCODE_CACHE_NEGATIVE_TTL)   # 지역 중심 같은 근사 좌표
+        limit_geocode_ttl(0)                            # API 오류 후 만든 결과
+    """
+    current = _ttl_limit.get()
+    _ttl_limit.set(ttl if current is None else min(current, ttl))
+
+
+def make_geocode_key(query: str) -> str:
+    """검색어를 캐시 키로 정규화 (clean_query 기준, 대소문자 무시)"""
+    # 순환 import 방지를 위해 함수 내부에서 import
+    from .maps import clean_query
+
+    if not query:
+        return ""
+    key = clean_query(query) or query.strip()
+    return " ".join(key.lower().split())[:200]
+
+
+def _lookup_db(provider, key):
+    """DB 캐시 조회 (만료 전 행만 사용). 반환: (값, 남은 TTL 초) 또는 MISSING"""
+    try:
+        row = (
+            GeocodeCache.objects
+            .filter(provider=provider, query_key=key, expires_at__gt=timezone.now())
+            .values("result", "found", "expires_at")
+            .first()
+        )
+    except DatabaseError as e:
+        # 마이그레이션 전이거나 DB 잠금 등 → 캐시 없이 진행
+        console.log(f"⚠️ 지오코딩 캐시 조회 실패: {e}")
+        return MISSING
+
+    if row is None:
+        return MISSING
+    remaining = (row["expires_at"] - timezone.now()).total_seconds()
+    return (row["result"] if row["found"] else None), remaining
+
+
+def _store_db(provider, key, value, ttl):
+    """DB 캐시 저장 (있으면 갱신)"""
+    try:
+        GeocodeCache.objects.update_or_create(
+            provider=provider,
+            query_key=key,
+            defaults={
+                "result": value,
+                "found": value is not None,
+                "expires_at": timezone.now() + timedelta(seconds=ttl),
+            },
+        )
+    except DatabaseError as e:
+        console.log(f"⚠️ 지오코딩 캐시 저장 실패: {e}")
+
+
+def cached_geocoder(provider, decode=None, ttl_for=None):
+    """
+    지오코더 함수에 read-through 캐시를 씌우는 데코레이터
+
+    Args:
+        provider (str): 캐시 구분자 (지오코더 이름)
+        decode (callable): DB(JSON)에서 꺼낸 값을 원래 반환 형태로 복원하는 함수 (예: list → tuple)
+        ttl_for (callable): 결과값을 받아 TTL(초)을 돌려주는 함수 (기본: 성공/실패 TTL)
+
+    원본 함수는 wrapper.uncached 로 접근할 수 있습니다.
+    """
+    def default_ttl(value):
+        return GEOCODE_CACHE_TTL if value is not None else GEOCODE_CACHE_NEGATIVE_TTL
+
+    ttl_for = ttl_for or default_ttl
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(query, *args, **kwargs):
+            key = make_geocode_key(query)
+            if not key:
+                return func(query, *args, **kwargs)
+
+            lru_key = (provider, key)
+
+            # 1) 프로세스 내부 LRU
+            value = _lru.get(lru_key)
+            if value is not MISSING:
+                return value
+
+            # 2) DB 캐시 (인덱스 SELECT 1회)
+            cached = _lookup_db(provider, key)
+            if cached is not MISSING:
+                stored, remaining = cached
+                value = decode(stored) if (decode and stored is not None) else stored
+                _lru.set(lru_key, value, ttl=remaining)
+                console.log(f"💾 지오코딩 캐시 적중 ({provider}): '{key}'")
+                return value
+
+            # 3) 실제 API 호출 후 저장
+            deadline = current_deadline()
+            skipped = len(deadline.skipped) if deadline else 0
+            token = _ttl_limit.set(None)
+            try:
+                value = func(query, *args, **kwargs)
+                limit = _ttl_limit.get()
+            finally:
+                _ttl_limit.reset(token)
+            if deadline and (deadline.expired() or len(deadline.skipped) > skipped):
+                # 요청 예산 부족으로 검색을 줄였거나 시간 초과된 결과는 캐시하지 않음 (다음 요청에서 다시 검색)
+                return value
+            ttl = ttl_for(value) if limit is None else min(ttl_for(value), limit)
+            if ttl <= 0:
+                console.log(f"⚠️ 지오코딩 결과 캐시 생략 ({provider}): '{key}' (API 오류 후 결과)")
+                return value
+            _store_db(provider, key, value, ttl)
+            _lru.set(lru_key, value, ttl=ttl)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def clear_geocode_cache(db=False):
+    """캐시 비우기 (db=True 면 DB 캐시도 삭제)"""
+    _lru.clear()
+    if db:
+        GeocodeCache.objects.all().delete()
+
+
+def get_geocode_cache_stats():
+    """프로세스 내부 LRU 적중 통계 반환"""
+    return _lru.stats()
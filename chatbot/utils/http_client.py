@@ -0,0 +1,200 @@
+"""
+외부 API 공용 HTTP 클라이언트
+
+이 모듈은 카카오/구글/날씨/유튜브 API 호출이 함께 쓰는 requests 세션을 제공합니다.
+- 제공자(provider)마다 keep-alive 연결 풀을 가진 세션 1개 (프로세스 공용, 스레드 간 공유)
+- 제공자별 연결 풀 크기 / 기본 타임아웃 / 재시도 횟수 (settings.HTTP_CLIENT_PROVIDERS 로 재정의)
+- GET/HEAD 만 지수 백오프로 재시도 (429, 5xx, 연결 오류), POST 는 연결 단계 오류만 재시도
+- 기본 타임아웃은 요청 Deadline 의 남은 예산 안에서 결정 (호출 측에서 timeout 을 주면 그 값 사용)
+- 재시도는 다음 시도(같은 타임아웃) + 백오프가 남은 예산 안에 들어갈 때만 (DeadlineRetry)
+- get_http_client_stats() 로 제공자별 요청 수 / 새 연결 수 / 연결 재사용률 확인
+"""
+
+# 표준 라이브러리
+import contextvars
+import threading
+import time
+
+# Django 및 외부 모듈
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from rich.console import Console
+from urllib3.util.retry import Retry
+
+# 로컬 모듈
+from .deadline import remaining_timeout, current_deadline
+
+console = Console()
+
+# 제공자별 설정
+#   - pool_connections: 호스트별 연결 풀 개수 (제공자가 쓰는 호스트 수)
+#   - pool_maxsize    : 호스트 1개당 유지할 최대 연결 수 (동시 요청 수)
+#   - timeout         : 기본 요청 타임아웃(초)
+#   - retries         : 재시도 횟수 (0 이면 재시도 없음)
+DEFAULT_PROVIDERS = {
+    "kakao":       {"pool_connections": 2, "pool_maxsize": 16, "timeout": 5, "retries": 2},   # dapi.kakao.com, apis-navi.kakaomobility.com
+    "google":      {"pool_connections": 1, "pool_maxsize": 8,  "timeout": 5, "retries": 2},   # maps.googleapis.com
+    "openweather": {"pool_connections": 1, "pool_maxsize": 8,  "timeout": 5, "retries": 1},   # api.openweathermap.org
+    "youtube":     {"pool_connections": 1, "pool_maxsize": 4,  "timeout": 8, "retries": 1},   # www.googleapis.com
+}
+HTTP_RETRY_BACKOFF = getattr(settings, "HTTP_RETRY_BACKOFF", 0.2)   # 재시도 대기 = backoff * 2^(n-1) 초
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+PROVIDERS = {name: dict(config) for name, config in DEFAULT_PROVIDERS.items()}
+for _name, _config in getattr(settings, "HTTP_CLIENT_PROVIDERS", {}).items():
+    PROVIDERS.setdefault(_name, dict(DEFAULT_PROVIDERS["google"])).update(_config)
+
+_sessions = {}   # 제공자 → requests.Session
+_lock = threading.Lock()
+_stats = {}      # 제공자 → {"requests", "errors", "seconds"}
+
+# 진행 중인 요청 1건의 시도당 타임아웃 (DeadlineRetry 가 다음 시도가 예산 안에 들어가는지 판단할 때 사용)
+_call_timeout = contextvars.ContextVar("chatbot_http_call_timeout", default=None)
+
+
+def _timeout_seconds(timeout):
+    """requests timeout 값 → 시도 1회 최대 시간(초) ((connect, read) 튜플이면 합계)"""
+    if isinstance(timeout, (tuple, list)):
+        return sum(t for t in timeout if t)
+    return timeout
+
+
+class DeadlineRetry(Retry):
+    """
+    요청 Deadline 을 넘기지 않는 재시도 정책
+
+    시도마다 같은 타임아웃이 다시 적용되므로, 남은 예산이 "다음 시도 타임아웃 + 백오프" 보다 적으면
+    재시도 없이 바로 종료합니다 (재시도 소진과 같은 결과: 예외 또는 마지막 응답).
+    Deadline 이 없으면(관리 명령/셸) 기존 Retry 와 같습니다.
+    """
+
+    def increment(self, *args, **kwargs):
+        deadline = current_deadline()
+        timeout = _timeout_seconds(_call_timeout.get())
+        if deadline is not None and timeout:
+            backoff = self.backoff_factor * (2 ** len(self.history))
+            if deadline.remaining() < timeout + backoff:
+                console.log(f"⏱ 요청 예산 부족으로 재시도 생략 (남은 시간 {deadline.remaining():.1f}s)")
+                return Retry.increment(self.new(total=0), *args, **kwargs)
+        return super().increment(*args, **kwargs)
+
+
+def _build_session(config):
+    """연결 풀 + 재시도 정책이 적용된 세션 생성"""
+    retry = DeadlineRetry(
+        total=config["retries"],
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),   # 멱등 요청만 응답 기준 재시도
+        respect_retry_after_header=True,
+        raise_on_status=False,   # 재시도 후에도 실패하면 마지막 응답을 그대로 반환
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config["pool_connections"],
+        pool_maxsize=config["pool_maxsize"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(provider):
+    """
+    제공자 공용 세션 (최초 호출 시 생성, 스레드 안전)
+
+    Args:
+        provider (str): "kakao" | "google" | "openweather" | "youtube"
+    """
+    session = _sessions.get(provider)
+    if session is None:
+        with _lock:
+            session = _sessions.get(provider)
+            if session is None:
+                session = _sessions[provider] = _build_session(PROVIDERS[provider])
+                _stats[provider] = {"requests": 0, "errors": 0, "seconds": 0.0}
+    return session
+
+
+def request(provider, method, url, **kwargs):
+    """
+    제공자 세션으로 요청 (timeout 미지정 시 제공자 기본값과 남은 요청 예산 중 작은 값)
+
+    사용 예:
+        r = http_get("kakao", url, headers=headers, params=params)
+    """
+    session = get_session(provider)
+    kwargs.setdefault("timeout", remaining_timeout(PROVIDERS[provider]["timeout"]))
+    started = time.perf_counter()
+    failed = False
+    token = _call_timeout.set(kwargs["timeout"])
+    try:
+        return session.request(method, url, **kwargs)
+    except requests.RequestException:
+        failed = True
+        raise
+    finally:
+        _call_timeout.reset(token)
+        with _lock:
+            stats = _stats[provider]
+            stats["requests"] += 1
+            stats["errors"] += failed
+            stats["seconds"] += time.perf_counter() - started
+
+
+def http_get(provider, url, **kwargs):
+    """GET 요청 (재시도 대상)"""
+    return request(provider, "GET", url, **kwargs)
+
+
+def http_post(provider, url, **kwargs):
+    """POST 요청 (연결 단계 오류만 재시도)"""
+    return request(provider, "POST", url, **kwargs)
+
+
+def _pool_counts(session):
+    """세션의 urllib3 연결 풀 합계 → (새로 연 연결 수, 풀을 거친 요청 수)"""
+    connections = pool_requests = 0
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                pool_requests += pool.num_requests
+    return connections, pool_requests
+
+
+def get_http_client_stats():
+    """
+    제공자별 요청 수 / 오류 수 / 평균 시간 / 새 연결 수 / 연결 재사용률
+
+    (재사용률 = 1 - 새 연결 수 / 풀을 거친 요청 수, 재시도 요청도 포함)
+    """
+    with _lock:
+        sessions = dict(_sessions)
+        snapshot = {provider: dict(stats) for provider, stats in _stats.items()}
+
+    result = {}
+    for provider, session in sessions.items():
+        stats = snapshot[provider]
+        connections, pool_requests = _pool_counts(session)
+        result[provider] = {
+            "requests": stats["requests"],
+            "errors": stats["errors"],
+            "avg_ms": round(stats["seconds"] / stats["requests"] * 1000, 1) if stats["requests"] else 0,
+            "new_connections": connections,
+            "reuse_rate": round(1 - connections / pool_requests, 3) if pool_requests else 0,
+        }
+    return result
+
+
+def close_sessions():
+    """모든 제공자 세션 닫기 (설정 변경 후 재생성용)"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _stats.clear()
@@ -0,0 +1,138 @@
+"""
+증분 JSON 파서 유틸리티
+
+이 모듈은 LLM 이 스트리밍으로 생성하는 일정 JSON 을 조각 단위로 받아
+schedule.DayN.<활동> 객체가 닫히는 즉시 (DayN, 활동, 세부정보) 로 돌려줍니다.
+전체 응답이 끝나기 전에 Day1 의 좌표 검색/지도 표시를 시작할 수 있고,
+응답이 중간에 깨져도 이미 완성된 활동들은 partial_result() 로 살릴 수 있습니다.
+"""
+
+# 표준 라이브러리
+import json
+
+
+class ScheduleStreamParser:
+    """
+    일정 JSON 스트리밍 파서
+
+    사용 예:
+        parser = ScheduleStreamParser()
+        for chunk in llm.stream(...):
+            for day, activity, details in parser.feed(chunk.content):
+                ...
+        data = parser.result()   # 완전한 JSON (깨졌으면 None)
+    """
+
+    ACTIVITY_PATH_DEPTH = 3   # ["schedule", "DayN", "활동"]
+
+    def __init__(self, root_key="schedule"):
+        self.root_key = root_key
+        self._text = ""          # 이어 붙인 전체 텍스트
+        self._pos = 0            # 다음에 검사할 위치
+        self._stack = []         # 열린 객체/배열 [{"type", "start", "key", "expect_key"}]
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._root_start = None
+        self._root_end = None
+        self._activities = {}    # DayN → {활동: 세부정보} (완성된 것만)
+
+    @property
+    def done(self):
+        """최상위 JSON 객체가 닫혔는지 여부"""
+        return self._root_end is not None
+
+    @property
+    def text(self):
+        """지금까지 받은 전체 텍스트"""
+        return self._text
+
+    def feed(self, chunk):
+        """
+        텍스트 조각을 추가하고, 이번 조각으로 완성된 활동 목록을 반환
+
+        Returns:
+            list: [(DayN, 활동명, 세부정보 dict), ...]
+        """
+        if not chunk:
+            return []
+        self._text += chunk
+        completed = []
+        text = self._text
+
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    frame = self._stack[-1] if self._stack else None
+                    if frame and frame["type"] == "{" and frame["expect_key"]:
+                        try:
+                            frame["key"] = json.loads(text[self._string_start:i + 1])
+                        except ValueError:
+                            frame["key"] = None
+                continue
+
+            if not self._stack and ch != "{":
+                continue   # ```json 같은 앞부분 텍스트는 건너뜀
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if not self._stack:
+                    self._root_start = i
+                self._stack.append({"type": ch, "start": i, "key": None, "expect_key": ch == "{"})
+            elif ch == ":":
+                self._stack[-1]["expect_key"] = False
+            elif ch == ",":
+                if self._stack[-1]["type"] == "{":
+                    self._stack[-1]["expect_key"] = True
+            elif ch in "}]":
+                frame = self._stack.pop()
+                if not self._stack:
+                    self._root_end = i + 1
+                    break
+                path = [f["key"] for f in self._stack]
+                if (
+                    frame["type"] == "{"
+                    and len(path) == self.ACTIVITY_PATH_DEPTH
+                    and path[0] == self.root_key
+                ):
+                    activity = self._complete_activity(path[1], path[2], text[frame["start"]:i + 1])
+                    if activity:
+                        completed.append(activity)
+        return completed
+
+    def _complete_activity(self, day, activity, raw):
+        """닫힌 활동 객체를 파싱하여 저장"""
+        try:
+            details = json.loads(raw)
+        except ValueError:
+            return None
+        if not isinstance(details, dict):
+            return None
+        self._activities.setdefault(day, {})[activity] = details
+        return day, activity, details
+
+    def result(self):
+        """완전한 최상위 JSON 객체 (아직 안 닫혔거나 깨졌으면 None)"""
+        if not self.done:
+            return None
+        try:
+            return json.loads(self._text[self._root_start:self._root_end])
+        except ValueError:
+            return None
+
+    def partial_result(self):
+        """지금까지 완성된 활동만으로 구성한 일정 데이터 (없으면 None)"""
+        if not self._activities:
+            return None
+        return {self.root_key: {day: dict(acts) for day, acts in self._activities.items()}}
@@ -2,53 +2,81 @@
 지식 검색 관련 유틸리티 함수들
 
 이 모듈은 위키백과, SerpAPI 등을 사용한 외부 지식 검색 관련 함수들을 포함합니다.
+- 출처(위키백과/웹 검색)별 결과를 검색어 단위로 오래 캐시 (지역/관광지 배경 정보는 몇 달씩 바뀌지 않음)
+- 캐시에 없는 출처만 동시에 조회하고, 두 조회가 하나의 대기 시간(남은 요청 예산 안)을 함께 사용
+  (시간 안에 끝나지 않은 출처는 이번 답변에서 빠지고, 늦게 끝나면 캐시만 채움)
+- 동기 조회는 크기가 정해진 공용 실행기에서 실행하고, 같은 (출처, 검색어) 조회가 진행 중이면 새로 제출하지 않고 함께 기다림
+  (wikipedia 라이브러리는 타임아웃이 없어 멈춘 조회가 스레드를 붙잡아도 스레드 수는 KNOWLEDGE_MAX_WORKERS 를 넘지 않음)
+- 비동기 조회는 시간 초과 후에도 취소하지 않고 백그라운드에서 끝까지 실행 (이벤트 루프가 도는 동안 캐시를 채움)
+- get_knowledge_cache_stats() 로 출처별 캐시 적중/미스 확인
 """
 
 # 표준 라이브러리
+import asyncio
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # 외부 모듈
 import wikipedia
+from django.conf import settings
 from serpapi.google_search import GoogleSearch
 from rich.console import Console
 
+# 로컬 모듈
+from .aio import get_async_client
+from .cache import TTLCache, MISSING
+from .deadline import remaining_timeout, should_skip
+from .tracing import traced, bind_context
+
 console = Console()
 
 # API 키
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 
 
-def search_external_knowledge(query: str):
-    """위키백과 + SerpAPI 기반 외부 지식 검색"""
-    wikipedia.set_lang("ko")   # 한국어 위키백과 사용
-    wiki_summary, serp_snippets = "", ""
+WIKI_API_URL = "https://ko.wikipedia.org/w/api.php"
+SERPAPI_URL = "https://serpapi.com/search.json"
+KNOWLEDGE_TIMEOUT = 5   # 두 출처가 함께 쓰는 최대 대기(초), 요청 예산이 더 적게 남았으면 그 안에서
 
-    # 위키백과 요약 검색
-    try:
-        wiki_summary = wikipedia.summary(query, sentences=2)
-    except Exception:
-        pass
+# 캐시 설정 (settings.py 에서 재정의 가능)
+KNOWLEDGE_CACHE_TTL = getattr(settings, "KNOWLEDGE_CACHE_TTL", 60 * 60 * 24 * 30)   # 검색 결과: 30일
+KNOWLEDGE_EMPTY_CACHE_TTL = getattr(settings, "KNOWLEDGE_EMPTY_CACHE_TTL", 60 * 60)  # 결과 없음: 1시간
+KNOWLEDGE_MAX_WORKERS = getattr(settings, "KNOWLEDGE_MAX_WORKERS", 4)                 # 동기 조회 공용 스레드 수
 
-    # SerpAPI 검색 (웹 스니펫 추출)
-    try:
-        if SERPAPI_API_KEY:
-            search = GoogleSearch({
-                "q": query,
-                "hl": "ko",
-                "gl": "kr",
-                "api_key": SERPAPI_API_KEY,
-                "num": 3
-            })
-            results = search.get_dict()
-            snippets = [
-                item.get("snippet") for item in results.get("organic_results", [])
-                if item.get("snippet")
-            ]
-            serp_snippets = "\n".join(snippets[:3])
-    except Exception:
-        pass
-
-    # 최종 문자열 조립
+# 출처 → (검색어 → 요약/스니펫 문자열) 캐시, 조회 오류는 캐시하지 않음
+_knowledge_caches = {
+    "wikipedia": TTLCache(maxsize=1024, ttl=KNOWLEDGE_CACHE_TTL),
+    "serpapi": TTLCache(maxsize=1024, ttl=KNOWLEDGE_CACHE_TTL),
+}
+
+# 동기 조회 공용 실행기 + 진행 중인 조회 ((출처, 키) → Future)
+_executor = ThreadPoolExecutor(max_workers=KNOWLEDGE_MAX_WORKERS, thread_name_prefix="knowledge")
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# 시간 초과 후에도 끝까지 실행 중인 비동기 조회 (완료 전에 가비지 컬렉션되지 않도록 참조 유지)
+_background_tasks = set()
+
+wikipedia.set_lang("ko")   # 한국어 위키백과 사용 (언어 설정은 프로세스 전역이므로 한 번만)
+
+
+def _serp_params(query):
+    return {"q": query, "hl": "ko", "gl": "kr", "api_key": SERPAPI_API_KEY, "num": 3}
+
+
+def _serp_snippets(results):
+    """SerpAPI 결과에서 웹 스니펫 최대 3개 추출"""
+    snippets = [
+        item.get("snippet") for item in results.get("organic_results", [])
+        if item.get("snippet")
+    ]
+    return "\n".join(snippets[:3])
+
+
+def _format_external_info(wiki_summary, serp_snippets):
+    """최종 문자열 조립 (둘 다 없으면 None)"""
     external_info = ""
     if wiki_summary:
         external_info += f"📚 위키백과 요약:\n{wiki_summary}\n"
@@ -56,3 +84,177 @@ def search_external_knowledge(query: str):
         external_info += f"🌐 웹 검색 결과:\n{serp_snippets}\n"
 
     return external_info if external_info else None
+
+
+def _knowledge_key(query):
+    return " ".join(str(query).split()).lower()
+
+
+def _sources():
+    """조회할 출처 목록 (SerpAPI 키가 없으면 위키백과만)"""
+    return ["wikipedia", "serpapi"] if SERPAPI_API_KEY else ["wikipedia"]
+
+
+def _cached_sources(key):
+    """(캐시에서 찾은 출처 → 결과, 조회가 필요한 출처 목록)"""
+    results, pending = {}, []
+    for source in _sources():
+        value = _knowledge_caches[source].get(key)
+        if value is MISSING:
+            pending.append(source)
+        else:
+            results[source] = value
+    return results, pending
+
+
+def _remember(source, key, value):
+    """조회 결과 캐시 (결과 없음은 짧게)"""
+    _knowledge_caches[source].set(key, value, ttl=KNOWLEDGE_CACHE_TTL if value else KNOWLEDGE_EMPTY_CACHE_TTL)
+
+
+def _finish(query, results, pending, timed_out):
+    """로그 + 최종 문자열 조립"""
+    cached = [source for source in results if source not in pending]
+    console.log(
+        f"📚 외부 지식 '{query}': 캐시 {cached or '없음'} / 조회 {pending or '없음'}"
+        + (f" / 시간 초과 {timed_out}" if timed_out else "")
+    )
+    return _format_external_info(results.get("wikipedia", ""), results.get("serpapi", ""))
+
+
+# -------------------- 조회 (동기) --------------------
+def _wiki_summary(query):
+    """위키백과 요약 (문서 없음/동음이의어는 빈 결과)"""
+    try:
+        return wikipedia.summary(query, sentences=2)
+    except (wikipedia.exceptions.PageError, wikipedia.exceptions.DisambiguationError):
+        return ""
+
+
+def _serp_search(query):
+    """SerpAPI 검색 (웹 스니펫 추출)"""
+    search = GoogleSearch(_serp_params(query))
+    search.timeout = remaining_timeout(KNOWLEDGE_TIMEOUT)
+    return _serp_snippets(search.get_dict())
+
+
+_FETCHERS = {"wikipedia": _wiki_summary, "serpapi": _serp_search}
+
+
+def _fetch(source, key, query):
+    """출처 1개 조회 후 캐시 (오류는 캐시하지 않고 빈 결과)"""
+    try:
+        value = _FETCHERS[source](query)
+    except Exception as e:
+        console.log(f"⚠️ 외부 지식 조회 실패 ({source}): {e}")
+        return ""
+    _remember(source, key, value)
+    return value
+
+
+def _submit(source, key, query):
+    """공용 실행기에 조회 제출 (같은 조회가 진행 중이면 그 Future 를 함께 사용)"""
+    with _inflight_lock:
+        future = _inflight.get((source, key))
+        if future is not None:
+            console.log(f"🔁 진행 중인 외부 지식 조회 공유 ({source}): '{key}'")
+            return future
+        future = _inflight[(source, key)] = _executor.submit(bind_context(_fetch), source, key, query)
+    future.add_done_callback(lambda done: _finish_inflight(source, key, done))
+    return future
+
+
+def _finish_inflight(source, key, future):
+    with _inflight_lock:
+        if _inflight.get((source, key)) is future:
+            del _inflight[(source, key)]
+
+
+@traced("knowledge")
+def search_external_knowledge(query: str):
+    """위키백과 + SerpAPI 기반 외부 지식 검색 (출처별 캐시, 캐시에 없는 출처는 동시에 조회)"""
+    # 배경 지식은 부가 정보 → 요청 예산이 거의 남지 않았으면 생략
+    if should_skip("knowledge"):
+        return None
+    key = _knowledge_key(query)
+    results, pending = _cached_sources(key)
+
+    timed_out = []
+    if pending:
+        # wikipedia 라이브러리는 타임아웃 지정이 안 되므로 기다리는 쪽에서 공용 대기 시간으로 끊음
+        # (늦게 끝나는 조회는 기다리지 않음 → 공용 실행기에서 마저 끝나 캐시만 채움)
+        budget = remaining_timeout(KNOWLEDGE_TIMEOUT)
+        futures = {_submit(source, key, query): source for source in pending}
+        done, not_done = wait(futures, timeout=budget)
+        results.update({futures[future]: future.result() for future in done})
+        timed_out = [futures[future] for future in not_done]
+
+    return _finish(query, results, pending, timed_out)
+
+
+# -------------------- 비동기 버전 (ASGI 파이프라인용) --------------------
+def _first_sentences(text, count=2):
+    """요약문 앞 문장 count 개 (wikipedia.summary(sentences=2) 와 같은 길이)"""
+    sentences = re.split(r"(?<=[.!?])\s+", (text or "").strip())
+    return " ".join(sentences[:count])
+
+
+async def _awiki_summary(query):
+    """MediaWiki API 로 검색 1순위 문서의 도입부 요약"""
+    params = {
+        "action": "query", "format": "json", "redirects": 1,
+        "generator": "search", "gsrsearch": query, "gsrlimit": 1,
+        "prop": "extracts", "exintro": 1, "explaintext": 1,
+    }
+    resp = await get_async_client().get(WIKI_API_URL, params=params, timeout=remaining_timeout(KNOWLEDGE_TIMEOUT))
+    pages = resp.json().get("query", {}).get("pages", {})
+    extract = next((page.get("extract", "") for page in pages.values()), "")
+    return _first_sentences(extract)
+
+
+async def _aserp_snippets(query):
+    resp = await get_async_client().get(
+        SERPAPI_URL, params={"engine": "google", **_serp_params(query)}, timeout=remaining_timeout(KNOWLEDGE_TIMEOUT)
+    )
+    return _serp_snippets(resp.json())
+
+
+_AFETCHERS = {"wikipedia": _awiki_summary, "serpapi": _aserp_snippets}
+
+
+async def _afetch(source, key, query):
+    """_fetch 의 비동기 버전"""
+    try:
+        value = await _AFETCHERS[source](query)
+    except Exception as e:
+        console.log(f"⚠️ 외부 지식 조회 실패 ({source}): {e}")
+        return ""
+    _remember(source, key, value)
+    return value
+
+
+@traced("knowledge")
+async def asearch_external_knowledge(query: str):
+    """search_external_knowledge 의 비동기 버전 (동기 버전과 같은 캐시 공유)"""
+    if should_skip("knowledge"):
+        return None
+    key = _knowledge_key(query)
+    results, pending = _cached_sources(key)
+
+    timed_out = []
+    if pending:
+        tasks = {asyncio.ensure_future(_afetch(source, key, query)): source for source in pending}
+        done, not_done = await asyncio.wait(tasks, timeout=remaining_timeout(KNOWLEDGE_TIMEOUT))
+        for task in not_done:
+            # 취소하지 않고 끝까지 실행 (httpx 타임아웃 안에서 끝나며, 성공하면 캐시만 채움)
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        results.update({tasks[task]: task.result() for task in done})
+        timed_out = [tasks[task] for task in not_done]
+
+    return _finish(query, results, pending, timed_out)
+
+
+def get_knowledge_cache_stats():
+    """출처별 캐시 적중/미스 통계"""
+    return {source: cache.stats() for source, cache in _knowledge_caches.items()}
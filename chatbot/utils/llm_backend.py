@@ -0,0 +1,298 @@
+"""
+LLM 백엔드 선택 유틸리티
+
+이 모듈은 LangChain 채팅 모델(ChatOpenAI)과 OpenAI SDK 클라이언트를 settings.LLM_BACKEND 에 따라 만들어 줍니다.
+- "openai": 실제 OpenAI 호출 (기본값)
+- "fake"  : 네트워크 없이 준비된 응답(data/fake_llm.json)을 지연 시간을 흉내 내며 돌려주는 로컬 가짜 모델
+            (부하 테스트/벤치마크용, 항상 같은 입력에 같은 응답, bind_tools 시 키워드로 도구 호출 계획)
+"""
+
+# 표준 라이브러리
+import asyncio
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+# Django 및 외부 모듈
+from django.conf import settings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# 로컬 모듈
+from .gazetteer import find_destination
+from .tokens import count_tokens, truncate_tokens
+
+# 백엔드 설정 (settings.py 에서 재정의 가능)
+LLM_BACKEND = getattr(settings, "LLM_BACKEND", "openai")
+LLM_FAKE_LATENCY = getattr(settings, "LLM_FAKE_LATENCY", 0.5)           # 첫 토큰까지 지연(초)
+LLM_FAKE_CHUNK_DELAY = getattr(settings, "LLM_FAKE_CHUNK_DELAY", 0.01)  # 스트리밍 조각 사이 지연(초)
+LLM_FAKE_CHUNK_SIZE = 16                                                # 스트리밍 조각 글자 수
+
+# 가짜 모델의 도구 호출 계획 (입력 키워드 → 한 턴에 요청할 도구들, 위에 있는 규칙 우선)
+FAKE_TOOL_PLANS = [
+    ("맛집", ["kakao_place_search", "google_place_details", "youtube_search"]),
+    ("날씨", ["weather_search"]),
+    ("브이로그", ["youtube_search"]),
+]
+FAKE_DEFAULT_TOOLS = ["external_knowledge_search"]
+
+FAKE_RESPONSES_PATH = Path(__file__).resolve().parent.parent / "data" / "fake_llm.json"
+
+_fake_responses = None
+
+
+def is_fake_backend():
+    """가짜 LLM 백엔드 사용 여부"""
+    return LLM_BACKEND == "fake"
+
+
+def _load_fake_responses():
+    """준비된 가짜 응답 로드 (최초 1회)"""
+    global _fake_responses
+    if _fake_responses is None:
+        with open(FAKE_RESPONSES_PATH, encoding="utf-8") as f:
+            _fake_responses = json.load(f)
+    return _fake_responses
+
+
+def fake_reply(system_text, user_text, json_mode=False):
+    """
+    프롬프트 종류에 맞는 가짜 응답 생성 (같은 입력이면 항상 같은 응답)
+
+    Args:
+        system_text (str): system 메시지 내용
+        user_text (str): 나머지 메시지 내용
+        json_mode (bool): JSON 모드 요청 여부 (일정 생성)
+    """
+    data = _load_fake_responses()
+    prompt = f"{system_text}\n{user_text}"
+
+    if json_mode or '"schedule"' in prompt:
+        return json.dumps(data["schedule"], ensure_ascii=False, indent=2)
+    if "Final Answer" in prompt:
+        # zero-shot-react 에이전트 형식 (도구 호출 없이 바로 최종 답변)
+        return f"Thought: 추가 도구 없이 답변할 수 있습니다.\nFinal Answer: {data['general_answer']}"
+    if "목적지 추출" in system_text:
+        return find_destination(user_text) or data["destination"]
+    return data["simple_answer"]
+
+
+def fake_tool_calls(user_text, tools):
+    """
+    함수 호출 모드(bind_tools)의 가짜 도구 호출 목록 (입력 키워드로 도구 선택, 검색어는 감지한 목적지)
+
+    Args:
+        user_text (str): system 을 제외한 메시지 내용
+        tools (list): OpenAI tools 형식 스키마
+    """
+    available = {tool["function"]["name"] for tool in tools}
+    plan = next((names for keyword, names in FAKE_TOOL_PLANS if keyword in user_text), FAKE_DEFAULT_TOOLS)
+    query = find_destination(user_text) or _load_fake_responses()["destination"]
+    return [
+        {"name": name, "args": {"query": query}, "id": f"call_fake_{index}", "type": "tool_call"}
+        for index, name in enumerate(plan)
+        if name in available
+    ]
+
+
+def _chunks(text, size=LLM_FAKE_CHUNK_SIZE):
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+def _usage(system_text, user_text, reply):
+    """대략적인 토큰 사용량 (실제 모델과 같은 usage_metadata 형태)"""
+    input_tokens = count_tokens(system_text) + count_tokens(user_text)
+    output_tokens = count_tokens(reply)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+def _split_messages(messages):
+    """LangChain 메시지 목록 → (system 내용, 나머지 내용)"""
+    system = "\n".join(str(m.content) for m in messages if m.type == "system")
+    other = "\n".join(str(m.content) for m in messages if m.type != "system")
+    return system, other
+
+
+class FakeChatModel(BaseChatModel):
+    """ChatOpenAI 대신 사용하는 로컬 가짜 채팅 모델 (bind/stream/에이전트 호환)"""
+
+    model_name: str = "fake-gpt"
+    streaming: bool = False
+    max_tokens: Optional[int] = None   # 실제 모델처럼 출력 토큰 상한에서 응답 잘림
+    latency: float = LLM_FAKE_LATENCY
+    chunk_delay: float = LLM_FAKE_CHUNK_DELAY
+
+    @property
+    def _llm_type(self):
+        return "fake-travel-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        """ChatOpenAI.bind_tools 와 같은 형태 (도구 스키마는 _reply 에서 가짜 도구 호출 계획에 사용)"""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _reply(self, messages, stop, kwargs):
+        """(응답 텍스트, 사용량, 도구 호출 목록)"""
+        system, other = _split_messages(messages)
+        if any(m.type == "tool" for m in messages):
+            # 도구 결과를 받은 종합 호출 → 일반 질문 최종 답변
+            reply = _load_fake_responses()["general_answer"]
+        elif kwargs.get("tools"):
+            tool_calls = fake_tool_calls(other, kwargs["tools"])
+            if tool_calls:
+                return "", _usage(system, other, ""), tool_calls
+            reply = _load_fake_responses()["general_answer"]
+        else:
+            json_mode = (kwargs.get("response_format") or {}).get("type") == "json_object"
+            reply = fake_reply(system, other, json_mode=json_mode)
+        if self.max_tokens:
+            reply = truncate_tokens(reply, self.max_tokens)
+        if stop:
+            # 실제 모델처럼 stop 문자열에서 생성 중단
+            for token in stop:
+                reply = reply.split(token)[0]
+        return reply, _usage(system, other, reply), []
+
+    def _tool_call_chunk(self, tool_calls, usage):
+        """도구 호출 응답의 스트리밍 조각 (실제 모델처럼 tool_call_chunks 로 전달)"""
+        return ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"], ensure_ascii=False), "id": call["id"], "index": index}
+                for index, call in enumerate(tool_calls)
+            ],
+            usage_metadata=usage,
+        ))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply, usage, tool_calls = self._reply(messages, stop, kwargs)
+        time.sleep(self.latency + self.chunk_delay * len(_chunks(reply)))
+        message = AIMessage(content=reply, tool_calls=tool_calls, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        reply, usage, tool_calls = self._reply(messages, stop, kwargs)
+        time.sleep(self.latency)
+        if tool_calls:
+            yield self._tool_call_chunk(tool_calls, usage)
+            return
+        pieces = _chunks(reply)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(self.chunk_delay)
+            last = index == len(pieces) - 1
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=piece, usage_metadata=usage if last else None)
+            )
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply, usage, tool_calls = self._reply(messages, stop, kwargs)
+        await asyncio.sleep(self.latency + self.chunk_delay * len(_chunks(reply)))
+        message = AIMessage(content=reply, tool_calls=tool_calls, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        reply, usage, tool_calls = self._reply(messages, stop, kwargs)
+        await asyncio.sleep(self.latency)
+        if tool_calls:
+            yield self._tool_call_chunk(tool_calls, usage)
+            return
+        pieces = _chunks(reply)
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(self.chunk_delay)
+            last = index == len(pieces) - 1
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=piece, usage_metadata=usage if last else None)
+            )
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+class FakeOpenAIClient:
+    """OpenAI() 대신 사용하는 로컬 가짜 클라이언트 (chat.completions.create 만 지원)"""
+
+    def __init__(self, latency=LLM_FAKE_LATENCY, chunk_delay=LLM_FAKE_CHUNK_DELAY):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    @staticmethod
+    def _reply(messages, response_format, max_tokens=None):
+        messages = messages or []
+        system = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+        other = "\n".join(m["content"] for m in messages if m.get("role") != "system")
+        json_mode = (response_format or {}).get("type") == "json_object"
+        reply = fake_reply(system, other, json_mode=json_mode)
+        return truncate_tokens(reply, max_tokens) if max_tokens else reply
+
+    def _create(self, model=None, messages=None, stream=False, response_format=None, max_tokens=None, **kwargs):
+        reply = self._reply(messages, response_format, max_tokens)
+
+        if stream:
+            return self._stream(reply)
+        time.sleep(self.latency + self.chunk_delay * len(_chunks(reply)))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    def _stream(self, reply):
+        time.sleep(self.latency)
+        for index, piece in enumerate(_chunks(reply)):
+            if index:
+                time.sleep(self.chunk_delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class FakeAsyncOpenAIClient(FakeOpenAIClient):
+    """AsyncOpenAI() 대신 사용하는 로컬 가짜 클라이언트 (await chat.completions.create)"""
+
+    async def _create(self, model=None, messages=None, stream=False, response_format=None, max_tokens=None, **kwargs):
+        reply = self._reply(messages, response_format, max_tokens)
+
+        if stream:
+            return self._astream(reply)
+        await asyncio.sleep(self.latency + self.chunk_delay * len(_chunks(reply)))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    async def _astream(self, reply):
+        await asyncio.sleep(self.latency)
+        for index, piece in enumerate(_chunks(reply)):
+            if index:
+                await asyncio.sleep(self.chunk_delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+def get_chat_model(model="gpt-4o-mini", **kwargs):
+    """
+    LangChain 채팅 모델 생성 (LLM_BACKEND 에 따라 ChatOpenAI 또는 FakeChatModel)
+
+    Args:
+        model (str): 모델 이름
+        **kwargs: ChatOpenAI 옵션 (가짜 모델은 streaming, max_tokens 만 사용)
+    """
+    if is_fake_backend():
+        return FakeChatModel(model_name=model, streaming=kwargs.get("streaming", False), max_tokens=kwargs.get("max_tokens"))
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, **kwargs)
+
+
+def get_openai_client():
+    """OpenAI SDK 클라이언트 생성 (LLM_BACKEND 에 따라 OpenAI 또는 FakeOpenAIClient)"""
+    if is_fake_backend():
+        return FakeOpenAIClient()
+    from openai import OpenAI
+    return OpenAI()
+
+
+def get_async_openai_client():
+    """비동기 OpenAI SDK 클라이언트 생성 (LLM_BACKEND 에 따라 AsyncOpenAI 또는 FakeAsyncOpenAIClient)"""
+    if is_fake_backend():
+        return FakeAsyncOpenAIClient()
+    from openai import AsyncOpenAI
+    return AsyncOpenAI()
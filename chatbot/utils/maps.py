@@ -10,12 +10,21 @@ import re
 import json
 import requests
 import difflib
+import threading
 
 # 외부 모듈
 from rich.console import Console
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 
+# 로컬 모듈
+from .geocode_cache import cached_geocoder, limit_geocode_ttl, GEOCODE_CACHE_NEGATIVE_TTL
+from .aio import get_async_client, run_sync
+from .deadline import remaining_timeout, deadline_expired, should_skip, DeadlineExceeded, with_deadline, ROUTE_DEADLINE_SECONDS
+from .tracing import traced
+from .http_client import http_get, http_post
+
 console = Console()
 
 # API 키
@@ -27,6 +36,22 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 # 불용어 목록
 STOPWORDS = ["추천","일정","시간","도착","출발","점심","저녁","식사","활동","옵션","여행","코스","계획", "그럼"]
 
+# 검색 전략 엔진 설정 (settings.py 에서 재정의 가능)
+# - 장소명이 검색어와 완전 일치하는 후보의 점수가 이 값 이상이면 남은 전략을 실행하지 않고 바로 종료
+#   (점수는 이름/카테고리/지역/도시 가산점의 합이라, 이름이 다른 후보도 100점을 넘을 수 있으므로 이름 일치를 함께 요구)
+KAKAO_GEOCODE_CONFIDENT_SCORE = getattr(settings, "KAKAO_GEOCODE_CONFIDENT_SCORE", 100)
+# - 전략 1회당 요청 결과 수 (카카오 키워드 검색 API 최대값은 15)
+KAKAO_GEOCODE_PAGE_SIZE = getattr(settings, "KAKAO_GEOCODE_PAGE_SIZE", 15)
+
+# 외부 API 요청 1회 최대 대기(초) → 요청 예산(utils/deadline.py)이 더 적게 남았으면 그 안에서
+KAKAO_SEARCH_TIMEOUT = 3      # 카카오 키워드 검색 (전략마다 1회)
+GOOGLE_PLACES_TIMEOUT = 5     # 구글 플레이스 검색/상세
+ROUTE_API_TIMEOUT = 10        # 길찾기 (카카오 모빌리티, 구글 Directions)
+
+# 검색 전략 사용량 통계 (조회 횟수, 실제 호출한 전략 수, 조기 종료 횟수, 전략 수별 분포)
+_strategy_stats_lock = threading.Lock()
+_strategy_stats = {"lookups": 0, "strategies_spent": 0, "early_exits": 0, "histogram": {}}
+
 
 def clean_query(text: str):
     """질문에서 불필요한 단어 제거 (카카오 API 검색 정확도 향상)"""
@@ -112,8 +137,46 @@ def adjust_coordinates_to_road(x: float, y: float) -> tuple:
     return closest_road
 
 
+def dedupe_search_strategies(strategies):
+    """검색 전략 목록에서 빈 값과 중복(공백/대소문자 차이 포함)을 제거 (순서 유지)"""
+    seen = set()
+    unique = []
+    for strategy in strategies:
+        if not strategy:
+            continue
+        normalized = " ".join(strategy.split())
+        key = normalized.lower()
+        if not normalized or key in seen:
+            continue
+        seen.add(key)
+        unique.append(normalized)
+    return unique
+
+
+def _record_strategy_usage(spent, planned):
+    """kakao_geocode 1회 조회에 사용된 전략 수 기록"""
+    with _strategy_stats_lock:
+        _strategy_stats["lookups"] += 1
+        _strategy_stats["strategies_spent"] += spent
+        if spent < planned:
+            _strategy_stats["early_exits"] += 1
+        histogram = _strategy_stats["histogram"]
+        histogram[spent] = histogram.get(spent, 0) + 1
+
+
+def get_geocode_strategy_stats():
+    """검색 전략 사용량 통계 반환 (조회당 평균 전략 수 포함)"""
+    with _strategy_stats_lock:
+        stats = dict(_strategy_stats, histogram=dict(_strategy_stats["histogram"]))
+    lookups = stats["lookups"]
+    stats["avg_strategies_per_lookup"] = round(stats["strategies_spent"] / lookups, 2) if lookups else 0
+    return stats
+
+
+@cached_geocoder("kakao_geocode", decode=tuple)
+@traced("kakao")
 def kakao_geocode(query: str):
-    """카카오 API를 활용한 장소 좌표 검색 (정확한 좌표를 무조건 찾는 시스템)"""
+    """카카오 API를 활용한 장소 좌표 검색 (정확한 좌표를 무조건 찾는 시스템, 지오코딩 캐시 적용)"""
     if not KAKAO_REST_API_KEY:
         return None
         
@@ -189,21 +252,38 @@ def kakao_geocode(query: str):
             cleaned_query.split()[0] if ' ' in cleaned_query else None,  # 첫 단어만
         ])
     
-    # None 값 제거
-    search_strategies = [q for q in search_strategies if q]
+    # None 값 제거 + 중복 전략 제거 (네트워크 호출 전에 정리)
+    search_strategies = dedupe_search_strategies(search_strategies)
     
     console.log(f"📝 검색 전략 목록: {search_strategies}")
     
     all_candidates = []  # 모든 후보 저장
+    exact_score = None   # 장소명 완전 일치 후보의 최고 점수
+    strategies_spent = 0 # 실제로 호출한 전략 수
+    request_errors = 0   # 예외/비정상 응답으로 끝난 전략 수
     
     for search_term in search_strategies:
+        # ✅ 조기 종료: 장소명이 완전 일치하는 확실한 후보가 있으면 남은 전략은 건너뜀
+        if exact_score is not None and exact_score >= KAKAO_GEOCODE_CONFIDENT_SCORE:
+            console.log(f"⏩ 조기 종료: 장소명 완전 일치 후보 {exact_score}점 ≥ {KAKAO_GEOCODE_CONFIDENT_SCORE}점")
+            break
+        # ✅ 요청 예산 소진: 다 썼거나, 후보가 있는데 거의 다 썼으면 남은 전략은 건너뜀
+        if strategies_spent and (deadline_expired() or (all_candidates and should_skip("kakao_strategies"))):
+            console.log(f"⏱ 요청 예산 부족으로 검색 전략 중단 ({strategies_spent}/{len(search_strategies)})")
+            break
+        
+        strategies_spent += 1
         try:
             params = {
                 "query": search_term,
-                "size": 20,  # 더 많은 결과 검색
+                "size": KAKAO_GEOCODE_PAGE_SIZE,
                 "sort": "accuracy"  # 정확도 순으로 정렬
             }
-            r = requests.get(url, headers=headers, params=params)
+            r = http_get("kakao", url, headers=headers, params=params, timeout=remaining_timeout(KAKAO_SEARCH_TIMEOUT))
+            if r.status_code != 200:
+                request_errors += 1
+                console.log(f"카카오 지도 검색 실패 ({search_term}): HTTP {r.status_code}")
+                continue
             data = r.json()
             
             if data.get("documents"):
@@ -217,7 +297,8 @@ def kakao_geocode(query: str):
                     score = 0
                     
                     # 1. 장소명 정확도 (가장 중요)
-                    if place_name.lower() == cleaned_query.lower():
+                    exact_name = place_name.lower() == cleaned_query.lower()
+                    if exact_name:
                         score += 100  # 완전 일치
                     elif cleaned_query.lower() in place_name.lower():
                         score += 80  # 부분 일치
@@ -302,11 +383,18 @@ def kakao_geocode(query: str):
                     })
                     
                     console.log(f"📊 후보 점수: {place_name} = {score}점 (카테고리: {category}, 주소: {address})")
+                    
+                    if exact_name and (exact_score is None or score > exact_score):
+                        exact_score = score
                         
         except Exception as e:
+            request_errors += 1
             console.log(f"카카오 지도 검색 오류 ({search_term}): {e}")
             continue
     
+    _record_strategy_usage(strategies_spent, len(search_strategies))
+    console.log(f"📈 검색 전략 사용량: {strategies_spent}/{len(search_strategies)}개 ('{query}')")
+    
     # ✅ 모든 후보 중에서 최고 점수 선택
     if all_candidates:
         # 점수순으로 정렬
@@ -336,6 +424,8 @@ def kakao_geocode(query: str):
             console.log(f"⚠️ 모든 후보의 점수가 낮음. 최고 점수: {best_candidate['score']}")
     
     # ✅ 백업 시스템: 정확한 좌표를 찾지 못한 경우
+    # 근사 좌표(지역/유형 중심)는 짧게만 캐시하고, 검색 요청 오류 뒤의 결과(실패 포함)는 캐시하지 않음
+    limit_geocode_ttl(0 if request_errors else GEOCODE_CACHE_NEGATIVE_TTL)
     from .coordinates import try_backup_coordinate_search
     console.log(f"🔄 백업 좌표 시스템 실행: '{query}'")
     backup_result = try_backup_coordinate_search(cleaned_query)
@@ -370,6 +460,40 @@ def clean_place_query(text: str) -> str:
     return cleaned
 
 
+GOOGLE_TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+GOOGLE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+GOOGLE_DETAILS_FIELDS = "name,formatted_address,formatted_phone_number,geometry,opening_hours"
+
+
+def _first_place_id(data):
+    """Text Search 응답에서 첫 번째 장소의 place_id 추출 (없으면 None)"""
+    # 응답 상태 확인
+    if data.get("status") != "OK" or not data.get("results"):
+        return None
+    return data["results"][0].get("place_id")
+
+
+def _place_details_result(details):
+    """Details 응답 → 장소 상세정보 딕셔너리 (실패 시 None)"""
+    if details.get("status") != "OK":
+        return None
+
+    result = details.get("result", {})
+
+    # 운영시간 텍스트 정리
+    opening_hours = result.get("opening_hours", {}).get("weekday_text", [])
+    opening_hours_str = "\n".join(opening_hours) if opening_hours else "운영시간 정보 없음"
+
+    return {
+        "name": result.get("name", "이름 없음"),
+        "address": result.get("formatted_address", "주소 없음"),
+        "phone": result.get("formatted_phone_number", "전화번호 없음"),
+        "location": result.get("geometry", {}).get("location"),  # 위도/경도 좌표
+        "opening_hours": opening_hours_str
+    }
+
+
+@traced("google_places")
 def google_place_details(query: str):
     """구글 플레이스 API로 장소 상세정보 가져오기 (안전 버전)"""
     if not GOOGLE_API_KEY:
@@ -377,60 +501,75 @@ def google_place_details(query: str):
 
     try:
         # 1) 장소 검색 (Text Search API 호출)
-        search_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
         search_params = {
             "query": query,
             "key": GOOGLE_API_KEY,
             "language": "ko"
         }
-        resp = requests.get(search_url, params=search_params, timeout=5)
-        data = resp.json()
-
-        # 응답 상태 확인
-        if data.get("status") != "OK" or not data.get("results"):
-            return None
-
-        # 검색 결과에서 첫 번째 장소의 place_id 추출
-        place_id = data["results"][0].get("place_id")
+        resp = http_get("google", GOOGLE_TEXT_SEARCH_URL, params=search_params, timeout=remaining_timeout(GOOGLE_PLACES_TIMEOUT))
+        place_id = _first_place_id(resp.json())
         if not place_id:
             return None
 
         # 2) 장소 상세정보 요청 (Details API 호출)
-        details_url = "https://maps.googleapis.com/maps/api/place/details/json"
         details_params = {
             "place_id": place_id,
             "key": GOOGLE_API_KEY,
             "language": "ko",
-            "fields": "name,formatted_address,formatted_phone_number,geometry,opening_hours"
+            "fields": GOOGLE_DETAILS_FIELDS
         }
-        details_resp = requests.get(details_url, params=details_params, timeout=5)
-        details = details_resp.json()
+        details_resp = http_get("google", GOOGLE_DETAILS_URL, params=details_params, timeout=remaining_timeout(GOOGLE_PLACES_TIMEOUT))
+        return _place_details_result(details_resp.json())
 
-        if details.get("status") != "OK":
-            return None
+    except Exception as e:
+        # 네트워크 문제, JSON 파싱 문제 등
+        console.log(f"[구글플레이스상세] 오류 발생: {e}")
+        return None
 
-        result = details.get("result", {})
 
-        # 운영시간 텍스트 정리
-        opening_hours = result.get("opening_hours", {}).get("weekday_text", [])
-        opening_hours_str = "\n".join(opening_hours) if opening_hours else "운영시간 정보 없음"
+# -------------------- 비동기 버전 (ASGI 파이프라인용) --------------------
+@traced("google_places")
+async def agoogle_place_details(query: str):
+    """google_place_details 의 비동기 버전"""
+    if not GOOGLE_API_KEY:
+        return None
 
-        return {
-            "name": result.get("name", "이름 없음"),
-            "address": result.get("formatted_address", "주소 없음"),
-            "phone": result.get("formatted_phone_number", "전화번호 없음"),
-            "location": result.get("geometry", {}).get("location"),  # 위도/경도 좌표
-            "opening_hours": opening_hours_str
-        }
+    try:
+        client = get_async_client()
+        resp = await client.get(
+            GOOGLE_TEXT_SEARCH_URL, params={"query": query, "key": GOOGLE_API_KEY, "language": "ko"},
+            timeout=remaining_timeout(GOOGLE_PLACES_TIMEOUT),
+        )
+        place_id = _first_place_id(resp.json())
+        if not place_id:
+            return None
+
+        details_resp = await client.get(GOOGLE_DETAILS_URL, params={
+            "place_id": place_id,
+            "key": GOOGLE_API_KEY,
+            "language": "ko",
+            "fields": GOOGLE_DETAILS_FIELDS
+        }, timeout=remaining_timeout(GOOGLE_PLACES_TIMEOUT))
+        return _place_details_result(details_resp.json())
 
     except Exception as e:
-        # 네트워크 문제, JSON 파싱 문제 등
         console.log(f"[구글플레이스상세] 오류 발생: {e}")
         return None
 
 
+async def akakao_geocode(query: str):
+    """
+    kakao_geocode 의 비동기 버전
+
+    검색 전략 엔진과 지오코딩 캐시(DB)를 그대로 쓰기 위해 작업 스레드에서 실행합니다.
+    (이벤트 루프는 막지 않으므로 여러 요청의 검색이 동시에 진행됨)
+    """
+    return await run_sync(kakao_geocode, query)
+
+
 
 @csrf_exempt
+@with_deadline(ROUTE_DEADLINE_SECONDS)   # 길찾기 API 호출 전체 예산
 def get_route(request):
     """자동차(카카오) + 대중교통(Google) 통합 길찾기 API 엔드포인트"""
     if request.method != 'POST':
@@ -477,7 +616,10 @@ def get_route(request):
                 'departure_time': 'now',
                 'key': GOOGLE_API_KEY,
             }
-            g_resp = requests.get(g_url, params=params)
+            try:
+                g_resp = http_get("google", g_url, params=params, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
+            except (requests.exceptions.RequestException, DeadlineExceeded) as e:
+                return JsonResponse({"error": f"Google Directions 요청 실패: {e}", "provider": "google_transit"}, status=504)
             g_data = g_resp.json()
             if g_data.get('status') != 'OK' or not g_data.get('routes'):
                 return JsonResponse({
@@ -567,7 +709,7 @@ def get_route(request):
             kakao_body['waypoints'] = [{'x': float(wp['x']), 'y': float(wp['y'])} for wp in waypoints]
 
         try:
-            response = requests.post(kakao_url, headers=headers, json=kakao_body, timeout=10)
+            response = http_post("kakao", kakao_url, headers=headers, json=kakao_body, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
             if response.status_code == 405:  # POST 실패 시 GET 재시도
                 params = {
                     'origin': f"{origin_x},{origin_y}",
@@ -576,7 +718,7 @@ def get_route(request):
                 }
                 if waypoints:
                     params['waypoints'] = '|'.join([f"{float(wp['x'])},{float(wp['y'])}" for wp in waypoints])
-                response = requests.get(kakao_url, headers=headers, params=params, timeout=10)
+                response = http_get("kakao", kakao_url, headers=headers, params=params, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
             response.raise_for_status()
             result = response.json()
             
@@ -596,7 +738,7 @@ def get_route(request):
                         kakao_body['origin'] = {'x': adjusted_origin_x, 'y': adjusted_origin_y}
                         kakao_body['destination'] = {'x': adjusted_dest_x, 'y': adjusted_dest_y}
                         
-                        response = requests.post(kakao_url, headers=headers, json=kakao_body, timeout=10)
+                        response = http_post("kakao", kakao_url, headers=headers, json=kakao_body, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
                         if response.status_code == 200:
                             result = response.json()
                             if 'routes' in result and result['routes']:
@@ -609,7 +751,7 @@ def get_route(request):
             result['provider'] = 'kakao'
             return JsonResponse(result)
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, DeadlineExceeded) as e:
             print(f"카카오 API 요청 오류: {e}")
             return JsonResponse({'error': f'카카오 API 요청 실패: {str(e)}'}, status=500)
 
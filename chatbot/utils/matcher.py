@@ -0,0 +1,104 @@
+"""
+다중 키워드 매칭 유틸리티 (Aho-Corasick)
+
+이 모듈은 여러 키워드를 한 번에 찾는 Aho-Corasick 오토마톤을 제공합니다.
+키워드 수와 관계없이 입력 문자열을 한 번만 훑어서 모든 매칭 위치를 찾습니다.
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 기반 다중 키워드 매처
+
+    Args:
+        keywords (dict | iterable): {키워드: payload} 딕셔너리 또는 키워드 목록
+        ignore_case (bool): 대소문자 무시 여부 (영문 키워드용)
+
+    사용 예:
+        matcher = KeywordMatcher({"부산": "부산", "해운대": "부산"})
+        matcher.find_all("해운대 맛집")  # [(0, 3, "해운대", "부산")]
+    """
+
+    def __init__(self, keywords=None, ignore_case=False):
+        self.ignore_case = ignore_case
+        self._goto = [{}]     # 상태별 전이 테이블
+        self._fail = [0]      # 실패 링크
+        self._output = [[]]   # 상태별 매칭 결과 [(키워드, payload)]
+        self._built = False
+
+        if keywords:
+            items = keywords.items() if isinstance(keywords, dict) else ((k, k) for k in keywords)
+            for keyword, payload in items:
+                self.add(keyword, payload)
+            self.build()
+
+    def _normalize(self, text):
+        return text.lower() if self.ignore_case else text
+
+    def add(self, keyword, payload=None):
+        """키워드 추가 (추가 후 build() 호출 필요)"""
+        if not keyword:
+            return
+        state = 0
+        for ch in self._normalize(keyword):
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append((keyword, keyword if payload is None else payload))
+        self._built = False
+
+    def build(self):
+        """실패 링크 계산 (BFS)"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+        self._built = True
+
+    def iter_matches(self, text):
+        """모든 매칭을 (시작, 끝, 키워드, payload) 형태로 순회 (겹치는 매칭 포함)"""
+        if not self._built:
+            self.build()
+        state = 0
+        for index, ch in enumerate(self._normalize(text or "")):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for keyword, payload in self._output[state]:
+                end = index + 1
+                yield end - len(keyword), end, keyword, payload
+
+    def find_all(self, text):
+        """모든 매칭 목록 (시작 위치 순)"""
+        return sorted(self.iter_matches(text), key=lambda m: (m[0], -(m[1] - m[0])))
+
+    def find_longest(self, text):
+        """겹치지 않는 최장 매칭 목록 (왼쪽부터, 같은 위치면 더 긴 키워드 우선)"""
+        result = []
+        last_end = 0
+        for match in self.find_all(text):
+            if match[0] >= last_end:
+                result.append(match)
+                last_end = match[1]
+        return result
+
+    def contains_any(self, text):
+        """키워드가 하나라도 포함되어 있는지 여부"""
+        return next(self.iter_matches(text), None) is not None
@@ -0,0 +1,139 @@
+"""
+LLM 모델 정책 유틸리티
+
+이 모듈은 핸들러별로 사용할 모델, 최대 출력 토큰, temperature, 타임아웃을 정합니다.
+- 티어(tier): 모델 설정 묶음 (fast / standard / long / extract)
+- 핸들러별 규칙: 기본 티어 + (선택) 짧은 입력용 티어 + (선택) 라우팅 의도별 티어
+- select_model_policy() 가 라우팅된 의도와 입력 길이로 티어를 골라 ModelPolicy 를 반환
+- settings.LLM_MODEL_TIERS / LLM_HANDLER_TIERS 로 재정의 (지정한 키만 기본값 위에 병합)
+"""
+
+# 표준 라이브러리
+import threading
+from collections import namedtuple
+
+# Django 및 외부 모듈
+from django.conf import settings
+from rich.console import Console
+
+# 로컬 모듈
+from .deadline import remaining_timeout
+from .llm_backend import get_chat_model
+
+console = Console()
+
+ModelPolicy = namedtuple("ModelPolicy", ["handler", "tier", "model", "max_tokens", "temperature", "timeout"])
+
+# 티어별 모델 설정 (timeout: OpenAI 요청 1회 제한 시간, 초)
+DEFAULT_MODEL_TIERS = {
+    "fast":     {"model": "gpt-4o-mini", "max_tokens": 300,  "temperature": 0.3, "timeout": 15},
+    "standard": {"model": "gpt-4o-mini", "max_tokens": 800,  "temperature": 0.7, "timeout": 30},
+    "long":     {"model": "gpt-4o-mini", "max_tokens": 4000, "temperature": 0.7, "timeout": 90},
+    "extract":  {"model": "gpt-4o-mini", "max_tokens": 10,   "temperature": 0.0, "timeout": 10},
+}
+
+# 핸들러별 티어 선택 규칙
+#   - default: 기본 티어
+#   - short  : (선택) 입력이 LLM_SHORT_INPUT_CHARS 이하일 때의 티어
+#   - intents: (선택) 라우팅 의도 → 티어 (short 보다 우선)
+DEFAULT_HANDLER_TIERS = {
+    "simple_qna":  {"default": "standard", "short": "fast"},
+    "schedule":    {"default": "long"},
+    "general":     {"default": "standard", "intents": {"날씨 정보": "fast"}},
+    "destination": {"default": "extract"},
+}
+
+# 짧은 질문으로 볼 입력 길이 (앞뒤 공백을 뺀 글자 수)
+LLM_SHORT_INPUT_CHARS = getattr(settings, "LLM_SHORT_INPUT_CHARS", 40)
+
+
+def _merge(defaults, overrides):
+    """기본 설정 위에 settings 값 병합 (항목별 dict 는 키 단위로 병합)"""
+    merged = {name: dict(value) for name, value in defaults.items()}
+    for name, value in (overrides or {}).items():
+        merged.setdefault(name, {}).update(value)
+    return merged
+
+
+MODEL_TIERS = _merge(DEFAULT_MODEL_TIERS, getattr(settings, "LLM_MODEL_TIERS", None))
+HANDLER_TIERS = _merge(DEFAULT_HANDLER_TIERS, getattr(settings, "LLM_HANDLER_TIERS", None))
+
+_models = {}   # (티어, 추가 옵션) → LangChain 채팅 모델
+_models_lock = threading.Lock()
+
+
+def select_tier(handler, user_input="", intent=None):
+    """핸들러 규칙에 따라 티어 이름 선택 (의도 → 짧은 입력 → 기본 순)"""
+    rules = HANDLER_TIERS.get(handler, {})
+    intents = rules.get("intents") or {}
+    if intent and intent in intents:
+        return intents[intent]
+    if rules.get("short") and user_input and len(user_input.strip()) <= LLM_SHORT_INPUT_CHARS:
+        return rules["short"]
+    return rules.get("default", "standard")
+
+
+def select_model_policy(handler, user_input="", intent=None):
+    """
+    핸들러 호출 1건에 사용할 모델 정책 선택
+
+    Args:
+        handler (str): "simple_qna" | "schedule" | "general" | "destination"
+        user_input (str): 사용자 입력 (짧은 질문 판단용)
+        intent (str, optional): 라우팅 결과 (예: general 테이블의 "날씨 정보")
+
+    Returns:
+        ModelPolicy
+    """
+    tier = select_tier(handler, user_input, intent)
+    config = MODEL_TIERS.get(tier) or MODEL_TIERS["standard"]
+    console.log(f"🎚 모델 정책: {handler} → {tier} ({config['model']}, 최대 {config.get('max_tokens')} 토큰)")
+    return ModelPolicy(
+        handler=handler,
+        tier=tier,
+        model=config["model"],
+        max_tokens=config.get("max_tokens"),
+        temperature=config.get("temperature", 0.7),
+        timeout=config.get("timeout"),
+    )
+
+
+def completion_kwargs(policy):
+    """OpenAI SDK chat.completions.create() 에 넘길 정책 인자 (타임아웃은 남은 요청 예산 안에서)"""
+    kwargs = {"model": policy.model, "temperature": policy.temperature}
+    if policy.max_tokens:
+        kwargs["max_tokens"] = policy.max_tokens
+    if policy.timeout:
+        kwargs["timeout"] = remaining_timeout(policy.timeout)
+    return kwargs
+
+
+def call_timeout_kwargs(policy):
+    """LangChain 모델 .bind() 용 호출별 타임아웃 (정책 타임아웃과 남은 요청 예산 중 작은 값)"""
+    return {"timeout": remaining_timeout(policy.timeout)} if policy.timeout else {}
+
+
+def get_policy_chat_model(policy, **kwargs):
+    """
+    정책에 맞는 LangChain 채팅 모델 (티어 + 옵션 조합별로 프로세스당 1개 재사용)
+
+    Args:
+        policy (ModelPolicy): select_model_policy() 결과
+        **kwargs: 추가 ChatOpenAI 옵션 (예: streaming=True, stream_usage=True)
+    """
+    key = (policy.tier, tuple(sorted(kwargs.items())))
+    model = _models.get(key)
+    if model is None:
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                model = get_chat_model(
+                    model=policy.model,
+                    temperature=policy.temperature,
+                    max_tokens=policy.max_tokens,
+                    timeout=policy.timeout,
+                    **kwargs,
+                )
+                _models[key] = model
+                console.log(f"🎚 모델 생성: {policy.tier} ({policy.model}, 최대 {policy.max_tokens} 토큰)")
+    return model
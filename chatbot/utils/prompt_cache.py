@@ -0,0 +1,85 @@
+"""
+프롬프트 프리픽스 지표 유틸리티
+
+OpenAI 프롬프트 캐싱은 요청 간에 "완전히 같은 앞부분"이 있을 때만 적용됩니다.
+이 모듈은 프롬프트의 고정 프리픽스를 지문(fingerprint)으로 기록하여
+같은 프리픽스가 얼마나 재사용되는지(재사용률)와, 공급자가 보고한 캐시 적중 토큰 수를 집계합니다.
+"""
+
+# 표준 라이브러리
+import hashlib
+import threading
+
+# 로컬 모듈
+from .tokens import count_tokens
+
+_stats_lock = threading.Lock()
+_stats = {}   # 프롬프트 종류 → 통계
+
+
+def prompt_fingerprint(text: str) -> str:
+    """프롬프트 텍스트 지문 (sha256 앞 12자리)"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:12]
+
+
+def _kind_stats(kind):
+    return _stats.setdefault(kind, {
+        "requests": 0,
+        "reused": 0,
+        "fingerprints": {},    # 지문 → 사용 횟수
+        "prefix_tokens": 0,
+        "cached_tokens": 0,
+        "input_tokens": 0,
+    })
+
+
+def record_prompt_prefix(kind, prefix):
+    """
+    고정 프리픽스 사용 기록
+
+    Args:
+        kind (str): 프롬프트 종류 (예: "schedule", "general:맛집 추천")
+        prefix (str): 요청과 무관하게 고정된 프롬프트 앞부분
+
+    Returns:
+        str: 프리픽스 지문
+    """
+    fingerprint = prompt_fingerprint(prefix)
+    with _stats_lock:
+        stats = _kind_stats(kind)
+        stats["requests"] += 1
+        seen = stats["fingerprints"].get(fingerprint, 0)
+        if seen:
+            stats["reused"] += 1
+        else:
+            stats["prefix_tokens"] = count_tokens(prefix)
+        stats["fingerprints"][fingerprint] = seen + 1
+    return fingerprint
+
+
+def record_usage(kind, usage_metadata):
+    """LangChain usage_metadata 에서 입력/캐시 적중 토큰 수 기록 (없으면 무시)"""
+    if not usage_metadata:
+        return
+    details = usage_metadata.get("input_token_details") or {}
+    with _stats_lock:
+        stats = _kind_stats(kind)
+        stats["input_tokens"] += usage_metadata.get("input_tokens", 0) or 0
+        stats["cached_tokens"] += details.get("cache_read", 0) or 0
+
+
+def get_prompt_prefix_stats():
+    """종류별 프리픽스 재사용률 / 캐시 적중 토큰 통계 반환"""
+    with _stats_lock:
+        result = {}
+        for kind, stats in _stats.items():
+            requests = stats["requests"]
+            result[kind] = {
+                "requests": requests,
+                "distinct_prefixes": len(stats["fingerprints"]),
+                "prefix_reuse_rate": round(stats["reused"] / requests, 3) if requests else 0,
+                "prefix_tokens": stats["prefix_tokens"],
+                "input_tokens": stats["input_tokens"],
+                "cached_tokens": stats["cached_tokens"],
+            }
+        return result
@@ -1,7 +1,7 @@
 """
 프롬프트 템플릿 유틸리티 (교정된 버전)
 
-- AI 기반 여행 목적지 감지
+- 지명 사전 기반 여행 목적지 감지 (AI는 보조)
 - 요약 코스(summary) 필드 강화
 - 도구 활용 강제 규칙 추가
 - 좌표/운영시간은 반드시 도구에서 가져오도록 명시
@@ -9,16 +9,38 @@
 - 대화 연속성(이전 히스토리 반영) 강화
 """
 
+import functools
 import re
-from openai import OpenAI
 from chatbot.models import ChatSession
+from .gazetteer import find_destination
+from .singleflight import llm_flight, flight_key
+from .llm_backend import get_openai_client
+from .model_policy import select_model_policy, completion_kwargs
+from .tracing import span
+
+client = get_openai_client()   # settings.LLM_BACKEND 에 따라 OpenAI 또는 로컬 가짜 클라이언트
+
+# 고정 프리픽스(요청과 무관한 앞부분)에서 목적지 대신 쓰는 문구
+DESTINATION_LABEL = "감지된 여행 목적지"
+
+def _remember_destination(session_id, destination):
+    """감지된 목적지를 세션에 저장"""
+    if not session_id:
+        return
+    try:
+        chat_session = ChatSession.objects.get(id=session_id)  # session_key → id 수정
+        chat_session.last_detected_destination = destination
+        chat_session.save()
+    except ChatSession.DoesNotExist:
+        pass
 
-client = OpenAI()
 
 def detect_travel_destination(user_input: str, session_id: str = None, city_db: list[str] = None) -> str:
     """
-    AI 기반 여행 목적지 추출 함수 (세션 기반 연속성 지원)
+    여행 목적지 추출 함수 (세션 기반 연속성 지원)
     - city_db가 있으면 DB와 매칭
+    - 번들 지명 사전(gazetteer)으로 로컬 매칭 (LLM 호출 없음)
+    - 로컬 매칭이 없을 때만 AI 기반 추출
     - 새로운 목적지가 감지되면 세션에 저장
     - 감지되지 않으면 세션의 마지막 목적지를 유지
     - 아무것도 없으면 fallback = "서울"
@@ -28,49 +50,51 @@ def detect_travel_destination(user_input: str, session_id: str = None, city_db:
     if city_db:
         for token in tokens:
             if token in city_db:
-                # 세션에 목적지 저장
-                if session_id:
-                    try:
-                        chat_session = ChatSession.objects.get(id=session_id)  # session_key → id 수정
-                        chat_session.last_detected_destination = token
-                        chat_session.save()
-                    except ChatSession.DoesNotExist:
-                        pass
+                _remember_destination(session_id, token)
                 return token
 
-    # 2️⃣ AI 기반 추출 시도
+    # 2️⃣ 지명 사전 매칭 (시/군/구 + 관광지 별칭)
+    destination = find_destination(user_input)
+    if destination:
+        _remember_destination(session_id, destination)
+        return destination
+
+    # 3️⃣ AI 기반 추출 시도
     prompt = f"""
     사용자 입력: "{user_input}"
     출력: 한국의 도시명 또는 지역명만 **딱 한 단어**로 적어.
     추가 설명, 문장, 따옴표 없이 단어 하나만 출력할 것.
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "너는 한국 여행 목적지 추출 전문가다. 사용자의 입력에서 한국 도시/지역명을 가장 정확히 식별하고 단어 하나로만 답한다."
-            },
-            {"role": "user", "content": prompt}
-        ]
-    )
-    destination = response.choices[0].message.content.strip()
-
-
-    # 3️⃣ AI가 목적지를 제대로 반환했는지 확인
+    system_prompt = "너는 한국 여행 목적지 추출 전문가다. 사용자의 입력에서 한국 도시/지역명을 가장 정확히 식별하고 단어 하나로만 답한다."
+
+    policy = select_model_policy("destination")
+
+    def call_llm():
+        response = client.chat.completions.create(
+            **completion_kwargs(policy),   # 단어 하나만 필요하므로 짧은 출력 상한
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.choices[0].message.content
+
+    # 같은 입력의 목적지 추출이 동시에 진행 중이면 결과 공유
+    with span("llm.destination"):
+        destination, _ = llm_flight.do(flight_key("destination", policy.model, system_prompt, prompt), call_llm)
+    destination = (destination or "").strip()
+
+    # 4️⃣ AI가 목적지를 제대로 반환했는지 확인 (지명 사전 기준으로 표기 통일: 부산광역시 → 부산)
     if destination and destination not in ["", "None", "null"]:
-        # 세션에 목적지 저장
-        if session_id:
-            try:
-                chat_session = ChatSession.objects.get(id=session_id)  # session_key → id 수정
-                chat_session.last_detected_destination = destination
-                chat_session.save()
-            except ChatSession.DoesNotExist:
-                pass
+        destination = find_destination(destination) or destination
+        _remember_destination(session_id, destination)
         return destination
 
-    # 4️⃣ 새로운 목적지가 감지되지 않으면, 세션의 마지막 값 유지
+    # 5️⃣ 새로운 목적지가 감지되지 않으면, 세션의 마지막 값 유지
     if session_id:
         try:
             chat_session = ChatSession.objects.get(id=session_id)  # session_key → id 수정
@@ -79,12 +103,13 @@ def detect_travel_destination(user_input: str, session_id: str = None, city_db:
         except ChatSession.DoesNotExist:
             pass
 
-    # 5️⃣ 마지막 값도 없다면 fallback = "서울"
+    # 6️⃣ 마지막 값도 없다면 fallback = "서울"
     return "서울"
 
 
-def get_common_tools_description(travel_destination="서울"):
-    """공통 도구 설명 반환 (강화된/안전 버전)"""
+def get_common_tools_description(travel_destination=None):
+    """공통 도구 설명 반환 (강화된/안전 버전, 목적지 미지정 시 고정 프리픽스용 문구)"""
+    travel_destination = travel_destination or DESTINATION_LABEL
     return f"""
 ## 🔧 사용 가능한 도구들 (기능에 맞는 도구만 사용하세요.)
 
@@ -127,10 +152,10 @@ def get_common_tools_description(travel_destination="서울"):
 
 
 
-def get_schedule_json_template(travel_destination="서울"):
-    """일정 JSON 템플릿 반환 (summary 필드 강화)"""
+def get_schedule_json_template(travel_destination=None):
+    """일정 JSON 템플릿 반환 (summary 필드 강화, 목적지 미지정 시 고정 프리픽스용 문구, 코드 블록 없이 JSON 본문만)"""
+    travel_destination = travel_destination or DESTINATION_LABEL
     return f"""
-```json
 {{
   "schedule": {{
     "Day1": {{
@@ -169,8 +194,7 @@ def get_schedule_json_template(travel_destination="서울"):
     }}
   }},
   "summary": "Day1: 오전활동장소 → 점심장소 → 오후활동장소 → 저녁장소, Day2: 오전활동장소 → 점심장소 → 오후활동장소 → 저녁장소 (모든 Day의 모든 활동을 반드시 포함할 것)"
-}}
-```"""
+}}"""
 
 
 def get_common_checklist():
@@ -199,9 +223,9 @@ def get_common_checklist():
    - 주소 필드도 반드시 포함해야 함
 
 5. **JSON 형식**
-   - 반드시 유효한 JSON 객체만 출력
-   - 응답은 ```json ... ``` 코드 블록 안에만 작성
-   - JSON 외 텍스트/설명은 출력하지 않음
+   - 반드시 유효한 JSON 객체 하나만 출력
+   - 코드 블록(```)이나 JSON 외 텍스트/설명은 출력하지 않음
+   - schedule 의 Day 순서대로, 각 Day 안에서는 활동 순서대로 작성
 
 6. **중복 금지**
    - 같은 장소명/좌표는 2번 이상 등장 금지
@@ -225,15 +249,52 @@ def get_common_checklist():
 
 
 
-def get_schedule_prompt(conversation_str, user_input, session_id=None, is_modification=False, existing_data_str="", context_info=None, city_db=None):
-    """일정 관련 프롬프트 생성 (연속성 강화)"""
+@functools.lru_cache(maxsize=1)
+def get_schedule_system_prefix():
+    """
+    일정 프롬프트의 고정 프리픽스 (목적지/대화와 무관, 프로세스 내 1회 생성)
+
+    도구 설명·JSON 템플릿·체크리스트처럼 큰 고정 블록을 맨 앞에 두어야
+    요청 간에 같은 앞부분이 생겨 공급자 측 프롬프트 캐싱이 적용됩니다.
+    """
+    return f"""# 🎯 AI 여행 전문가 시스템 프롬프트
+
+## 📋 기본 정보
+- **역할**: 15년 경력의 국내 여행 전문 AI 어시스턴트
+- **중요도**: ⚠️ 아래 규칙과 사용자 메시지의 '{DESTINATION_LABEL}'를 절대적으로 따라야 함!
+
+## 🚨 절대 위반 금지 규칙
+- **반드시 {DESTINATION_LABEL} 지역의 장소들만 사용**
+- **절대로 다른 지역(서울, 제주도, 강릉 등) 장소 사용 금지**
+- **모든 좌표는 카카오지도검색에서 가져와야 함**
+- **모든 운영시간/휴무일은 구글플레이스상세에서 가져와야 함**
+- **중복 금지: 같은 장소/좌표는 1번만 출력**
+- **summary 필드 반드시 포함 (모든 Day의 모든 활동을 누락 없이 포함해야 함)**
+- **🚨 CRITICAL: summary에는 오전활동, 점심, 오후활동, 저녁을 모두 포함할 것!**
+
+{get_common_tools_description()}
+
+## 📋 응답 형식 (JSON)
+
+반드시 다음 JSON 형식으로만 응답 ({DESTINATION_LABEL} 지역만 사용):
+
+{get_schedule_json_template()}
+
+{get_common_checklist()}
+
+**중요**: summary 필드에는 반드시 모든 Day의 모든 활동(오전활동, 점심, 오후활동, 저녁)을 순서대로 포함해야 함"""
+
+
+def get_schedule_prompt_parts(conversation_str, user_input, session_id=None, is_modification=False, existing_data_str="", context_info=None, city_db=None):
+    """
+    일정 관련 프롬프트를 (고정 프리픽스, 가변 부분)으로 생성 (연속성 강화)
+
+    Returns:
+        tuple: (system 메시지용 고정 프리픽스, 요청별 가변 부분)
+    """
     # 세션 기반으로 목적지 감지
     travel_destination = detect_travel_destination(user_input, session_id, city_db)
     
-    tools_desc = get_common_tools_description(travel_destination)
-    json_template = get_schedule_json_template(travel_destination)
-    checklist = get_common_checklist()
-    
     # 컨텍스트 정보 포맷팅
     context_section = ""
     if context_info:
@@ -255,7 +316,7 @@ def get_schedule_prompt(conversation_str, user_input, session_id=None, is_modifi
     if is_modification:
         prompt_type = "일정 변경 요청"
         context_info_section = f"""
-### 대화 히스토리 (최근 30개 메시지):
+### 대화 히스토리 (이전 대화 요약 + 최근 메시지):
 {conversation_str}
 
 ### 기존 일정 데이터:
@@ -277,7 +338,7 @@ def get_schedule_prompt(conversation_str, user_input, session_id=None, is_modifi
     else:
         prompt_type = "새 일정 생성 요청"
         context_info_section = f"""
-### 대화 히스토리 (최근 30개 메시지):
+### 대화 히스토리 (이전 대화 요약 + 최근 메시지):
 {conversation_str}
 
 ### 현재 사용자 요청사항:
@@ -293,103 +354,96 @@ def get_schedule_prompt(conversation_str, user_input, session_id=None, is_modifi
 6. **중복 금지**: 같은 장소/좌표 반복 금지
 7. **요약 코스 작성**: summary 필드에 Day별 핵심 코스를 반드시 요약"""
     
-    return f"""# 🎯 AI 여행 전문가 시스템 프롬프트 ({prompt_type})
+    variable = f"""# 📨 {prompt_type}
 
-## 📋 기본 정보
-- **역할**: 15년 경력의 국내 여행 전문 AI 어시스턴트
+## 📋 요청 정보
 - **현재 상황**: 사용자가 {"기존 일정을 변경해달라고" if is_modification else "새로운 일정 추천을"} 요청
-- **감지된 여행 목적지**: {travel_destination}
-- **중요도**: ⚠️ 이 정보를 절대적으로 따라야 함!
+- **{DESTINATION_LABEL}**: {travel_destination}
+- **반드시 {travel_destination} 지역의 장소들만 사용**
 
 ## 📚 컨텍스트 정보
 {context_info_section}
 
 ## 🎯 핵심 지침
-{guidelines}
-
-## 🚨 절대 위반 금지 규칙
-- **감지된 여행 목적지**: {travel_destination}
-- **반드시 {travel_destination} 지역의 장소들만 사용**
-- **절대로 다른 지역(서울, 제주도, 강릉 등) 장소 사용 금지**
-- **모든 좌표는 카카오지도검색에서 가져와야 함**
-- **모든 운영시간/휴무일은 구글플레이스상세에서 가져와야 함**
-- **중복 금지: 같은 장소/좌표는 1번만 출력**
-- **summary 필드 반드시 포함 (모든 Day의 모든 활동을 누락 없이 포함해야 함)**
-- **🚨 CRITICAL: summary에는 오전활동, 점심, 오후활동, 저녁을 모두 포함할 것!**
-
-{tools_desc}
+{guidelines}"""
 
-## 📋 응답 형식 (JSON)
+    return get_schedule_system_prefix(), variable
 
-반드시 다음 JSON 형식으로만 응답 ({travel_destination} 지역만 사용):
 
-{json_template}
+def get_schedule_prompt(conversation_str, user_input, session_id=None, is_modification=False, existing_data_str="", context_info=None, city_db=None):
+    """일정 관련 프롬프트 생성 (고정 프리픽스 → 가변 부분 순서의 단일 문자열)"""
+    prefix, variable = get_schedule_prompt_parts(
+        conversation_str, user_input, session_id, is_modification, existing_data_str, context_info, city_db
+    )
+    return f"{prefix}\n\n{variable}"
 
-{checklist}
-
-**중요**: summary 필드에는 반드시 모든 Day의 모든 활동(오전활동, 점심, 오후활동, 저녁)을 순서대로 포함해야 함"""
 
+# 일반 요청 유형별 응답 형식 (고정 블록)
+GENERAL_RESPONSE_FORMATS = {
+    "맛집 추천": f"""**응답 형식**: {DESTINATION_LABEL} 지역 맛집명, 주소, 좌표(카카오지도검색), 운영시간/휴무일(구글플레이스상세), 전화번호, 유튜브 영상 링크""",
+    "브이로그 추천": """**응답 형식**: 유튜브 영상 링크, 채널명, 주요 장소와 좌표, 여행 팁""",
+    "기본": """## ⚠️ 출력 규칙
+- 반드시 JSON 형식으로만 출력하세요.
+- JSON 이외의 설명, 마크다운, 불필요한 텍스트는 절대 포함하지 마세요.
+- 키 구조는 다음 예시를 따르세요:
 
-def get_general_prompt(request_type, user_input, travel_destination=None, session_id=None, search_query="", city_db=None, conversation_str=""):
-    """일반 요청 프롬프트 생성 (하드코딩 제거 + 유튜브/맛집 강화)"""
-    # travel_destination이 없으면 세션 기반으로 감지
-    if not travel_destination:
-        travel_destination = detect_travel_destination(user_input, session_id, city_db)
-    
-    tools_desc = get_common_tools_description(travel_destination)
-    
-    if request_type == "맛집 추천":
-        return f"""# 🍽️ {travel_destination} 맛집 추천
+{
+  "장소명": "홍천군",
+  "주소": "대한민국 강원특별자치도 홍천군",
+  "좌표": { "lat": 37.6899, "lng": 127.8880 },
+  "운영시간": "정보 없음",
+  "전화번호": "없음",
+  "비용": "N/A",
+  "날씨": "맑음, 기온 23°C",   # ✅ 날씨 필드 추가
+  "유튜브": "https://youtu.be/xxxx"
+}""",
+}
 
-**대화 히스토리 (최근 30개 메시지):**
-{conversation_str}
+GENERAL_TITLES = {
+    "맛집 추천": "🍽️ {destination} 맛집 추천",
+    "브이로그 추천": "🎥 {destination} 브이로그 추천",
+}
 
-**요청**: {user_input}
 
-{tools_desc}
+@functools.lru_cache(maxsize=None)
+def get_general_system_prefix(request_type):
+    """일반 요청 프롬프트의 고정 프리픽스 (요청 유형별, 목적지/대화와 무관)"""
+    response_format = GENERAL_RESPONSE_FORMATS.get(request_type, GENERAL_RESPONSE_FORMATS["기본"])
+    return f"""{get_common_tools_description()}
 
-**응답 형식**: {travel_destination} 지역 맛집명, 주소, 좌표(카카오지도검색), 운영시간/휴무일(구글플레이스상세), 전화번호, 유튜브 영상 링크
+{response_format}
 """
 
-    elif request_type == "브이로그 추천":
-        return f"""# 🎥 {travel_destination} 브이로그 추천
-
-**대화 히스토리 (최근 30개 메시지):**
-{conversation_str}
-
-**요청**: {user_input}
 
-{tools_desc}
+def get_general_prompt_parts(request_type, user_input, travel_destination=None, session_id=None, search_query="", city_db=None, conversation_str=""):
+    """
+    일반 요청 프롬프트를 (고정 프리픽스, 가변 부분)으로 생성
 
-**응답 형식**: 유튜브 영상 링크, 채널명, 주요 장소와 좌표, 여행 팁
-"""
+    Returns:
+        tuple: (요청 유형별 고정 프리픽스, 요청별 가변 부분)
+    """
+    # travel_destination이 없으면 세션 기반으로 감지
+    if not travel_destination:
+        travel_destination = detect_travel_destination(user_input, session_id, city_db)
 
-    else:
-        return f"""# 🌟 {travel_destination} 여행 정보
+    title = GENERAL_TITLES.get(request_type, "🌟 {destination} 여행 정보").format(destination=travel_destination)
+    variable = f"""# {title}
+- **{DESTINATION_LABEL}**: {travel_destination}
 
-**대화 히스토리 (최근 30개 메시지):**
+**대화 히스토리 (이전 대화 요약 + 최근 메시지):**
 {conversation_str}
 
 **요청**: {user_input}
+"""
+    return get_general_system_prefix(request_type), variable
 
-{tools_desc}
 
-## ⚠️ 출력 규칙
-- 반드시 JSON 형식으로만 출력하세요.
-- JSON 이외의 설명, 마크다운, 불필요한 텍스트는 절대 포함하지 마세요.
-- 키 구조는 다음 예시를 따르세요:
-
-{{
-  "장소명": "홍천군",
-  "주소": "대한민국 강원특별자치도 홍천군",
-  "좌표": {{ "lat": 37.6899, "lng": 127.8880 }},
-  "운영시간": "정보 없음",
-  "전화번호": "없음",
-  "비용": "N/A",
-  "날씨": "맑음, 기온 23°C",   # ✅ 날씨 필드 추가
-  "유튜브": "https://youtu.be/xxxx"
-}}
-"""
+def get_general_prompt(request_type, user_input, travel_destination=None, session_id=None, search_query="", city_db=None, conversation_str=""):
+    """일반 요청 프롬프트 생성 (고정 프리픽스 → 가변 부분 순서, 유튜브/맛집 강화)"""
+    prefix, variable = get_general_prompt_parts(
+        request_type, user_input, travel_destination, session_id, search_query, city_db, conversation_str
+    )
+    return f"{prefix}\n{variable}"
 
 
 
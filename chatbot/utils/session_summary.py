@@ -0,0 +1,270 @@
+"""
+세션 대화 요약 유틸리티
+
+이 모듈은 ChatSession.summary 에 누적 대화 요약을 점진적으로 유지합니다.
+- 목적지, 여행 기간, 선호도, 언급된 장소, 논의 주제, 이전 대화 다이제스트
+- 턴이 끝날 때마다 아직 반영하지 않은 메시지만 접어 넣음 (summary_message_id 이후)
+- 프롬프트에는 "요약 + 최근 몇 개 메시지 원문"만 들어가므로
+  세션이 길어져도 프롬프트 크기와 턴당 처리량이 일정하게 유지됩니다.
+"""
+
+# 표준 라이브러리
+import copy
+import re
+import threading
+
+# Django 및 외부 모듈
+from django.conf import settings
+from django.db import DatabaseError, connections
+from rich.console import Console
+
+# 로컬 모듈
+from ..models import ChatSession, ChatMessage
+from .conversation_manager import build_conversation_history, message_prompt_text
+from .gazetteer import find_destination
+
+console = Console()
+
+# 요약 설정 (settings.py 에서 재정의 가능)
+CHAT_SUMMARY_RECENT_MESSAGES = getattr(settings, "CHAT_SUMMARY_RECENT_MESSAGES", 6)   # 원문으로 넣을 최근 메시지 수
+CHAT_SUMMARY_DIGEST_SIZE = getattr(settings, "CHAT_SUMMARY_DIGEST_SIZE", 20)          # 다이제스트 최대 줄 수
+CHAT_SUMMARY_MAX_PLACES = getattr(settings, "CHAT_SUMMARY_MAX_PLACES", 30)            # 언급 장소 최대 개수
+CHAT_SUMMARY_ASYNC = getattr(settings, "CHAT_SUMMARY_ASYNC", True)                    # 백그라운드 스레드로 갱신
+
+DIGEST_CHARS = 80   # 다이제스트 한 줄 최대 글자 수
+
+# extract_conversation_context 와 같은 기준의 키워드
+DURATION_PATTERNS = [
+    r'(\d+)일\s*여행', r'(\d+)박\s*(\d+)일', r'(\d+)일간', r'(\d+)일\s*동안'
+]
+PLACE_RE = re.compile(r'[가-힣]{1,15}(?:궁|사|공원|박물관|미술관|해변|해수욕장|산|시장|카페|호텔|펜션|리조트)')
+PREFERENCE_KEYWORDS = {
+    '자연': ['자연', '산', '바다', '공원', '해변'],
+    '문화': ['문화', '역사', '전통', '박물관', '미술관'],
+    '음식': ['음식', '맛집', '카페', '식당', '먹거리'],
+    '쇼핑': ['쇼핑', '시장', '상가', '백화점'],
+    '액티비티': ['액티비티', '체험', '놀이', '레저'],
+}
+TOPIC_KEYWORDS = {
+    'schedule': ['일정', '여행', '코스', '플랜', '스케줄'],
+    'food': ['맛집', '음식', '식당', '카페', '레스토랑', '먹거리', '커피'],
+    'tourist': ['관광지', '명소', '공원', '박물관', '미술관', '궁', '사'],
+    'budget': ['예산', '비용', '돈', '가격', '저렴', '비싼'],
+}
+
+# 같은 세션을 동시에 갱신하지 않도록 세션 id 로 나눠 쓰는 고정 개수 잠금
+SUMMARY_LOCK_STRIPES = 64
+_locks = tuple(threading.Lock() for _ in range(SUMMARY_LOCK_STRIPES))
+
+
+def _session_lock(session_id):
+    return _locks[hash(session_id) % SUMMARY_LOCK_STRIPES]
+
+
+def empty_summary():
+    """빈 요약 구조"""
+    return {
+        "destination": None,
+        "duration": None,
+        "preferences": [],
+        "places": [],
+        "topics": [],
+        "questions": 0,
+        "digest": [],   # [[메시지 id, "role: 요약문"], ...]
+    }
+
+
+def fold_message(summary, msg_id, role, text):
+    """
+    메시지 1개를 요약에 반영 (해당 메시지 텍스트만 검사하므로 세션 길이와 무관)
+
+    Args:
+        summary (dict): 기존 요약 (제자리 수정)
+        msg_id (int): ChatMessage id
+        role (str): user / assistant
+        text (str): 프롬프트용 원문
+    """
+    text = text or ""
+    lowered = text.lower()
+
+    # 목적지는 사용자 발화 기준으로 갱신
+    if role == "user":
+        destination = find_destination(text)
+        if destination:
+            summary["destination"] = destination
+        if len(text.strip()) > 10:
+            summary["questions"] += 1
+
+    for pattern in DURATION_PATTERNS:
+        match = re.search(pattern, lowered)
+        if match:
+            summary["duration"] = match.group(1) + "일"
+            break
+
+    places = summary["places"]
+    for place in PLACE_RE.findall(text):
+        if len(place) > 2 and place not in places:
+            places.append(place)
+    del places[:-CHAT_SUMMARY_MAX_PLACES]   # 최근 언급 장소만 유지
+
+    for pref_type, keywords in PREFERENCE_KEYWORDS.items():
+        if pref_type not in summary["preferences"] and any(k in lowered for k in keywords):
+            summary["preferences"].append(pref_type)
+
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        if topic not in summary["topics"] and any(k in lowered for k in keywords):
+            summary["topics"].append(topic)
+
+    # 다이제스트: 메시지 첫 줄만 짧게
+    first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    if first_line:
+        if len(first_line) > DIGEST_CHARS:
+            first_line = first_line[:DIGEST_CHARS] + "…"
+        summary["digest"].append([msg_id, f"{role}: {first_line}"])
+        del summary["digest"][:-CHAT_SUMMARY_DIGEST_SIZE]
+    return summary
+
+
+def update_session_summary(session_id):
+    """
+    아직 요약에 반영되지 않은 메시지를 접어 넣고 저장
+
+    Returns:
+        dict | None: 갱신된 요약 (세션이 없으면 None)
+    """
+    with _session_lock(session_id):
+        session = ChatSession.objects.filter(id=session_id).only("summary", "summary_message_id").first()
+        if session is None:
+            return None
+
+        summary = {**empty_summary(), **(session.summary or {})}
+        last_id = session.summary_message_id or 0
+        pending = (
+            ChatMessage.objects.filter(session_id=session_id, id__gt=last_id)
+            .only("id", "role", "content", "raw_content")
+            .order_by("id")
+        )
+
+        folded = 0
+        for msg in pending:
+            fold_message(summary, msg.id, msg.role, message_prompt_text(msg))
+            last_id = msg.id
+            folded += 1
+
+        if folded:
+            ChatSession.objects.filter(id=session_id).update(summary=summary, summary_message_id=last_id)
+            console.log(f"🧾 세션 요약 갱신: 메시지 {folded}개 반영 (세션: {session_id})")
+        return summary
+
+
+def _update_in_background(session_id):
+    """백그라운드 스레드용 래퍼 (스레드 전용 DB 연결 정리)"""
+    try:
+        update_session_summary(session_id)
+    except DatabaseError as e:
+        console.log(f"⚠️ 세션 요약 갱신 실패: {e}")
+    finally:
+        connections.close_all()
+
+
+def schedule_summary_update(session):
+    """턴 종료 후 요약 갱신 예약 (CHAT_SUMMARY_ASYNC=False 면 즉시 갱신)"""
+    if not session or not session.id:
+        return
+    if CHAT_SUMMARY_ASYNC:
+        threading.Thread(target=_update_in_background, args=(session.id,), daemon=True).start()
+    else:
+        update_session_summary(session.id)
+
+
+def summary_to_context(summary):
+    """요약을 extract_conversation_context 와 같은 형태의 컨텍스트로 변환"""
+    summary = {**empty_summary(), **(summary or {})}
+    topics = summary["topics"]
+    return {
+        'mentioned_places': set(summary["places"]),
+        'mentioned_dates': set(),
+        'user_preferences': set(summary["preferences"]),
+        'previous_questions': [None] * summary["questions"],   # 개수만 사용됨
+        'travel_destination': summary["destination"] or "",
+        'travel_duration': summary["duration"],
+        'has_schedule_discussion': 'schedule' in topics,
+        'has_food_discussion': 'food' in topics,
+        'has_tourist_discussion': 'tourist' in topics,
+        'has_budget_discussion': 'budget' in topics,
+    }
+
+
+def format_summary(summary, before_id=None):
+    """
+    요약을 프롬프트용 텍스트 줄 목록으로 변환
+
+    Args:
+        summary (dict): 세션 요약
+        before_id (int): 이 id 이후 메시지는 원문으로 들어가므로 다이제스트에서 제외
+    """
+    summary = {**empty_summary(), **(summary or {})}
+    digest = [line for msg_id, line in summary["digest"] if before_id is None or msg_id < before_id]
+    if not (digest or summary["destination"] or summary["places"]):
+        return []
+
+    lines = ["[이전 대화 요약]"]
+    if summary["destination"]:
+        lines.append(f"- 여행 목적지: {summary['destination']}")
+    if summary["duration"]:
+        lines.append(f"- 여행 기간: {summary['duration']}")
+    if summary["preferences"]:
+        lines.append(f"- 선호도: {', '.join(summary['preferences'])}")
+    if summary["places"]:
+        lines.append(f"- 언급된 장소: {', '.join(summary['places'])}")
+    if digest:
+        lines.append("- 이전 대화:")
+        lines.extend(f"  {line}" for line in digest)
+    return lines
+
+
+def build_prompt_history(session, recent=None, include_session_info=False):
+    """
+    프롬프트용 대화 히스토리 구성 (요약 + 최근 메시지 원문)
+
+    원문으로 들어간 최근 메시지(토큰 예산 적용 후)보다 오래된 메시지가 아직 요약에
+    반영되지 않았다면 (백그라운드 갱신이 밀린 경우) 여기서 먼저 반영합니다.
+    원문 안의 미반영 메시지(현재 입력 포함)는 컨텍스트 계산에만 임시로 반영합니다.
+
+    Returns:
+        tuple: (대화 히스토리 목록, 대화 컨텍스트 딕셔너리)
+    """
+    if not session:
+        return [], summary_to_context(None)
+
+    recent = recent or CHAT_SUMMARY_RECENT_MESSAGES
+    history, _, recent_messages = build_conversation_history(
+        session, limit=recent, include_session_info=include_session_info
+    )
+    # 토큰 예산 때문에 원문에서 빠진 메시지는 다이제스트로 들어가야 하므로
+    # 실제로 원문에 포함된 메시지 중 가장 오래된 것을 경계로 사용
+    oldest_recent_id = min((m.id for m in recent_messages), default=None)
+
+    def load_state():
+        # 백그라운드 갱신 결과를 읽기 위해 요약 필드만 다시 조회
+        state = ChatSession.objects.filter(id=session.id).values("summary", "summary_message_id").first() or {}
+        return state.get("summary") or {}, state.get("summary_message_id") or 0
+
+    summary, last_id = load_state()
+    pending = ChatMessage.objects.filter(session=session, id__gt=last_id)
+    if oldest_recent_id:
+        pending = pending.filter(id__lt=oldest_recent_id)
+    if pending.exists():
+        update_session_summary(session.id)
+        summary, last_id = load_state()
+
+    summary_lines = format_summary(summary, before_id=oldest_recent_id)
+    header_size = 2 if (include_session_info and session.title) else 0
+    history = history[:header_size] + summary_lines + history[header_size:]
+
+    # 컨텍스트용 임시 요약 (저장하지 않음)
+    context_summary = copy.deepcopy({**empty_summary(), **summary})
+    for msg in sorted(recent_messages, key=lambda m: m.id):
+        if msg.id > last_id:
+            fold_message(context_summary, msg.id, msg.role, message_prompt_text(msg))
+    return history, summary_to_context(context_summary)
@@ -0,0 +1,177 @@
+"""
+LLM 호출 단일 비행(single-flight) 유틸리티
+
+같은 프롬프트로 동시에 들어온 LLM 호출을 하나로 합칩니다.
+- 전송 버튼 더블클릭, 여러 사용자가 같은 인기 질문("부산 2박3일 일정")을 보낸 경우
+- 먼저 들어온 요청(leader)만 실제로 OpenAI 를 호출하고,
+  진행 중에 들어온 같은 키의 요청(waiter)은 그 결과를 기다렸다가 함께 사용
+- 결과를 저장해 두는 캐시가 아니므로, 호출이 끝나면 다음 요청은 다시 새로 호출합니다.
+"""
+
+# 표준 라이브러리
+import asyncio
+import hashlib
+import threading
+
+# Django 및 외부 모듈
+from django.conf import settings
+from rich.console import Console
+
+console = Console()
+
+# 동일 프롬프트 호출 합치기 사용 여부 (settings.py 에서 재정의 가능)
+LLM_SINGLEFLIGHT = getattr(settings, "LLM_SINGLEFLIGHT", True)
+
+
+def flight_key(*parts):
+    """
+    프롬프트 구성 요소들로 호출 키 생성 (공백 정규화 후 sha256)
+
+    Args:
+        *parts: 모델명, 프롬프트 텍스트 등 응답에 영향을 주는 값들
+    """
+    normalized = "\x1f".join(" ".join(str(part).split()) for part in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """진행 중인 호출 1건"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 호출을 하나로 합치는 그룹
+
+    사용 예:
+        value, shared = llm_flight.do(flight_key(model, prompt), lambda: client.chat.completions.create(...))
+        # shared=True 면 다른 요청이 실행한 호출 결과를 함께 받은 것
+    """
+
+    def __init__(self, name="llm", enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self._calls = {}   # 키 → _Call
+        self._async_calls = {}   # 키 → [asyncio.Future, 대기자 수] (비동기 파이프라인용)
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,        # do() 호출 수
+            "executions": 0,   # 실제 실행 수 (leader)
+            "shared": 0,       # 다른 호출 결과를 받은 수 (waiter 적중)
+            "errors": 0,       # 실행 중 예외 수
+            "max_waiters": 0,  # 호출 1건에 붙은 최대 대기자 수
+        }
+
+    def do(self, key, fn):
+        """
+        키가 같은 호출이 진행 중이면 그 결과를 기다리고, 아니면 fn() 을 실행
+
+        Returns:
+            tuple: (결과 값, 다른 호출 결과를 공유받았는지 여부)
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key) if self.enabled else None
+            if call is not None:
+                call.waiters += 1
+                self._stats["shared"] += 1
+                self._stats["max_waiters"] = max(self._stats["max_waiters"], call.waiters)
+                leader = False
+            else:
+                call = _Call()
+                if self.enabled:
+                    self._calls[key] = call
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            console.log(f"🔗 동일 {self.name} 호출 진행 중 → 결과 공유 대기 (대기자 {call.waiters}명)")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+            return call.value, False
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, fn):
+        """
+        do() 의 비동기 버전 (fn 은 코루틴 함수, 같은 이벤트 루프 안의 호출끼리 합침)
+
+        Returns:
+            tuple: (결과 값, 다른 호출 결과를 공유받았는지 여부)
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            entry = self._async_calls.get(key) if self.enabled else None
+            if entry is not None:
+                entry[1] += 1
+                self._stats["shared"] += 1
+                self._stats["max_waiters"] = max(self._stats["max_waiters"], entry[1])
+                leader = False
+            else:
+                entry = [asyncio.get_running_loop().create_future(), 0]
+                if self.enabled:
+                    self._async_calls[key] = entry
+                self._stats["executions"] += 1
+                leader = True
+        future = entry[0]
+
+        if not leader:
+            console.log(f"🔗 동일 {self.name} 호출 진행 중 → 결과 공유 대기 (대기자 {entry[1]}명)")
+            return await asyncio.shield(future), True
+
+        try:
+            value = await fn()
+            future.set_result(value)
+            return value, False
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()   # 대기자가 없을 때 "미확인 예외" 경고 방지
+                with self._lock:
+                    self._stats["errors"] += 1
+            else:
+                future.cancel()   # 요청 취소 시 대기자도 해제
+            raise
+        finally:
+            with self._lock:
+                if self._async_calls.get(key) is entry:
+                    del self._async_calls[key]
+
+    def stats(self):
+        """호출/실행/공유(적중) 수와 현재 진행 중인 호출·대기자 수 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + len(self._async_calls)
+            stats["waiting"] = (
+                sum(call.waiters for call in self._calls.values())
+                + sum(waiters for _, waiters in self._async_calls.values())
+            )
+        stats["shared_rate"] = round(stats["shared"] / stats["calls"], 3) if stats["calls"] else 0
+        return stats
+
+
+# 프로세스 공용 LLM 호출 그룹
+llm_flight = SingleFlight("LLM", enabled=LLM_SINGLEFLIGHT)
+
+
+def get_singleflight_stats():
+    """LLM 호출 합치기 통계"""
+    return llm_flight.stats()
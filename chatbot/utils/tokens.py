@@ -0,0 +1,70 @@
+"""
+토큰 계산 유틸리티
+
+이 모듈은 프롬프트/대화 히스토리 크기를 토큰 단위로 계산합니다.
+tiktoken 이 설치되어 있으면 정확한 토큰 수를, 없으면 문자 수 기반 추정치를 사용합니다.
+"""
+
+# 표준 라이브러리
+import html
+import re
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성
+    tiktoken = None
+
+_encoding = None
+
+# tiktoken 이 없을 때의 추정 비율 (한글은 글자당 토큰이 많고, 영문/공백은 적음)
+_HANGUL_RE = re.compile(r"[가-힣]")
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLOCK_TAG_RE = re.compile(r"</?(p|div|br|li|tr|h[1-6]|ul|ol|table)[^>]*>", re.IGNORECASE)
+_STYLE_RE = re.compile(r"<(style|script)[^>]*>.*?</\1>", re.IGNORECASE | re.DOTALL)
+
+
+def _get_encoding():
+    """tiktoken 인코더 (최초 1회만 로드, 실패 시 None)"""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")   # gpt-4o 계열 인코딩
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수 계산 (tiktoken 없으면 추정)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """텍스트를 max_tokens 이하로 자르기 (앞부분 유지)"""
+    if not text or count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]) + " …"
+    # 추정 모드: 비율에 맞춰 글자 수로 자르기
+    ratio = max_tokens / count_tokens(text)
+    return text[: max(1, int(len(text) * ratio))] + " …"
+
+
+def html_to_text(value: str) -> str:
+    """HTML(과거에 저장된 답변)을 프롬프트용 평문으로 변환"""
+    if not value or "<" not in value:
+        return value or ""
+    text = _STYLE_RE.sub("", value)
+    text = _BLOCK_TAG_RE.sub("\n", text)
+    text = _TAG_RE.sub("", text)
+    text = html.unescape(text)
+    # 공백/빈 줄 정리
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
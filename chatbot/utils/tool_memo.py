@@ -0,0 +1,177 @@
+"""
+요청 단위 도구 호출 메모 유틸리티
+
+이 모듈은 채팅 1턴 동안 같은 도구를 같은 인자로 다시 부르면 이전 결과를 돌려줍니다.
+- 에이전트가 "카카오지도검색"/"구글플레이스상세" 를 같은(또는 조사만 다른) 검색어로 반복 호출하는 경우
+- 답변 후처리(extract_coordinates_from_response)가 에이전트가 이미 찾은 장소를 다시 지오코딩하는 경우
+인자는 make_geocode_key(clean_query 기준, 대소문자 무시)로 정규화하고,
+진행 중인 같은 호출은 끝날 때까지 기다렸다가 결과를 함께 사용합니다 (병렬 도구 엔진/작업 스레드 공용).
+요청이 끝나면 메모는 버려지므로 지오코딩 캐시(geocode_cache.py)처럼 요청 사이에 결과를 재사용하지 않습니다.
+"""
+
+# 표준 라이브러리
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# Django 및 외부 모듈
+from rich.console import Console
+
+# 로컬 모듈
+from .cache import MISSING
+from .geocode_cache import make_geocode_key
+from .tracing import annotate
+
+console = Console()
+
+_current_memo = contextvars.ContextVar("chatbot_tool_memo", default=None)
+
+
+class ToolMemo:
+    """요청 1건의 (도구, 정규화 인자) → 결과 메모와 중복 제거 적중 수"""
+
+    def __init__(self):
+        self._entries = {}        # (도구, 키) → Future
+        self._lock = threading.Lock()
+        self.calls = Counter()    # 도구별 호출 수
+        self.hits = Counter()     # 도구별 중복 제거 적중 수
+
+    def _claim(self, tool, key):
+        """(Future, 직접 실행해야 하는지) — 처음 호출한 쪽만 실행"""
+        with self._lock:
+            self.calls[tool] += 1
+            future = self._entries.get((tool, key))
+            if future is not None:
+                self.hits[tool] += 1
+                return future, False
+            future = self._entries[(tool, key)] = Future()
+            return future, True
+
+    def call(self, tool, key, fn):
+        """메모에 있으면 그 결과, 없으면 fn() 실행 후 저장 (예외는 저장하지 않고 다음 호출에서 재시도)"""
+        future, owner = self._claim(tool, key)
+        if not owner:
+            console.log(f"🧠 도구 메모 적중: {tool} '{key}'")
+            return future.result()
+        return self._run(tool, key, future, fn)
+
+    async def acall(self, tool, key, fn):
+        """call() 의 비동기 버전 (fn 은 코루틴 함수)"""
+        future, owner = self._claim(tool, key)
+        if not owner:
+            console.log(f"🧠 도구 메모 적중: {tool} '{key}'")
+            return await asyncio.wrap_future(future)
+        try:
+            value = await fn()
+        except BaseException as e:
+            self._forget(tool, key, future, e)
+            raise
+        future.set_result(value)
+        return value
+
+    def _run(self, tool, key, future, fn):
+        try:
+            value = fn()
+        except BaseException as e:
+            self._forget(tool, key, future, e)
+            raise
+        future.set_result(value)
+        return value
+
+    def _forget(self, tool, key, future, error):
+        """실패한 호출은 메모에서 제거 (기다리던 호출에는 같은 예외 전달)"""
+        with self._lock:
+            if self._entries.get((tool, key)) is future:
+                del self._entries[(tool, key)]
+        future.set_exception(error)
+        future.exception()   # 기다리는 쪽이 없을 때 경고 방지
+
+    def peek(self, tool, key):
+        """완료된 결과만 조회 (없거나 진행 중이면 MISSING)"""
+        with self._lock:
+            future = self._entries.get((tool, key))
+        if future is None or not future.done() or future.exception() is not None:
+            return MISSING
+        return future.result()
+
+    def summary(self):
+        """도구별 호출/적중 수"""
+        with self._lock:
+            return {tool: {"calls": self.calls[tool], "hits": self.hits[tool]} for tool in self.calls}
+
+
+def current_tool_memo():
+    """현재 요청의 ToolMemo (없으면 None)"""
+    return _current_memo.get()
+
+
+@contextmanager
+def tool_memo_scope():
+    """with 블록 동안 요청 단위 도구 메모 적용 (끝날 때 중복 제거 적중 수 로그)"""
+    memo = ToolMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+        hits = sum(memo.hits.values())
+        if memo.calls:
+            annotate("tool_memo_hits", hits)
+            console.log(f"🧠 도구 메모: 호출 {sum(memo.calls.values())}회 중 중복 제거 {hits}회 {dict(memo.hits)}")
+
+
+def with_tool_memo(view):
+    """뷰 전체에 요청 단위 도구 메모를 적용하는 데코레이터 (async 뷰도 지원)"""
+    if inspect.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with tool_memo_scope():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with tool_memo_scope():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def memoized_tool(tool, func):
+    """
+    검색어 1개를 받는 도구 함수를 요청 단위 메모로 감싸기 (요청 밖에서는 그대로 호출)
+
+    사용 예:
+        Tool(name="카카오지도검색", func=memoized_tool("kakao_geocode", kakao_geocode), ...)
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(query, *args, **kwargs):
+            memo = _current_memo.get()
+            key = make_geocode_key(query) if isinstance(query, str) else ""
+            if memo is None or not key or args or kwargs:
+                return await func(query, *args, **kwargs)
+            return await memo.acall(tool, key, lambda: func(query))
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(query, *args, **kwargs):
+        memo = _current_memo.get()
+        key = make_geocode_key(query) if isinstance(query, str) else ""
+        if memo is None or not key or args or kwargs:
+            return func(query, *args, **kwargs)
+        return memo.call(tool, key, lambda: func(query))
+    return wrapper
+
+
+def peek_tool_result(tool, query):
+    """현재 요청에서 이미 끝난 도구 호출 결과 (없으면 MISSING)"""
+    memo = _current_memo.get()
+    key = make_geocode_key(query) if isinstance(query, str) else ""
+    if memo is None or not key:
+        return MISSING
+    return memo.peek(tool, key)
@@ -0,0 +1,153 @@
+"""
+요청 단계별 지연 시간 추적 유틸리티
+
+이 모듈은 채팅 1턴 동안 어느 단계(LLM, 카카오, 구글 플레이스, 날씨, 유튜브, DB 등)에서
+시간이 쓰였는지 기록하는 가벼운 span API 를 제공합니다.
+- 요청마다 Trace 1개를 contextvar 로 들고 다니며, 같은 이름의 span 은 횟수/누적 시간으로 합산
+- 추적 중이 아니면 span 은 아무것도 하지 않음 (관리 명령/셸에서도 그대로 호출 가능)
+- 작업 스레드로 넘길 함수는 bind_context() 로 감싸야 같은 Trace 에 기록됨
+- 결과는 ServerTimingMiddleware 가 Server-Timing 헤더와 구조화 로그 한 줄로 내보냄
+"""
+
+# 표준 라이브러리
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("chatbot.tracing")
+
+_current_trace = contextvars.ContextVar("chatbot_trace", default=None)
+
+
+class Trace:
+    """요청 1건의 span 집계"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = {}   # span 이름 → [횟수, 누적 초] (처음 기록된 순서 유지)
+        self.tags = {}    # 추가 정보 (예: 라우팅 경로)
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (브라우저 개발자 도구 Timing 탭에 표시됨)"""
+        with self._lock:
+            spans = list(self.spans.items())
+        parts = [f"total;dur={self.elapsed() * 1000:.1f}"]
+        for name, (count, seconds) in spans:
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="x{count}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def to_dict(self):
+        """구조화 로그용 딕셔너리"""
+        with self._lock:
+            spans = {
+                name: {"count": count, "ms": round(seconds * 1000, 1)}
+                for name, (count, seconds) in self.spans.items()
+            }
+            tags = dict(self.tags)
+        return {"trace": self.name, "total_ms": round(self.elapsed() * 1000, 1), **tags, "spans": spans}
+
+
+def start_trace(name):
+    """현재 컨텍스트에서 새 Trace 시작 → (Trace, 복원용 토큰)"""
+    trace = Trace(name)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    """start_trace 이전 상태로 복원"""
+    _current_trace.reset(token)
+
+
+def current_trace():
+    """현재 컨텍스트의 Trace (추적 중이 아니면 None)"""
+    return _current_trace.get()
+
+
+def annotate(key, value):
+    """현재 Trace 에 태그 추가 (구조화 로그에 함께 출력)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.tags[key] = value
+
+
+@contextmanager
+def span(name):
+    """with 블록의 소요 시간을 현재 Trace 에 기록"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def traced(name):
+    """함수 전체를 span 으로 기록하는 데코레이터 (async 함수도 지원)"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_context(func):
+    """
+    현재 컨텍스트(Trace 포함)를 복사하여 다른 스레드에서 실행되도록 감싼 함수 반환
+
+    같은 Context 는 동시에 두 스레드에서 들어갈 수 없으므로 submit 할 때마다 새로 감쌉니다.
+        executor.submit(bind_context(worker), arg)
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return wrapper
+
+
+def db_span_wrapper(execute, sql, params, many, context):
+    """DB 쿼리 시간을 db span 으로 기록하는 execute wrapper"""
+    with span("db"):
+        return execute(sql, params, many, context)
+
+
+def install_db_tracing(sender=None, connection=None, **kwargs):
+    """connection_created 시그널 수신 → 새 DB 연결마다 execute wrapper 등록 (작업 스레드 포함)"""
+    if db_span_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_span_wrapper)
+
+
+def log_trace(trace, **fields):
+    """요청 1건의 단계별 시간을 JSON 한 줄로 기록 (오프라인 집계용)"""
+    logger.info(json.dumps({**trace.to_dict(), **fields}, ensure_ascii=False))
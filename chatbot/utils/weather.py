@@ -1,48 +1,300 @@
 # chatbot/utils/weather.py
-import requests
+"""
+날씨 서비스
+
+OpenWeather 현재 날씨를 지오해시 격자(정밀도 5, 약 5km) 단위로 캐시합니다.
+- 같은 도시의 여러 장소는 같은 격자로 모여 OpenWeather 호출 1회만 사용 (격자 중심 좌표로 조회)
+- 여러 장소의 날씨는 서로 다른 격자만 골라 동시에 조회 (get_weather_many / aget_weather_many)
+- 도시명 조회(get_weather_info)도 응답 좌표의 격자로 같은 캐시를 공유
+- 구조화 데이터(description, temp, feels_like, name, cell)를 반환하고,
+  기존 문자열 함수(get_weather_info, get_weather_info_by_coords)는 format_weather 로 감싼 래퍼로 유지
+"""
+
+# 표준 라이브러리
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Django 및 외부 모듈
+from django.conf import settings
+from rich.console import Console
+
+# 로컬 모듈
+from .aio import get_async_client
+from .cache import TTLCache, MISSING
+from .deadline import remaining_timeout
+from .http_client import http_get
+from .tracing import traced, bind_context
+
+console = Console()
 
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+OPENWEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+WEATHER_TIMEOUT = 5   # 요청 1회 최대 대기(초), 요청 예산이 더 적게 남았으면 그 안에서
 
-def get_weather_info(location: str) -> str:
-    """OpenWeather API로 현재 날씨와 기온 가져오기 (최소 버전)"""
-    if not OPENWEATHER_API_KEY:
-        return "❌ OpenWeather API 키가 설정되지 않았습니다."
+# 캐시 설정 (settings.py 에서 재정의 가능)
+WEATHER_CACHE_TTL = getattr(settings, "WEATHER_CACHE_TTL", 10 * 60)              # 격자별 날씨 보관 시간(초)
+WEATHER_GEOHASH_PRECISION = getattr(settings, "WEATHER_GEOHASH_PRECISION", 5)    # 5 → 약 4.9km x 4.9km
+WEATHER_MAX_WORKERS = getattr(settings, "WEATHER_MAX_WORKERS", 8)                # 격자 동시 조회 수
+
+NO_API_KEY_MESSAGE = "❌ OpenWeather API 키가 설정되지 않았습니다."
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
 
+_weather_cache = TTLCache(maxsize=1024, ttl=WEATHER_CACHE_TTL)   # 격자 → 날씨 데이터
+_city_cells = TTLCache(maxsize=1024, ttl=60 * 60 * 24)           # 도시명 → 격자 (도시 위치는 바뀌지 않으므로 길게)
+
+
+# -------------------- 지오해시 격자 --------------------
+def geohash_encode(lat, lng, precision=WEATHER_GEOHASH_PRECISION):
+    """위도/경도 → 지오해시 문자열"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits, bit_count, even = 0, 0, True
+    result = []
+    while len(result) < precision:
+        value, bounds = (lng, lng_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            result.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(result)
+
+
+def geohash_center(cell):
+    """지오해시 격자 → 중심 좌표 (lat, lng)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        index = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lng_range if even else lat_range
+            mid = (bounds[0] + bounds[1]) / 2
+            if (index >> shift) & 1:
+                bounds[0] = mid
+            else:
+                bounds[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def weather_cell(lat, lng):
+    """좌표가 속한 날씨 캐시 격자 (좌표가 올바르지 않으면 None)"""
     try:
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={OPENWEATHER_API_KEY}&lang=kr&units=metric"
-        response = requests.get(url)
-        data = response.json()
+        return geohash_encode(float(lat), float(lng))
+    except (TypeError, ValueError):
+        return None
+
+
+# -------------------- 구조화 데이터 --------------------
+def _parse_weather(data, cell=None):
+    """OpenWeather 응답 → 날씨 데이터 dict (오류 응답이면 None)"""
+    if str(data.get("cod")) != "200":
+        console.log(f"❌ 날씨 정보를 가져올 수 없습니다: {data.get('message', '알 수 없는 오류')}")
+        return None
+    coord = data.get("coord") or {}
+    if cell is None and "lat" in coord and "lon" in coord:
+        cell = weather_cell(coord["lat"], coord["lon"])
+    return {
+        "description": data["weather"][0]["description"],
+        "temp": data["main"]["temp"],
+        "feels_like": data["main"]["feels_like"],
+        "name": data.get("name") or "해당 지역",
+        "cell": cell,
+    }
 
-        if data.get("cod") != 200:
-            return f"❌ 날씨 정보를 가져올 수 없습니다: {data.get('message', '알 수 없는 오류')}"
 
-        weather_desc = data["weather"][0]["description"]
-        temp = data["main"]["temp"]
-        feels_like = data["main"]["feels_like"]
+def format_weather(weather, name=None):
+    """날씨 데이터 → 안내 문장 (None 이면 오류 문장)"""
+    if not weather:
+        return "❌ 날씨 정보를 가져올 수 없습니다."
+    name = name or weather.get("name") or "해당 지역"
+    return f"{name} 현재 날씨는 '{weather['description']}', 기온은 {weather['temp']}°C (체감 {weather['feels_like']}°C) 입니다."
 
-        return f"{location} 현재 날씨는 '{weather_desc}', 기온은 {temp}°C (체감 {feels_like}°C) 입니다."
+
+def _city_key(location):
+    return " ".join(str(location).split()).lower()
+
+
+def _cached_city(location):
+    """도시명으로 이미 조회한 격자의 날씨 (없으면 MISSING)"""
+    cell = _city_cells.get(_city_key(location))
+    return MISSING if cell is MISSING else _weather_cache.get(cell)
+
+
+def _remember(weather, location=None):
+    """날씨 데이터를 격자 캐시에 저장 (도시명 조회면 도시 → 격자도 기록)"""
+    if weather and weather.get("cell"):
+        _weather_cache.set(weather["cell"], weather)
+        if location:
+            _city_cells.set(_city_key(location), weather["cell"])
+
+
+def _params(**query):
+    return {**query, "appid": OPENWEATHER_API_KEY, "lang": "kr", "units": "metric"}
+
+
+# -------------------- 조회 (동기) --------------------
+@traced("weather")
+def _fetch_cell(cell):
+    """격자 중심 좌표로 OpenWeather 조회 (실패 시 None, 캐시하지 않음)"""
+    lat, lng = geohash_center(cell)
+    try:
+        response = http_get("openweather", OPENWEATHER_URL, params=_params(lat=lat, lon=lng), timeout=remaining_timeout(WEATHER_TIMEOUT))
+        weather = _parse_weather(response.json(), cell)
     except Exception as e:
-        return f"❌ 날씨 정보 호출 오류: {e}"
+        console.log(f"❌ 날씨 정보 호출 오류 ({cell}): {e}")
+        return None
+    _remember(weather)
+    return weather
 
-def get_weather_info_by_coords(lat: float, lng: float) -> str:
-    """좌표로 현재 날씨와 기온 가져오기"""
+
+def get_weather(lat, lng):
+    """
+    좌표의 현재 날씨 (격자 캐시 우선)
+
+    Returns:
+        dict | None: {"description", "temp", "feels_like", "name", "cell"}
+    """
+    cell = weather_cell(lat, lng)
+    if not cell or not OPENWEATHER_API_KEY:
+        return None
+    weather = _weather_cache.get(cell)
+    return _fetch_cell(cell) if weather is MISSING else weather
+
+
+def get_weather_many(coords, max_workers=None):
+    """
+    여러 좌표의 날씨를 한 번에 조회 (격자 단위 중복 제거 + 캐시에 없는 격자만 동시 조회)
+
+    Args:
+        coords (list): (lat, lng) 목록
+
+    Returns:
+        list: 입력 순서와 같은 순서의 날씨 데이터 (실패/좌표 없음은 None)
+    """
+    cells = [weather_cell(lat, lng) for lat, lng in coords]
     if not OPENWEATHER_API_KEY:
-        return "❌ OpenWeather API 키가 설정되지 않았습니다."
+        return [None] * len(cells)
+
+    results = {}
+    pending = []
+    for cell in dict.fromkeys(cell for cell in cells if cell):
+        weather = _weather_cache.get(cell)
+        if weather is MISSING:
+            pending.append(cell)
+        else:
+            results[cell] = weather
+
+    if len(pending) == 1:
+        results[pending[0]] = _fetch_cell(pending[0])
+    elif pending:
+        workers = max(1, min(max_workers or WEATHER_MAX_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather") as executor:
+            futures = {cell: executor.submit(bind_context(_fetch_cell), cell) for cell in pending}
+            results.update({cell: future.result() for cell, future in futures.items()})
+
+    console.log(f"🌤 날씨 일괄 조회: {len(coords)}개 장소 → {len(results)}개 격자 (API 호출 {len(pending)}회)")
+    return [results.get(cell) if cell else None for cell in cells]
 
+
+@traced("weather")
+def _fetch_city(location):
     try:
-        url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lng}&appid={OPENWEATHER_API_KEY}&lang=kr&units=metric"
-        response = requests.get(url)
-        data = response.json()
+        response = http_get("openweather", OPENWEATHER_URL, params=_params(q=location), timeout=remaining_timeout(WEATHER_TIMEOUT))
+        weather = _parse_weather(response.json())
+    except Exception as e:
+        console.log(f"❌ 날씨 정보 호출 오류 ({location}): {e}")
+        return None
+    _remember(weather, location)
+    return weather
+
+
+def get_weather_by_name(location):
+    """도시명의 현재 날씨 (좌표 조회와 같은 격자 캐시 공유, 실패 시 None)"""
+    if not OPENWEATHER_API_KEY:
+        return None
+    weather = _cached_city(location)
+    return _fetch_city(location) if weather is MISSING else weather
+
+
+def get_weather_info(location: str) -> str:
+    """OpenWeather API로 현재 날씨와 기온 가져오기 (문자열, 에이전트 도구용)"""
+    if not OPENWEATHER_API_KEY:
+        return NO_API_KEY_MESSAGE
+    return format_weather(get_weather_by_name(location), location)
+
 
-        if data.get("cod") != 200:
-            return f"❌ 날씨 정보를 가져올 수 없습니다: {data.get('message', '알 수 없는 오류')}"
+def get_weather_info_by_coords(lat: float, lng: float) -> str:
+    """좌표로 현재 날씨와 기온 가져오기 (문자열)"""
+    if not OPENWEATHER_API_KEY:
+        return NO_API_KEY_MESSAGE
+    return format_weather(get_weather(lat, lng))
 
-        weather_desc = data["weather"][0]["description"]
-        temp = data["main"]["temp"]
-        feels_like = data["main"]["feels_like"]
-        city_name = data.get("name", "해당 지역")
 
-        return f"{city_name} 현재 날씨는 '{weather_desc}', 기온은 {temp}°C (체감 {feels_like}°C) 입니다."
+# -------------------- 비동기 버전 (ASGI 파이프라인용) --------------------
+@traced("weather")
+async def _afetch(params, cell=None, location=None):
+    try:
+        response = await get_async_client().get(OPENWEATHER_URL, params=params, timeout=remaining_timeout(WEATHER_TIMEOUT))
+        weather = _parse_weather(response.json(), cell)
     except Exception as e:
-        return f"❌ 날씨 정보 호출 오류: {e}"
\ No newline at end of file
+        console.log(f"❌ 날씨 정보 호출 오류 ({cell or location}): {e}")
+        return None
+    _remember(weather, location)
+    return weather
+
+
+async def _afetch_cell(cell):
+    lat, lng = geohash_center(cell)
+    return await _afetch(_params(lat=lat, lon=lng), cell=cell)
+
+
+async def aget_weather_many(coords):
+    """get_weather_many 의 비동기 버전"""
+    cells = [weather_cell(lat, lng) for lat, lng in coords]
+    if not OPENWEATHER_API_KEY:
+        return [None] * len(cells)
+
+    results = {}
+    pending = []
+    for cell in dict.fromkeys(cell for cell in cells if cell):
+        weather = _weather_cache.get(cell)
+        if weather is MISSING:
+            pending.append(cell)
+        else:
+            results[cell] = weather
+
+    results.update(zip(pending, await asyncio.gather(*(_afetch_cell(cell) for cell in pending))))
+    console.log(f"🌤 날씨 일괄 조회(async): {len(coords)}개 장소 → {len(results)}개 격자 (API 호출 {len(pending)}회)")
+    return [results.get(cell) if cell else None for cell in cells]
+
+
+async def aget_weather_info(location: str) -> str:
+    """get_weather_info 의 비동기 버전"""
+    if not OPENWEATHER_API_KEY:
+        return NO_API_KEY_MESSAGE
+    weather = _cached_city(location)
+    if weather is MISSING:
+        weather = await _afetch(_params(q=location), location=location)
+    return format_weather(weather, location)
+
+
+async def aget_weather_info_by_coords(lat: float, lng: float) -> str:
+    """get_weather_info_by_coords 의 비동기 버전"""
+    if not OPENWEATHER_API_KEY:
+        return NO_API_KEY_MESSAGE
+    weather = (await aget_weather_many([(lat, lng)]))[0]
+    return format_weather(weather)
+
+
+def get_weather_cache_stats():
+    """격자 날씨 캐시 적중 통계"""
+    return _weather_cache.stats()
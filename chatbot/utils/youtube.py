@@ -2,20 +2,33 @@
 유튜브 관련 유틸리티 함수들
 
 이 모듈은 유튜브 API를 사용한 영상 검색 및 렌더링 관련 함수들을 포함합니다.
+- 검색은 YouTube Data API REST 엔드포인트를 직접 호출 (googleapiclient build() 의 디스커버리 문서 로드 없음)
+- 동기 검색은 http_client 의 "youtube" 공용 세션(keep-alive 연결 풀, 스레드 안전), 비동기 검색은 이벤트 루프별 httpx 클라이언트 사용
+- 검색어 2개는 동기/비동기 모두 동시에 요청하고, 영상 중복 제거는 검색어 순서대로 적용
+- 검색 결과는 "카테고리:장소명" 단위로 캐시하고 일일 할당량 장부로 API 사용량을 제한 (youtube_cache.py)
 """
 
 # 표준 라이브러리
+import asyncio
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # 외부 모듈
-from googleapiclient.discovery import build
 from rich.console import Console
 
+# 로컬 모듈
+from .aio import get_async_client, run_sync
+from .deadline import remaining_timeout
+from .http_client import http_get
+from .tracing import traced, bind_context
+from .youtube_cache import cache_key, lookup, store, reserve_quota
+
 console = Console()
 
 # API 키
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+YOUTUBE_TIMEOUT = 8   # 요청 1회 최대 대기(초), 요청 예산이 더 적게 남았으면 그 안에서
 
 # 불용어 목록
 # 불용어 목록
@@ -33,14 +46,26 @@ def clean_query(text: str):
     return " ".join(tokens)
 
 
-def yt_search(query: str, max_results: int = 3):
-    """유튜브 API를 사용해 여행 브이로그, 맛집 리뷰 등 다양한 영상 검색"""
-    if not YOUTUBE_API_KEY:
-        return []
-    
-    # 유튜브 API 클라이언트 생성
-    yt = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
-    
+# 유튜브 Data API 검색 옵션 (동기/비동기 공용)
+YT_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+YT_SEARCH_OPTIONS = {
+    "part": "snippet",
+    "type": "video",
+    "relevanceLanguage": "ko",
+    "regionCode": "KR",
+    "safeSearch": "strict",  # ✅ strict로 변경하여 더 안전한 검색
+    "order": "relevance",  # 관련성 순으로 정렬
+    "videoDuration": "medium",  # ✅ 중간 길이 영상만 (너무 짧거나 긴 영상 제외)
+    "videoDefinition": "high"  # ✅ 고화질 영상만
+}
+
+
+def _yt_search_plan(query: str):
+    """
+    검색어 → (장소명, 카테고리, 실제 유튜브 검색에 사용할 검색어 목록(최대 2개))
+
+    카테고리: "vlog" | "카페" | "맛집" | "여행" (장소명과 함께 결과 캐시 키로 사용)
+    """
     # 검색어 정리 (불필요한 접속사, 조사, 문장 끝 표현 제거)
     cleaned_query = clean_query(query)
     
@@ -69,98 +94,114 @@ def yt_search(query: str, max_results: int = 3):
     # ✅ 검색어 타입에 따른 정확한 검색어 생성
     if "브이로그" in cleaned_query or "vlog" in cleaned_query.lower():
         # 브이로그 검색 - 더 구체적인 키워드 사용
+        category = "vlog"
         search_queries.append(f'"{place_name}" 브이로그 여행')
         search_queries.append(f'"{place_name}" vlog travel')
         search_queries.append(f'"{place_name}" 여행 브이로그')
     elif "카페" in cleaned_query:
         # 카페 검색 - 카페 관련 브이로그만
+        category = "카페"
         search_queries.append(f'"{place_name}" 카페 브이로그')
         search_queries.append(f'"{place_name}" 카페 vlog')
         search_queries.append(f'"{place_name}" 카페 여행')
     elif "맛집" in cleaned_query or "음식" in cleaned_query or "식당" in cleaned_query:
         # 맛집 검색
+        category = "맛집"
         search_queries.append(f'"{place_name}" 맛집 브이로그')
         search_queries.append(f'"{place_name}" 맛집 vlog')
         search_queries.append(f'"{place_name}" 음식 브이로그')
     else:
         # 기본적으로 여행 브이로그 우선 검색
+        category = "여행"
         search_queries.append(f'"{place_name}" 여행 브이로그')
         search_queries.append(f'"{place_name}" travel vlog')
         search_queries.append(f'"{place_name}" 브이로그')
     
-    all_items = []
-    
-    # ✅ 여러 검색어로 검색하여 더 많은 결과 수집
-    for search_query in search_queries[:2]:  # 최대 2개 검색어만 사용
-        try:
-            resp = yt.search().list(
-                q=search_query,
-                part="snippet",
-                type="video",
-                maxResults=max_results,
-                relevanceLanguage="ko",
-                regionCode="KR",
-                safeSearch="strict",  # ✅ strict로 변경하여 더 안전한 검색
-                order="relevance",  # 관련성 순으로 정렬
-                videoDuration="medium",  # ✅ 중간 길이 영상만 (너무 짧거나 긴 영상 제외)
-                videoDefinition="high"  # ✅ 고화질 영상만
-            ).execute()
-            
-            # ✅ 검색 결과 파싱 및 필터링
-            for it in resp.get("items", []):
-                vid = it["id"]["videoId"]
-                sn = it["snippet"]
-                title = sn["title"]
-                description = sn.get("description", "")
-                
-                # ✅ 부적절한 키워드 필터링
-                inappropriate_keywords = [
-                    "몰래카메라", "노상방뇨", "가만히 서있다가", "옷이 벗겨진", 
-                    "와이프", "순발력", "지렸다", "커플", "자세", "shorts"
-                ]
-                
-                # 제목이나 설명에 부적절한 키워드가 포함되어 있으면 제외
-                if any(keyword in title.lower() or keyword in description.lower() 
-                       for keyword in inappropriate_keywords):
-                    console.log(f"부적절한 영상 제외: {title}")
-                    continue
-                
-                # ✅ 여행/브이로그 관련 키워드가 포함되어 있는지 확인
-                travel_keywords = [
-                    "여행", "브이로그", "vlog", "travel", "관광", "맛집", "카페", 
-                    "부산", "서울", "제주", "경주", "강릉", "대구", "인천", "광주", "대전", "울산",
-                    "독도", "울릉도", "영월", "강원도", "전주", "여수", "목포"  # "영월" 등 추가----
-                ]
-                
-                # 제목이나 설명에 여행 관련 키워드가 하나라도 포함되어 있어야 함
-                if not any(keyword in title.lower() or keyword in description.lower() 
-                          for keyword in travel_keywords):
-                    console.log(f"여행 관련 키워드 없음: {title}")
-                    continue
-                
-                # 중복 제거를 위해 video_id로 체크
-                if not any(item["video_id"] == vid for item in all_items):
-                    all_items.append({
-                        "video_id": vid,
-                        "title": sn["title"],
-                        "channel": sn["channelTitle"],
-                        "thumb": sn["thumbnails"]["medium"]["url"],
-                        "published": sn["publishedAt"],
-                        "desc": sn.get("description", ""),
-                        "url": f"https://www.youtube.com/watch?v={vid}",
-                        "search_query": search_query  # 어떤 검색어로 찾았는지 기록
-                    })
-                    console.log(f"✅ 적절한 영상 추가: {title}")
-        except Exception as e:
-            console.log(f"유튜브 검색 오류 ({search_query}): {e}")
-            return {
-                "success": False,
-                "videos": [],
-                "message": f"유튜브 검색 중 오류가 발생했습니다. ({str(e)})",
-                "html": ""
-            }
+    return place_name, category, search_queries[:2]  # 최대 2개 검색어만 사용
 
-    
+
+def _collect_videos(items, all_items, search_query):
+    """검색 결과 항목을 필터링하여 all_items 에 추가 (중복 제외)"""
+    # ✅ 검색 결과 파싱 및 필터링
+    for it in items:
+        vid = it["id"]["videoId"]
+        sn = it["snippet"]
+        title = sn["title"]
+        description = sn.get("description", "")
+        
+        # ✅ 부적절한 키워드 필터링
+        inappropriate_keywords = [
+            "몰래카메라", "노상방뇨", "가만히 서있다가", "옷이 벗겨진", 
+            "와이프", "순발력", "지렸다", "커플", "자세", "shorts"
+        ]
+        
+        # 제목이나 설명에 부적절한 키워드가 포함되어 있으면 제외
+        if any(keyword in title.lower() or keyword in description.lower() 
+               for keyword in inappropriate_keywords):
+            console.log(f"부적절한 영상 제외: {title}")
+            continue
+        
+        # ✅ 여행/브이로그 관련 키워드가 포함되어 있는지 확인
+        travel_keywords = [
+            "여행", "브이로그", "vlog", "travel", "관광", "맛집", "카페", 
+            "부산", "서울", "제주", "경주", "강릉", "대구", "인천", "광주", "대전", "울산",
+            "독도", "울릉도", "영월", "강원도", "전주", "여수", "목포"  # "영월" 등 추가----
+        ]
+        
+        # 제목이나 설명에 여행 관련 키워드가 하나라도 포함되어 있어야 함
+        if not any(keyword in title.lower() or keyword in description.lower() 
+                  for keyword in travel_keywords):
+            console.log(f"여행 관련 키워드 없음: {title}")
+            continue
+        
+        # 중복 제거를 위해 video_id로 체크
+        if not any(item["video_id"] == vid for item in all_items):
+            all_items.append({
+                "video_id": vid,
+                "title": sn["title"],
+                "channel": sn["channelTitle"],
+                "thumb": sn["thumbnails"]["medium"]["url"],
+                "published": sn["publishedAt"],
+                "desc": sn.get("description", ""),
+                "url": f"https://www.youtube.com/watch?v={vid}",
+                "search_query": search_query  # 어떤 검색어로 찾았는지 기록
+            })
+            console.log(f"✅ 적절한 영상 추가: {title}")
+
+
+def _yt_params(search_query, max_results):
+    """search.list 요청 파라미터 (동기/비동기 공용)"""
+    return {"q": search_query, "maxResults": max_results, "key": YOUTUBE_API_KEY, **YT_SEARCH_OPTIONS}
+
+
+def _yt_no_key():
+    """API 키가 없을 때의 결과 (검색 결과와 같은 딕셔너리 형태)"""
+    return {"success": False, "videos": [], "message": "유튜브 API 키가 설정되지 않았습니다.", "html": ""}
+
+
+def _yt_error(search_query, e):
+    """검색 오류 결과 딕셔너리"""
+    console.log(f"유튜브 검색 오류 ({search_query}): {e}")
+    return {
+        "success": False,
+        "videos": [],
+        "message": f"유튜브 검색 중 오류가 발생했습니다. ({str(e)})",
+        "html": ""
+    }
+
+
+def _yt_quota_exhausted(query):
+    """할당량 부족 + 대체할 캐시도 없을 때의 결과"""
+    return {
+        "success": False,
+        "videos": [],
+        "message": f"오늘 유튜브 검색 한도에 도달하여 '{query}' 영상을 가져오지 못했습니다.",
+        "html": ""
+    }
+
+
+def _yt_result(query, all_items, max_results):
+    """수집한 영상 목록 → 최종 결과 딕셔너리"""
     # 최대 결과 수만큼만 반환
     final_results = all_items[:max_results]
     
@@ -183,6 +224,89 @@ def yt_search(query: str, max_results: int = 3):
         }
 
 
+@traced("youtube")
+def yt_search(query: str, max_results: int = 3):
+    """
+    유튜브 API를 사용해 여행 브이로그, 맛집 리뷰 등 다양한 영상 검색
+
+    Returns:
+        dict: {"success", "videos", "message", "html"}
+    """
+    if not YOUTUBE_API_KEY:
+        return _yt_no_key()
+
+    place_name, category, search_queries = _yt_search_plan(query)
+    key = cache_key(place_name, category)
+
+    # 1) 결과 캐시 (만료 전)
+    videos = lookup(key)
+    if videos is not None:
+        return _yt_result(query, videos, max_results)
+
+    # 2) 할당량이 부족하면 만료된 캐시라도 사용
+    if not reserve_quota(len(search_queries)):
+        stale = lookup(key, allow_stale=True)
+        return _yt_result(query, stale, max_results) if stale is not None else _yt_quota_exhausted(query)
+    
+    def search(search_query):
+        resp = http_get("youtube", YT_SEARCH_URL, params=_yt_params(search_query, max_results), timeout=remaining_timeout(YOUTUBE_TIMEOUT))
+        resp.raise_for_status()
+        return resp.json()
+
+    # ✅ 여러 검색어를 동시에 검색하여 더 많은 결과 수집 (공용 세션, 타임아웃은 남은 요청 예산 안에서)
+    with ThreadPoolExecutor(max_workers=len(search_queries), thread_name_prefix="youtube") as executor:
+        futures = [executor.submit(bind_context(search), q) for q in search_queries]
+
+    all_items = []
+    for search_query, future in zip(search_queries, futures):
+        try:
+            _collect_videos(future.result().get("items", []), all_items, search_query)
+        except Exception as e:
+            # API 오류 → 만료된 캐시가 있으면 대신 사용
+            stale = lookup(key, allow_stale=True)
+            return _yt_result(query, stale, max_results) if stale is not None else _yt_error(search_query, e)
+
+    store(key, place_name, category, all_items)
+    return _yt_result(query, all_items, max_results)
+
+
+@traced("youtube")
+async def ayt_search(query: str, max_results: int = 3):
+    """yt_search 의 비동기 버전 (검색어 2개를 동시에 요청)"""
+    if not YOUTUBE_API_KEY:
+        return _yt_no_key()
+
+    place_name, category, search_queries = _yt_search_plan(query)
+    key = cache_key(place_name, category)
+
+    videos = await run_sync(lookup, key)
+    if videos is not None:
+        return _yt_result(query, videos, max_results)
+
+    if not await run_sync(reserve_quota, len(search_queries)):
+        stale = await run_sync(lookup, key, allow_stale=True)
+        return _yt_result(query, stale, max_results) if stale is not None else _yt_quota_exhausted(query)
+
+    client = get_async_client()
+
+    async def search(search_query):
+        resp = await client.get(YT_SEARCH_URL, params=_yt_params(search_query, max_results), timeout=remaining_timeout(YOUTUBE_TIMEOUT))
+        resp.raise_for_status()
+        return resp.json()
+
+    responses = await asyncio.gather(*(search(q) for q in search_queries), return_exceptions=True)
+
+    all_items = []
+    for search_query, resp in zip(search_queries, responses):
+        if isinstance(resp, Exception):
+            stale = await run_sync(lookup, key, allow_stale=True)
+            return _yt_result(query, stale, max_results) if stale is not None else _yt_error(search_query, resp)
+        _collect_videos(resp.get("items", []), all_items, search_query)
+
+    await run_sync(store, key, place_name, category, all_items)
+    return _yt_result(query, all_items, max_results)
+
+
 def _render_yt_cards(videos: list) -> str:
     """검색된 유튜브 영상 리스트를 카드 형태 HTML로 변환"""
     if not videos:
@@ -222,8 +346,11 @@ def _render_yt_cards(videos: list) -> str:
     """
 
 
+# 브이로그 요청 키워드 (services/router.py 라우팅 테이블에서도 사용)
+VLOG_KEYWORDS = ["브이로그", "vlog", "유튜브", "youtube", "영상 추천", "여행 브이로그"]
+
+
 def _wants_vlog(user_text: str) -> bool:
     """사용자가 브이로그(유튜브 영상)를 원했는지 판별"""
     q = (user_text or "").lower()
-    keys = ["브이로그", "vlog", "유튜브", "youtube", "영상 추천", "여행 브이로그"]
-    return any(k in q for k in keys)
+    return any(k in q for k in VLOG_KEYWORDS)
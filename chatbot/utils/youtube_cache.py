@@ -0,0 +1,135 @@
+"""
+유튜브 검색 결과 캐시 + 일일 할당량 장부
+
+이 모듈은 yt_search / ayt_search 앞단에서 YouTube Data API 할당량을 아껴 씁니다.
+- 결과 캐시: "카테고리:장소명" 키로 필터링된 영상 목록을 DB(YouTubeSearchCache)에 저장 (기본 24시간)
+- 할당량 장부: 기준일(태평양 시간, API 할당량 초기화 기준)별 사용 단위를 DB(YouTubeQuotaLedger)에 누적
+  (search.list 1회 = 100 단위, 호출 전에 먼저 차감하여 동시 요청이 많아도 한도를 넘지 않도록 함)
+- 남은 할당량이 예비분 이하이거나 API 오류가 나면 만료된 캐시 결과(stale)라도 대신 반환
+"""
+
+# 표준 라이브러리
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# Django 및 외부 모듈
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+from rich.console import Console
+
+# 로컬 모듈
+from ..models import YouTubeSearchCache, YouTubeQuotaLedger
+
+console = Console()
+
+# 캐시/할당량 설정 (settings.py 에서 재정의 가능)
+YOUTUBE_CACHE_TTL = getattr(settings, "YOUTUBE_CACHE_TTL", 60 * 60 * 24)              # 검색 결과: 24시간
+YOUTUBE_EMPTY_CACHE_TTL = getattr(settings, "YOUTUBE_EMPTY_CACHE_TTL", 60 * 60)       # 결과 없음: 1시간
+YOUTUBE_DAILY_QUOTA = getattr(settings, "YOUTUBE_DAILY_QUOTA", 10000)                 # 프로젝트 일일 할당량 (단위)
+YOUTUBE_QUOTA_RESERVE = getattr(settings, "YOUTUBE_QUOTA_RESERVE", 1000)              # 이만큼 남으면 새 검색 중단
+YOUTUBE_SEARCH_COST = 100                                                             # search.list 1회 비용
+
+# YouTube Data API 할당량은 태평양 시간 자정에 초기화
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+
+def cache_key(place_name, category):
+    """캐시 키 ("카테고리:장소명", 공백 정규화 + 소문자)"""
+    place = " ".join(str(place_name).replace('"', " ").split()).lower()
+    return f"{category}:{place}"[:200]
+
+
+def lookup(key, allow_stale=False):
+    """
+    캐시 조회
+
+    Returns:
+        list | None: 영상 목록 (없거나, allow_stale=False 인데 만료됐으면 None)
+    """
+    try:
+        row = YouTubeSearchCache.objects.filter(cache_key=key).values("videos", "expires_at").first()
+    except DatabaseError as e:
+        console.log(f"⚠️ 유튜브 캐시 조회 실패: {e}")
+        return None
+    if row is None:
+        return None
+    if row["expires_at"] > timezone.now():
+        console.log(f"💾 유튜브 캐시 적중: '{key}'")
+        return row["videos"]
+    if allow_stale:
+        console.log(f"🕰 만료된 유튜브 캐시 사용: '{key}' (만료 {row['expires_at']:%Y-%m-%d %H:%M})")
+        return row["videos"]
+    return None
+
+
+def store(key, place_name, category, videos):
+    """검색 결과 저장 (결과 없음은 짧은 TTL)"""
+    ttl = YOUTUBE_CACHE_TTL if videos else YOUTUBE_EMPTY_CACHE_TTL
+    try:
+        YouTubeSearchCache.objects.update_or_create(
+            cache_key=key,
+            defaults={
+                "place_name": place_name[:150],
+                "category": category,
+                "videos": videos,
+                "expires_at": timezone.now() + timedelta(seconds=ttl),
+            },
+        )
+    except DatabaseError as e:
+        console.log(f"⚠️ 유튜브 캐시 저장 실패: {e}")
+
+
+def quota_day():
+    """할당량 기준일 (태평양 시간 날짜)"""
+    return datetime.now(QUOTA_TIMEZONE).date()
+
+
+def quota_used():
+    """오늘 사용한 할당량 단위"""
+    try:
+        row = YouTubeQuotaLedger.objects.filter(day=quota_day()).values("units_used").first()
+    except DatabaseError as e:
+        console.log(f"⚠️ 유튜브 할당량 조회 실패: {e}")
+        return 0
+    return row["units_used"] if row else 0
+
+
+def reserve_quota(calls):
+    """
+    검색 calls 회 분량의 할당량을 먼저 차감 (남은 양이 예비분 이하로 떨어지면 차감하지 않고 False)
+
+    장부를 쓸 수 없으면(마이그레이션 전 등) 검색은 허용합니다.
+    """
+    units = calls * YOUTUBE_SEARCH_COST
+    day = quota_day()
+    try:
+        YouTubeQuotaLedger.objects.get_or_create(day=day)
+        # 조건부 UPDATE 1회로 확인 + 차감 (동시 요청끼리 한도를 넘지 않음)
+        updated = YouTubeQuotaLedger.objects.filter(
+            day=day, units_used__lte=YOUTUBE_DAILY_QUOTA - YOUTUBE_QUOTA_RESERVE - units,
+        ).update(units_used=F("units_used") + units, calls=F("calls") + calls)
+    except DatabaseError as e:
+        console.log(f"⚠️ 유튜브 할당량 장부 갱신 실패: {e}")
+        return True
+    if not updated:
+        console.log(f"🚫 유튜브 할당량 부족: 오늘 {quota_used()}/{YOUTUBE_DAILY_QUOTA} 사용 (예비 {YOUTUBE_QUOTA_RESERVE})")
+    return bool(updated)
+
+
+def get_youtube_quota_stats():
+    """오늘 할당량 사용량 / 남은 양 / 캐시 행 수"""
+    used = quota_used()
+    try:
+        cached = YouTubeSearchCache.objects.count()
+        fresh = YouTubeSearchCache.objects.filter(expires_at__gt=timezone.now()).count()
+    except DatabaseError:
+        cached = fresh = 0
+    return {
+        "day": str(quota_day()),
+        "units_used": used,
+        "units_remaining": max(0, YOUTUBE_DAILY_QUOTA - used),
+        "cached_queries": cached,
+        "fresh_queries": fresh,
+    }
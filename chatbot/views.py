@@ -1,13 +1,18 @@
 # -------------------- 표준 라이브러리 --------------------
+import asyncio
 import os
 import json
 import random
+import queue
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 # -------------------- Django 및 외부 모듈 --------------------
 from django.shortcuts import render, redirect
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import connections
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
@@ -20,16 +25,29 @@ from django.contrib import messages  # ⭐ messages 모듈 추가
 from .models import ChatSession, ChatMessage, Place, Schedule, UserProfile
 from .services.chat_handlers import (
     handle_schedule_request,
-    handle_vlog_request,
+    search_vlog,
     handle_simple_qna,
     handle_general_request,
 )
+from .services.async_handlers import (
+    ahandle_schedule_request,
+    asearch_vlog,
+    ahandle_simple_qna,
+    ahandle_general_request,
+)
 from .utils.sessions import get_or_create_session
-from .utils.youtube import _wants_vlog
-from .utils.weather import get_weather_info, get_weather_info_by_coords
-from .utils.maps import google_place_details, clean_place_query
+from .services.router import router, track_route
+from .utils.tracing import annotate, bind_context, span
+from .utils.tool_memo import with_tool_memo, tool_memo_scope
+from .utils.deadline import with_deadline, should_skip, remaining_timeout, DeadlineExceeded, CHAT_DEADLINE_SECONDS, ROUTE_DEADLINE_SECONDS
+from .utils.session_summary import build_prompt_history, schedule_summary_update
+from .utils.weather import get_weather_info, get_weather_many, aget_weather_many, format_weather
+from .utils.maps import google_place_details, agoogle_place_details, clean_place_query, ROUTE_API_TIMEOUT
 from .utils.coordinates import extract_places_from_response, search_place_coordinates
-from .utils.coordinate_extractor import extract_coordinates_from_schedule_data, extract_coordinates_from_response, format_places_info
+from .utils.coordinate_extractor import extract_coordinates_from_response, format_places_info, SchedulePlaceCollector
+from .utils.coordinate_extractor import aextract_coordinates_from_response, aextract_schedule_places
+from .utils.aio import run_sync
+from .utils.http_client import http_get, http_post
 from .forms import FindAccountForm
 
 # -------------------- 전역 변수 --------------------
@@ -39,14 +57,17 @@ KAKAO_JS_API_KEY = settings.KAKAO_JS_API_KEY               # 카카오 JavaScrip
 
 
 # ==================== 챗봇 메인 뷰 ====================
+@with_deadline(CHAT_DEADLINE_SECONDS)   # 채팅 1턴 전체 예산 (외부 호출 타임아웃/부가 정보 생략 기준)
+@with_tool_memo                         # 같은 턴의 반복 도구 호출/좌표 검색은 한 번만 실행
 def chatbot_view(request):
     """
     챗봇 메인 뷰 (대화 처리 및 세션 관리)
     
     이 함수는 사용자의 메시지를 받아서 적절한 AI 응답을 생성하고 반환합니다.
+    (실제 처리는 process_chat_message() 에서 수행, 스트리밍 버전은 chatbot_stream_view)
     요청 유형에 따라 다른 처리 함수를 호출합니다:
     - 일정 관련: handle_schedule_request()
-    - 브이로그 관련: handle_vlog_request()
+    - 브이로그 관련: search_vlog() (다른 경로에서도 브이로그 키워드가 있으면 부가 정보로 한 번 검색)
     - 간단한 질문: handle_simple_qna()
     - 일반적인 질문: handle_general_request()
     
@@ -71,103 +92,126 @@ def chatbot_view(request):
 
         # 사용자가 보낸 메시지 추출
         user_input = request.POST.get("message", "").strip()
-        save_button_enabled = False   # 일정 저장 버튼 상태 (기본 False)
+        response_data = process_chat_message(request, session, user_input)
+        schedule_summary_update(session)   # 이번 턴을 세션 요약에 반영 (백그라운드)
+        return JsonResponse(response_data)
+
+    # -------------------- GET 요청 (메인 페이지) --------------------
+    # 👉 POST 요청이 아닌 경우 (예: 사용자가 페이지 처음 접속했을 때)
+    histories = []
+    if request.user.is_authenticated:
+        # 로그인한 사용자의 과거 세션 목록 불러오기
+        sessions = ChatSession.objects.filter(user=request.user).exclude(title__isnull=True).order_by("-created_at")
+        for s in sessions:
+            histories.append({"id": s.id, "title": s.title})   # 세션 ID와 제목만 추출
+
+    # chatbot.html 템플릿 렌더링 + 컨텍스트 데이터 전달
+    return render(request, "pybo/chatbot.html", {
+        "messages": session.messages.all() if session and session.title else [],   # 현재 세션 메시지
+        "histories": histories,                                                   # 과거 세션 목록
+        "current_session": session if session and session.title else None,        # 현재 세션
+        "kakao_js_key": KAKAO_JS_API_KEY                                          # 카카오 JavaScript API 키 (프론트엔드용)
+    })
+
+
+# -------------------- 대화 1턴 처리 (일반/스트리밍 공용) --------------------
+def process_chat_message(request, session, user_input, emit=None):
+    """
+    사용자 메시지 1건을 처리하여 응답 데이터를 만드는 함수
+
+    chatbot_view(JSON 응답)와 chatbot_stream_view(SSE 응답)가 함께 사용합니다.
+
+    Args:
+        request (HttpRequest): Django 요청 객체
+        session (ChatSession): 현재 채팅 세션
+        user_input (str): 사용자 메시지
+        emit (callable, optional): 스트리밍 모드에서 이벤트를 전달할 콜백 emit(event, data)
+            - token: LLM 토큰 / reset: 이전 토큰 폐기 (폴백 시)
+            - places, weather, vlog: 본문 이후의 부가 데이터
+        브이로그 카드는 턴당 한 번만 검색하고(날씨 조회와 동시 진행), 어시스턴트 메시지와 함께 한 번만 저장합니다.
+
+    Returns:
+        dict: 프론트엔드로 보낼 응답 데이터
+    """
+    # 스트리밍 모드일 때만 토큰 콜백 사용
+    on_token = (lambda token: emit("token", {"text": token})) if emit else None
+
+    save_button_enabled = False   # 일정 저장 버튼 상태 (기본 False)
         
-        # ✅ 좌표 정보가 포함된 장소들 (전역 변수로 설정)
-        places_with_coords = []
-
-        # 세션 제목 자동 생성 (첫 메시지에서만 제목 생성)
-        if not session.title:
-            if "일정" in user_input:
-                session.title = "🗓 여행 일정 추천"
-                save_button_enabled = True   # 일정 요청일 경우 저장 버튼 활성화
-            elif "맛집" in user_input:
-                session.title = "🍴 맛집 추천"
-            elif "브이로그" in user_input or "유튜브" in user_input:
-                session.title = "🎥 여행 브이로그 추천"
-
-            if session.title:
-                session.save()   # 세션 제목을 DB에 저장
-
-        # 사용자 메시지를 DB에 저장 (대화 내역 관리)
+    # ✅ 좌표 정보가 포함된 장소들 (전역 변수로 설정)
+    places_with_coords = []
+
+    # 라우팅 테이블 매칭 (메시지를 한 번만 훑어서 모든 분기 결정에 사용)
+    route_match = router.match(user_input)
+    route = route_match.route("chat")
+    console.log(f"🧭 라우팅: {route.name} (매칭 키워드: {', '.join(route.keywords) or '없음'})")
+    annotate("route", route.name)   # 단계별 지연 로그에 경로 표시
+
+    # 세션 제목 자동 생성 (첫 메시지에서만 제목 생성)
+    if not session.title:
+        session.title = route_match.route("session_title").name
+        if route.name == "schedule":
+            save_button_enabled = True   # 일정 요청일 경우 저장 버튼 활성화
+
         if session.title:
-            ChatMessage.objects.create(session=session, role="user", content=user_input)
+            session.save()   # 세션 제목을 DB에 저장
 
-        # -------------------- 병행 구조 --------------------
-        try:
-            # 대화 히스토리 가져오기 (모든 요청에 대해)
-            conversation_history = []
-            if session:
-                recent_messages = ChatMessage.objects.filter(session=session).order_by('-created_at')[:15]
-                for msg in reversed(recent_messages):  # 시간순으로 정렬
-                    conversation_history.append(f"{msg.role}: {msg.content}")
-                
-                # 세션 제목과 관련된 컨텍스트 정보 추가
-                if session.title:
-                    conversation_history.insert(0, f"세션 제목: {session.title}")
-                    conversation_history.insert(1, f"대화 시작 시간: {session.created_at.strftime('%Y-%m-%d %H:%M')}")
-            
-            # 기존 일정 변경 요청 감지
-            is_schedule_modification = any(keyword in user_input for keyword in [
-                "일정 변경", "일정 수정", "일정 바꿔", "일정 다시", "일정 재", "일정 수정해", 
-                "일정 바꿔줘", "일정 다시 짜", "일정 다시 만들어", "일정 다시 추천",
-                "일정 중에", "일정에서", "일정의", "일정을", "일정을 다른거로", "일정을 바꿔"
-            ])
-            
-            if "일정" in user_input:
+    # 사용자 메시지를 DB에 저장 (대화 내역 관리)
+    if session.title:
+        ChatMessage.objects.create(session=session, role="user", content=user_input, raw_content=user_input)
+
+    # -------------------- 병행 구조 --------------------
+    try:
+        # 대화 히스토리 가져오기 (모든 요청에 대해, 세션 요약 + 최근 메시지 원문)
+        with span("history"):
+            conversation_history, _ = build_prompt_history(session, include_session_info=True)
+        
+        # 기존 일정 변경 요청 감지
+        is_schedule_modification = route_match.matched("schedule_modification")
+        
+        # 경로별 처리 (처리 시간/오류는 경로 지표에 기록)
+        with track_route(route.name):
+            if route.name == "schedule":
                 # ✅ 일정 관련 요청 처리 → handle_schedule_request 함수 사용 (개선된 버전)
-                result, schedule_data = handle_schedule_request(user_input, session, request, is_schedule_modification)
-                
+                # 활동이 완성될 때마다 좌표 확보 시작 (스트리밍 모드면 지도도 바로 갱신)
+                # 일정 생성이 예외(LLM 오류, 예산 초과)로 끝나도 with 블록이 수집기 실행기를 정리
+                with SchedulePlaceCollector(
+                    on_update=(lambda places: emit("places", {"places": places})) if emit else None
+                ) as collector:
+                    result, schedule_data = handle_schedule_request(
+                        user_input, session, request, is_schedule_modification,
+                        on_token=on_token, on_activity=collector.add,
+                    )
+                    collected_places = collector.results()
+            
                 # ✅ 좌표 정보 추출 (개선된 버전)
                 if schedule_data:
-                    # JSON 데이터에서 직접 좌표 정보 추출
-                    places_with_coords = extract_coordinates_from_schedule_data(schedule_data)
-                    
+                    # JSON 좌표 + 생성 중에 미리 검색한 좌표
+                    places_with_coords = collected_places
+                
                     # JSON에 좌표가 없으면 AI 응답에서 장소명들을 추출하여 좌표 검색
                     if not places_with_coords:
                         places_with_coords = extract_coordinates_from_response(result)
-                    
+                
                     # 좌표 정보가 있는 장소들을 응답에 포함
                     if places_with_coords:
                         result += format_places_info(places_with_coords)
-                        
+                    
                         # 프론트엔드에서 사용할 수 있도록 places 데이터 설정
                         save_button_enabled = True
                         console.log(f"좌표 검색 완료: {len(places_with_coords)}개 장소")  # 디버깅용
 
-            elif ("간단" in user_input or "단답" in user_input or 
-                  any(keyword in user_input for keyword in [
-                      "주차장", "가성비", "팁", "추천", "어디", "뭐가", "어떤", "어느", 
-                      "좋은", "나쁜", "비용", "요금", "가격", "얼마", "시간", "언제",
-                      "방법", "어떻게", "왜", "이유", "장점", "단점", "차이", "비교",
-                      "주의", "조심", "준비", "필요", "챙겨", "가져", "입장료"
-                  ])):
+            elif route.name == "simple_qna":
                 # ✅ 간단 질문 답변 → handle_simple_qna 함수 사용
-                result = handle_simple_qna(user_input)
-
-            # 추가----
-            elif _wants_vlog(user_input):
-                wants_schedule = "일정" in user_input
-                vlog_response = handle_vlog_request(user_input, session)
+                result = handle_simple_qna(user_input, on_token=on_token)
 
-                if wants_schedule:
-                    # 일정도 같이 처리
-                    schedule_result, schedule_data = handle_schedule_request(
-                        user_input, session, request, is_schedule_modification
-                    )
-                    places = extract_coordinates_from_schedule_data(schedule_data) or []
-                    return JsonResponse({
-                        "reply": schedule_result + "\n\n관련 브이로그:\n" + vlog_response.get("reply",""),
-                        "yt_html": vlog_response.get("yt_html",""),
-                        "youtube": vlog_response.get("youtube", []),
-                        "places": places,
-                    })
-                else:
-                    return JsonResponse(vlog_response)
-            #== 추가 끝----
+            elif route.name == "vlog":
+                # 본문 없이 브이로그 카드만 (아래 부가 정보 단계에서 검색)
+                # "일정" 이 함께 있으면 schedule 경로가 먼저 선택되고, 그 경우에도 부가 정보 단계에서 카드가 붙음
+                result = ""
 
 
-            elif "상세" in user_input or "정보" in user_input:
+            elif route.name == "place_details":
                 # ✅ 장소 상세정보 요청 → Google Places API
                 query = clean_place_query(user_input)  # 입력 정제
                 details = google_place_details(query)
@@ -186,14 +230,19 @@ def chatbot_view(request):
             else:
                 # ✅ 일반적인 여행 관련 질문 → handle_general_request 함수 사용 (세션 전달)
                 try:
-                    result = handle_general_request(user_input, conversation_history, session)  # 세션 전달
-                    
+                    result = handle_general_request(
+                        user_input, conversation_history, session, on_token=on_token,
+                        request_type=route_match.route("general").name,
+                    )  # 세션 전달
+                
                     # 결과가 너무 짧거나 오류 메시지인 경우 simple_qna로 폴백
                     if (not result or len(result.strip()) < 20 or 
                         "오류" in result or "실패" in result or "문제가 발생" in result):
                         console.log("🔄 handle_general_request 결과가 부적절하여 handle_simple_qna로 폴백")
-                        result = handle_simple_qna(user_input)
-                    
+                        if emit:
+                            emit("reset", {})
+                        result = handle_simple_qna(user_input, on_token=on_token)
+                
                     # ✅ 일반 요청에서도 좌표 정보 추출 (새로 추가된 기능 활용)
                     try:
                         # AI 응답에서 장소명들을 추출하여 좌표 검색
@@ -205,75 +254,359 @@ def chatbot_view(request):
                     except Exception as coord_error:
                         console.log(f"⚠️ 일반 요청 좌표 추출 중 오류: {coord_error}")
                         # 좌표 추출 실패해도 메인 응답은 유지
-                        
+                    
                 except Exception as general_error:
                     console.log(f"❌ handle_general_request 실패: {general_error}")
                     console.log("🔄 handle_simple_qna로 폴백 실행")
-                    result = handle_simple_qna(user_input)
+                    if emit:
+                        emit("reset", {})
+                    result = handle_simple_qna(user_input, on_token=on_token)
+    except Exception as e:
+        # 예외 발생 시 에러 메시지 반환
+        result = f"처리 중 오류 발생: {e}"
+        console.log(f"전체 처리 중 예외 발생: {e}")
+
+    # -------------------- 부가 정보: 브이로그 (턴당 1회) --------------------
+    # 작업 스레드에서 시작하여 아래 좌표/날씨 처리와 동시에 진행
+    vlog_executor = vlog_future = None
+    if route_match.matched("vlog") and not should_skip("vlog"):   # 예산이 거의 남지 않았으면 생략
+        vlog_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vlog")
+        vlog_future = vlog_executor.submit(bind_context(_vlog_worker), user_input, session, request)
+
+    # -------------------- 응답 --------------------
+    # 1) LLM 결과에서 불필요한 대괄호 [링크] 제거
+    reply_clean = result if result else ""
+    # 2) 마크다운을 HTML로 변환 (코드블록, 줄바꿈, 테이블 지원)
+    reply_html = markdown(reply_clean, extensions=["fenced_code", "nl2br", "tables"])
+
+    # 프론트엔드로 JSON 응답 반환
+    response_data = {
+        "reply": reply_clean,
+        "yt_html": "",
+        "youtube": [],
+        "map": [],
+        "save_button_enabled": save_button_enabled
+    }
+    if emit:
+        # 본문 확정 (스트리밍 토큰을 최종 본문으로 교체)
+        emit("reply", {"reply": reply_clean, "save_button_enabled": save_button_enabled})
+    
+    # ✅ 좌표 정보가 있는 경우 places 데이터 추가 (일정 및 일반 요청 모두)
+    if places_with_coords:
+        if emit:
+            emit("places", {"places": places_with_coords})
+
+        # 날씨는 부가 정보 → 요청 예산이 거의 남지 않았으면 생략
+        if not should_skip("weather"):
+            # 같은 격자(약 5km)의 장소는 한 번만, 서로 다른 격자는 동시에 조회
+            weathers = get_weather_many([(p.get("lat"), p.get("lng")) for p in places_with_coords])
+            attach_weather(places_with_coords, weathers)
+
+        response_data["places"] = places_with_coords
+        response_data["map"] = places_with_coords  # 지도 표시용
+        console.log(f"JSON 응답에 좌표+날씨 포함: {len(places_with_coords)}개 장소")
+        if emit:
+            emit("weather", {"weather": [p.get("weather") for p in places_with_coords]})
+
+    vlog = None
+    if vlog_future is not None:
+        vlog = vlog_future.result()
+        vlog_executor.shutdown()
+        if vlog:
+            apply_vlog(response_data, vlog[0])
+            if emit:
+                emit("vlog", {"yt_html": response_data["yt_html"], "youtube": response_data["youtube"]})
+
+    # -------------------- 응답 저장 (본문 + 브이로그 카드를 어시스턴트 메시지 1건으로) --------------------
+    if session.title:
+        content, raw_content = assistant_message_parts(reply_html, reply_clean, vlog)
+        ChatMessage.objects.create(session=session, role="assistant", content=content, raw_content=raw_content)
+
+    return response_data
+
+
+def _vlog_worker(user_input, session, request):
+    """브이로그 작업 스레드: 검색 후 이 스레드의 DB 연결 정리 (실패하면 None → 카드 없이 응답)"""
+    try:
+        return search_vlog(user_input, session, request)
+    except Exception as vlog_error:
+        console.log(f"⚠️ 브이로그 검색 중 오류: {vlog_error}")
+        return None
+    finally:
+        connections.close_all()
+
+
+def apply_vlog(response_data, vlog_response):
+    """브이로그 검색 결과를 응답 데이터에 반영 (일반/비동기 공용)"""
+    if vlog_response.get("reply"):
+        response_data["reply"] += "\n\n" + vlog_response["reply"]
+    response_data["yt_html"] = vlog_response.get("yt_html", "")
+    response_data["youtube"] = vlog_response.get("youtube", [])
+
+
+def assistant_message_parts(reply_html, reply_clean, vlog):
+    """
+    어시스턴트 메시지 1건으로 저장할 (content, raw_content)
+
+    Args:
+        vlog (tuple | None): search_vlog() 결과 (응답 딕셔너리, 프롬프트용 원문)
+    """
+    if not vlog:
+        return reply_html, reply_clean
+    vlog_response, vlog_raw = vlog
+    content = "\n".join(part for part in (reply_html, vlog_response.get("yt_html", "")) if part)
+    raw_content = "\n\n".join(part for part in (reply_clean, vlog_raw) if part)
+    return content, raw_content
+
+
+# -------------------- 챗봇 스트리밍 뷰 (SSE) --------------------
+_STREAM_END = object()   # 스트림 종료 표시
+
+
+def _sse_event(event, data):
+    """Server-Sent Events 형식의 메시지 문자열 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@with_deadline(CHAT_DEADLINE_SECONDS)   # 채팅 1턴 전체 예산 (외부 호출 타임아웃/부가 정보 생략 기준)
+def chatbot_stream_view(request):
+    """
+    챗봇 스트리밍 뷰 (Server-Sent Events)
+
+    chatbot_view 의 POST 처리와 같은 파이프라인을 실행하되,
+    LLM 토큰을 생성 즉시 token 이벤트로 보내고 좌표/날씨/브이로그는 이후 별도 이벤트로 보냅니다.
+    이벤트 순서: token* → (reset) → reply → places → weather → vlog → done
+    """
+    if request.method != "POST":
+        return JsonResponse({'error': 'POST 요청만 허용됩니다.'}, status=405)
+
+    if not request.user.is_authenticated:
+        # 로그인이 안 되어 있으면 "로그인 필요" 반환 (일반 JSON)
+        return JsonResponse({"login_required": True}, status=200)
+
+    session = get_or_create_session(request, request.GET.get("session_id"))
+    user_input = request.POST.get("message", "").strip()
+    events = queue.Queue()
+
+    def emit(event, data):
+        events.put((event, data))
+
+    @bind_context   # 요청 Trace 를 작업 스레드로 전달 (스트림 시작 전에 컨텍스트 복사)
+    def worker():
+        try:
+            with tool_memo_scope():   # 실제 처리는 이 스레드에서 진행되므로 요청 단위 도구 메모도 여기서 시작
+                response_data = process_chat_message(request, session, user_input, emit=emit)
+            emit("done", response_data)
+            schedule_summary_update(session)
         except Exception as e:
-            # 예외 발생 시 에러 메시지 반환
-            result = f"처리 중 오류 발생: {e}"
-            console.log(f"전체 처리 중 예외 발생: {e}")
-
-        # -------------------- 응답 저장 --------------------
-        # 1) LLM 결과에서 불필요한 대괄호 [링크] 제거
-        reply_clean = result if result else ""
-        # 2) 마크다운을 HTML로 변환 (코드블록, 줄바꿈, 테이블 지원)
-        reply_html = markdown(reply_clean, extensions=["fenced_code", "nl2br", "tables"])
-        # 3) 어시스턴트 답변 DB 저장
+            console.log(f"스트리밍 처리 중 예외 발생: {e}")
+            emit("error", {"message": f"처리 중 오류 발생: {e}"})
+        finally:
+            events.put(_STREAM_END)
+            connections.close_all()   # 작업 스레드의 DB 연결 정리
+
+    def event_stream():
+        # 미들웨어(세션 저장 등)가 끝난 뒤 실제 처리를 시작
+        threading.Thread(target=worker, daemon=True).start()
+        yield ": stream-start\n\n"   # 첫 바이트 즉시 전송
+        while True:
+            try:
+                item = events.get(timeout=15)
+            except queue.Empty:
+                yield ": ping\n\n"   # 연결 유지용 주석 이벤트
+                continue
+            if item is _STREAM_END:
+                break
+            yield _sse_event(*item)
+        # SessionMiddleware 는 스트리밍 전에 세션을 저장하므로, 처리 중 변경된 세션(schedule_json 등)은 직접 저장
+        if request.session.modified:
+            request.session.save()
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # 프록시 버퍼링 방지
+    return response
+
+
+def attach_weather(places, weathers):
+    """장소 목록에 날씨 추가 (weather: 안내 문장, weather_data: 구조화 데이터)"""
+    for place, weather in zip(places, weathers):
+        if weather:
+            place["weather"] = format_weather(weather)
+            place["weather_data"] = weather
+
+
+# -------------------- 챗봇 비동기 뷰 (ASGI) --------------------
+@with_deadline(CHAT_DEADLINE_SECONDS)   # 채팅 1턴 전체 예산 (외부 호출 타임아웃/부가 정보 생략 기준)
+@with_tool_memo                         # 같은 턴의 반복 도구 호출/좌표 검색은 한 번만 실행
+async def chatbot_async_view(request):
+    """
+    챗봇 비동기 뷰 (POST 전용, 응답 JSON 은 chatbot_view 의 POST 응답과 동일)
+
+    ASGI 서버(uvicorn config.asgi:application 등)에서 실행하면 LLM 응답을 기다리는 동안
+    워커 스레드를 점유하지 않으므로, 워커 1개가 수백 개의 대화를 동시에 처리할 수 있습니다.
+    (WSGI 에서도 동작하지만 요청마다 이벤트 루프를 새로 띄우므로 이점이 없음)
+    """
+    if request.method != "POST":
+        return JsonResponse({'error': 'POST 요청만 허용됩니다.'}, status=405)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        # 로그인이 안 되어 있으면 "로그인 필요" 반환
+        return JsonResponse({"login_required": True}, status=200)
+
+    session = await run_sync(get_or_create_session, request, request.GET.get("session_id"))
+    user_input = request.POST.get("message", "").strip()
+    response_data = await aprocess_chat_message(request, session, user_input)
+    await run_sync(schedule_summary_update, session)   # 이번 턴을 세션 요약에 반영 (백그라운드)
+    return JsonResponse(response_data)
+
+
+async def aprocess_chat_message(request, session, user_input):
+    """
+    process_chat_message 의 비동기 버전 (라우팅/응답 형식 동일)
+
+    LLM 과 외부 API 는 await 로 기다리고, 본문 이후의 부가 정보
+    (장소 좌표 → 장소별 날씨, 브이로그 검색)는 asyncio.gather 로 동시에 가져옵니다.
+
+    Returns:
+        dict: 프론트엔드로 보낼 응답 데이터
+    """
+    save_button_enabled = False   # 일정 저장 버튼 상태 (기본 False)
+    places_with_coords = []
+    general_reply = None   # 일반 질문 응답 (장소 좌표는 부가 정보 단계에서 검색)
+
+    # 라우팅 테이블 매칭 (메시지를 한 번만 훑어서 모든 분기 결정에 사용)
+    route_match = router.match(user_input)
+    route = route_match.route("chat")
+    console.log(f"🧭 라우팅(async): {route.name} (매칭 키워드: {', '.join(route.keywords) or '없음'})")
+    annotate("route", route.name)
+
+    # 세션 제목 자동 생성 (첫 메시지에서만 제목 생성)
+    if not session.title:
+        session.title = route_match.route("session_title").name
+        if route.name == "schedule":
+            save_button_enabled = True
+
         if session.title:
-            ChatMessage.objects.create(session=session, role="assistant", content=reply_html)
-
-        # 프론트엔드로 JSON 응답 반환
-        response_data = {
-            "reply": reply_clean,
-            "yt_html": "",
-            "youtube": [],
-            "map": [],
-            "save_button_enabled": save_button_enabled
-        }
-        
-        # ✅ 좌표 정보가 있는 경우 places 데이터 추가 (일정 및 일반 요청 모두)
-        if places_with_coords:
-            for p in places_with_coords:
-                lat, lon = p.get("lat"), p.get("lng")
-                if lat and lon:
-                    p["weather"] = get_weather_info_by_coords(lat, lon)   # 🔹 최소 수정: 날씨만 추가
-
-            response_data["places"] = places_with_coords
-            response_data["map"] = places_with_coords  # 지도 표시용
-            console.log(f"JSON 응답에 좌표+날씨 포함: {len(places_with_coords)}개 장소")
-        # 추가----
-        # ✅ 🔹여기에 브이로그 추가🔹
-        if _wants_vlog(user_input):
-            vlog_result = handle_vlog_request(user_input, session, request)  # request 추가
-            console.log(f"브이로그 검색어: {vlog_result.get('search_term', '없음')} (세션 ID: {session.id})")
-            if isinstance(vlog_result, dict):
-                response_data["reply"] += "\n\n" + vlog_result.get("reply", "")
-                response_data["yt_html"] = vlog_result.get("yt_html", "")
-                response_data["youtube"] = vlog_result.get("youtube", [])
+            await session.asave()
+
+    # 사용자 메시지를 DB에 저장 (대화 내역 관리)
+    if session.title:
+        await ChatMessage.objects.acreate(session=session, role="user", content=user_input, raw_content=user_input)
+
+    try:
+        with span("history"):
+            conversation_history, _ = await run_sync(build_prompt_history, session, include_session_info=True)
+
+        is_schedule_modification = route_match.matched("schedule_modification")
+
+        with track_route(route.name):
+            if route.name == "schedule":
+                result, schedule_data = await ahandle_schedule_request(
+                    user_input, session, request, is_schedule_modification
+                )
+                if schedule_data:
+                    # JSON 좌표 + 좌표 없는 장소는 한 번에 동시 지오코딩
+                    places_with_coords = await aextract_schedule_places(schedule_data)
+                    if not places_with_coords:
+                        places_with_coords = await aextract_coordinates_from_response(result)
+                    if places_with_coords:
+                        result += format_places_info(places_with_coords)
+                        save_button_enabled = True
+                        console.log(f"좌표 검색 완료: {len(places_with_coords)}개 장소")
+
+            elif route.name == "simple_qna":
+                result = await ahandle_simple_qna(user_input)
+
+            elif route.name == "vlog":
+                # 본문 없이 브이로그 카드만 (아래 부가 정보 단계에서 검색)
+                result = ""
+
+            elif route.name == "place_details":
+                query = clean_place_query(user_input)
+                details = await agoogle_place_details(query)
+
+                if details:
+                    result = (
+                        f"📍 {details.get('name', '이름 없음')}\n"
+                        f"주소: {details.get('address', '주소 없음')}\n"
+                        f"전화: {details.get('phone', '전화번호 없음')}\n"
+                        f"운영시간:\n{details.get('opening_hours', '운영시간 정보 없음')}"
+                    )
+                else:
+                    result = f"'{query}'에 대한 장소 정보를 찾을 수 없습니다."
+
             else:
-                response_data["reply"] += "\n\n" + str(vlog_result)
-        #== 추가 끝----
-        
-        return JsonResponse(response_data)
+                try:
+                    result = await ahandle_general_request(
+                        user_input, conversation_history, session,
+                        request_type=route_match.route("general").name,
+                    )
 
-    # -------------------- GET 요청 (메인 페이지) --------------------
-    # 👉 POST 요청이 아닌 경우 (예: 사용자가 페이지 처음 접속했을 때)
-    histories = []
-    if request.user.is_authenticated:
-        # 로그인한 사용자의 과거 세션 목록 불러오기
-        sessions = ChatSession.objects.filter(user=request.user).exclude(title__isnull=True).order_by("-created_at")
-        for s in sessions:
-            histories.append({"id": s.id, "title": s.title})   # 세션 ID와 제목만 추출
+                    # 결과가 너무 짧거나 오류 메시지인 경우 simple_qna로 폴백
+                    if (not result or len(result.strip()) < 20 or
+                        "오류" in result or "실패" in result or "문제가 발생" in result):
+                        console.log("🔄 ahandle_general_request 결과가 부적절하여 ahandle_simple_qna로 폴백")
+                        result = await ahandle_simple_qna(user_input)
+                    general_reply = result
+                except Exception as general_error:
+                    console.log(f"❌ ahandle_general_request 실패: {general_error}")
+                    result = await ahandle_simple_qna(user_input)
+    except Exception as e:
+        result = f"처리 중 오류 발생: {e}"
+        console.log(f"전체 처리 중 예외 발생(async): {e}")
+
+    reply_clean = result if result else ""
+    reply_html = markdown(reply_clean, extensions=["fenced_code", "nl2br", "tables"])
+
+    response_data = {
+        "reply": reply_clean,
+        "yt_html": "",
+        "youtube": [],
+        "map": [],
+        "save_button_enabled": save_button_enabled
+    }
+
+    # -------------------- 부가 정보 (동시 실행) --------------------
+    async def locate_places():
+        places = places_with_coords
+        if general_reply:
+            try:
+                places = await aextract_coordinates_from_response(general_reply)
+                if places:
+                    console.log(f"📍 일반 요청에서 좌표 정보 추출: {len(places)}개 장소")
+            except Exception as coord_error:
+                console.log(f"⚠️ 일반 요청 좌표 추출 중 오류: {coord_error}")
+                places = []
+        if places and not should_skip("weather"):   # 날씨는 예산이 거의 남지 않았으면 생략
+            attach_weather(places, await aget_weather_many([(p.get("lat"), p.get("lng")) for p in places]))
+        return places
+
+    async def find_vlog():
+        if not route_match.matched("vlog") or should_skip("vlog"):
+            return None
+        try:
+            return await asearch_vlog(user_input, session, request)
+        except Exception as vlog_error:
+            console.log(f"⚠️ 브이로그 검색 중 오류: {vlog_error}")
+            return None
 
-    # chatbot.html 템플릿 렌더링 + 컨텍스트 데이터 전달
-    return render(request, "pybo/chatbot.html", {
-        "messages": session.messages.all() if session and session.title else [],   # 현재 세션 메시지
-        "histories": histories,                                                   # 과거 세션 목록
-        "current_session": session if session and session.title else None,        # 현재 세션
-        "kakao_js_key": KAKAO_JS_API_KEY                                          # 카카오 JavaScript API 키 (프론트엔드용)
-    })
+    places_with_coords, vlog = await asyncio.gather(locate_places(), find_vlog())
+
+    if places_with_coords:
+        response_data["places"] = places_with_coords
+        response_data["map"] = places_with_coords  # 지도 표시용
+        console.log(f"JSON 응답에 좌표+날씨 포함: {len(places_with_coords)}개 장소")
+    if vlog:
+        apply_vlog(response_data, vlog[0])
+
+    # -------------------- 응답 저장 (본문 + 브이로그 카드를 어시스턴트 메시지 1건으로) --------------------
+    if session.title:
+        content, raw_content = assistant_message_parts(reply_html, reply_clean, vlog)
+        await ChatMessage.objects.acreate(session=session, role="assistant", content=content, raw_content=raw_content)
+
+    return response_data
 
 
 # -------------------- 세션 메시지 로드 --------------------
@@ -595,6 +928,7 @@ def find_schedule_by_session(request, session_id):
 
 # ==================== 경로 API 엔드포인트 ====================
 @csrf_exempt
+@with_deadline(ROUTE_DEADLINE_SECONDS)   # 길찾기 API 호출 전체 예산
 def get_route(request):
     """자동차(카카오) + 대중교통(Google) 통합 길찾기 API 엔드포인트"""
     if request.method != 'POST':
@@ -642,7 +976,10 @@ def get_route(request):
                 'departure_time': 'now',
                 'key': GOOGLE_API_KEY,
             }
-            g_resp = requests.get(g_url, params=params)
+            try:
+                g_resp = http_get("google", g_url, params=params, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
+            except (requests.exceptions.RequestException, DeadlineExceeded) as e:
+                return JsonResponse({"error": f"Google Directions 요청 실패: {e}", "provider": "google_transit"}, status=504)
             g_data = g_resp.json()
             if g_data.get('status') != 'OK' or not g_data.get('routes'):
                 return JsonResponse({
@@ -733,7 +1070,7 @@ def get_route(request):
             kakao_body['waypoints'] = [{'x': float(wp['x']), 'y': float(wp['y'])} for wp in waypoints]
 
         try:
-            response = requests.post(kakao_url, headers=headers, json=kakao_body, timeout=10)
+            response = http_post("kakao", kakao_url, headers=headers, json=kakao_body, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
             if response.status_code == 405:  # POST 실패 시 GET 재시도
                 params = {
                     'origin': f"{origin_x},{origin_y}",
@@ -742,13 +1079,13 @@ def get_route(request):
                 }
                 if waypoints:
                     params['waypoints'] = '|'.join([f"{float(wp['x'])},{float(wp['y'])}" for wp in waypoints])
-                response = requests.get(kakao_url, headers=headers, params=params, timeout=10)
+                response = http_get("kakao", kakao_url, headers=headers, params=params, timeout=remaining_timeout(ROUTE_API_TIMEOUT))
             response.raise_for_status()
             result = response.json()
             result['provider'] = 'kakao'
             return JsonResponse(result)
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, DeadlineExceeded) as e:
             print(f"카카오 API 요청 오류: {e}")
             return JsonResponse({'error': f'카카오 API 요청 실패: {str(e)}'}, status=500)
 
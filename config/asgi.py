@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# 서버 프로세스에서만 일반 질문용 LangChain 에이전트를 미리 생성 (첫 요청 지연 방지, manage.py 명령에서는 생성하지 않음)
+from chatbot.services.agent_factory import warm_up_server  # noqa: E402
+
+warm_up_server()
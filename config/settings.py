@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'chatbot.middleware.ServerTimingMiddleware',   # 단계별 지연 시간 → Server-Timing 헤더 + 로그
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -98,4 +99,96 @@ LOGOUT_REDIRECT_URL = "chatbot"     # 로그아웃 후 이동
 
 SECURE_SSL_REDIRECT = False
 
-
+# 일반 질문용 LangChain 에이전트를 서버 시작 시(WSGI/ASGI 애플리케이션 로드 시) 미리 생성할지 여부
+CHATBOT_WARM_AGENT = True
+
+# 지오코딩 캐시 (kakao_geocode / search_place_coordinates)
+GEOCODE_CACHE_TTL = 60 * 60 * 24 * 30     # 성공 결과 보관 기간 (30일)
+GEOCODE_CACHE_NEGATIVE_TTL = 60 * 60      # 검색 실패/근사 좌표 보관 기간 (1시간)
+GEOCODE_CACHE_LRU_SIZE = 2048             # 프로세스 내부 LRU 최대 항목 수
+GEOCODE_MAX_WORKERS = 8                   # geocode_many 동시 검색 스레드 수 (= 카카오 연결 풀 크기)
+
+# kakao_geocode 검색 전략 엔진
+KAKAO_GEOCODE_CONFIDENT_SCORE = 100       # 장소명 완전 일치 후보가 이 점수 이상이면 남은 전략 생략 (조기 종료)
+KAKAO_GEOCODE_PAGE_SIZE = 15              # 전략 1회당 결과 수 (카카오 API 최대 15)
+
+# 대화 히스토리 토큰 예산 (프롬프트에 넣는 이전 대화 크기 제한)
+CHAT_HISTORY_TOKEN_BUDGET = 2000          # 히스토리 전체 토큰 상한
+CHAT_HISTORY_MESSAGE_TOKEN_LIMIT = 600    # 메시지 1개당 토큰 상한 (긴 일정 답변은 앞부분만 사용)
+CHAT_HISTORY_MAX_MESSAGES = 30            # 조회할 최근 메시지 수 상한
+
+# 세션 대화 요약 (ChatSession.summary 에 누적, 프롬프트에는 요약 + 최근 메시지 원문만 사용)
+CHAT_SUMMARY_RECENT_MESSAGES = 6          # 원문 그대로 넣을 최근 메시지 수
+CHAT_SUMMARY_DIGEST_SIZE = 20             # 이전 대화 다이제스트 최대 줄 수
+CHAT_SUMMARY_MAX_PLACES = 30              # 요약에 보관할 언급 장소 최대 개수
+CHAT_SUMMARY_ASYNC = True                 # 턴 종료 후 백그라운드 스레드에서 요약 갱신
+
+# 일정 생성 응답 형식 (True: 공급자 JSON 모드 + 증분 파서로 DayN 활동 단위 처리)
+SCHEDULE_JSON_MODE = True
+
+# 같은 프롬프트로 동시에 들어온 LLM 호출은 한 번만 실행하고 결과 공유 (single-flight)
+LLM_SINGLEFLIGHT = True
+
+# LLM 백엔드 ("openai": 실제 호출, "fake": 준비된 응답을 돌려주는 로컬 가짜 모델 → 부하 테스트용)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_FAKE_LATENCY = float(os.getenv("LLM_FAKE_LATENCY", "0.5"))   # 가짜 모델 첫 토큰까지 지연(초)
+LLM_FAKE_CHUNK_DELAY = 0.01                                      # 가짜 모델 스트리밍 조각 사이 지연(초)
+
+# 핸들러별 LLM 모델 정책 (티어별 모델/최대 출력 토큰/temperature/요청 타임아웃, 지정한 키만 기본값 위에 병합)
+LLM_MODEL_TIERS = {
+    "fast":     {"model": "gpt-4o-mini", "max_tokens": 300,  "temperature": 0.3, "timeout": 15},   # 짧은 사실 질문
+    "standard": {"model": "gpt-4o-mini", "max_tokens": 800,  "temperature": 0.7, "timeout": 30},   # 일반 답변/에이전트
+    "long":     {"model": "gpt-4o-mini", "max_tokens": 4000, "temperature": 0.7, "timeout": 90},   # 여러 날 일정 JSON
+    "extract":  {"model": "gpt-4o-mini", "max_tokens": 10,   "temperature": 0.0, "timeout": 10},   # 목적지 한 단어 추출
+}
+# 핸들러 → 티어 선택 규칙 (default: 기본, short: 짧은 입력, intents: 라우팅 의도별)
+LLM_HANDLER_TIERS = {
+    "simple_qna":  {"default": "standard", "short": "fast"},
+    "schedule":    {"default": "long"},
+    "general":     {"default": "standard", "intents": {"날씨 정보": "fast"}},
+    "destination": {"default": "extract"},
+}
+LLM_SHORT_INPUT_CHARS = 40                # 이 글자 수 이하 질문은 short 티어 사용
+
+# 일반 질문 도구 엔진 (라우팅 의도별, "react": zero-shot-react 에이전트, "parallel": 병렬 함수 호출)
+# 예: {"default": "react", "맛집 추천": "parallel"} → 맛집 추천만 병렬 엔진으로 A/B 비교 (구조화 로그의 engine 태그)
+GENERAL_TOOL_ENGINES = {"default": os.getenv("GENERAL_TOOL_ENGINE", "react")}
+TOOL_ENGINE_MAX_CALLS = 5                 # 병렬 엔진이 한 턴에 실행할 최대 도구 호출 수
+TOOL_RESULT_MAX_TOKENS = 400              # 종합 호출에 넣는 도구 결과 1건 최대 토큰
+
+# 외부 API 공용 HTTP 세션 (제공자별 연결 풀/기본 타임아웃/재시도, 지정한 키만 기본값 위에 병합)
+# 예: {"kakao": {"pool_maxsize": 32}, "google": {"retries": 0}}
+HTTP_CLIENT_PROVIDERS = {}
+HTTP_RETRY_BACKOFF = 0.2                  # 재시도 대기 = 0.2초 * 2^(n-1)
+
+# 날씨 캐시 (지오해시 격자 단위, 같은 격자의 장소는 OpenWeather 호출 1회 공유)
+WEATHER_CACHE_TTL = 10 * 60               # 격자별 날씨 보관 시간(초)
+WEATHER_GEOHASH_PRECISION = 5             # 지오해시 정밀도 (5 → 약 4.9km 격자)
+WEATHER_MAX_WORKERS = 8                   # 서로 다른 격자 동시 조회 수
+
+# 유튜브 검색 결과 캐시 + 일일 할당량 장부 (할당량 부족/API 오류 시 만료된 캐시로 대체)
+YOUTUBE_CACHE_TTL = 60 * 60 * 24          # "카테고리:장소명" 검색 결과 보관 시간(초)
+YOUTUBE_EMPTY_CACHE_TTL = 60 * 60         # 결과 없음 보관 시간(초)
+YOUTUBE_DAILY_QUOTA = 10000               # 프로젝트 일일 할당량 (search.list 1회 = 100 단위)
+YOUTUBE_QUOTA_RESERVE = 1000              # 남은 할당량이 이 이하가 되면 새 검색 중단
+
+# 외부 지식(위키백과/웹 검색) 캐시 (출처별, 지역 배경 정보는 오래 유지)
+KNOWLEDGE_CACHE_TTL = 60 * 60 * 24 * 30   # 검색 결과 보관 시간(초)
+KNOWLEDGE_EMPTY_CACHE_TTL = 60 * 60       # 결과 없음 보관 시간(초)
+KNOWLEDGE_MAX_WORKERS = 4                 # 동기 조회 공용 스레드 수 (멈춘 위키백과 조회도 이 수를 넘지 않음)
+
+# 요청 단위 시간 예산 (모든 외부 호출 타임아웃이 남은 예산 안에서 결정됨)
+CHAT_DEADLINE_SECONDS = 45                # 채팅 1턴 전체 예산 (chatbot_view / 스트리밍 / 비동기 뷰)
+ROUTE_DEADLINE_SECONDS = 15               # 길찾기 API(get_route) 예산
+DEADLINE_OPTIONAL_RESERVE = 8             # 남은 예산이 이보다 적으면 날씨/브이로그/백업 지오코딩/배경 지식 생략
+
+# 요청 단계별 지연 시간 로그 (chatbot.tracing: 요청당 JSON 한 줄)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"plain": {"format": "%(message)s"}},
+    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "plain"}},
+    "loggers": {
+        "chatbot.tracing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}